@@ -1,12 +1,24 @@
 import math
+import os
+import time
 
 import streamlit as st
-from scipy.optimize import bisect
 
-from utils.Belasting import Belasting, bruto_for_netto
+from utils import instrumentatie
+from utils.Belasting import bruto_for_netto
 from utils.belastingstelsel import belastingstelsels
+from utils.cache import (
+    SalarisBerekening,
+    belasting_voor_jaar,
+    bereken_salaris,
+    curves_voor_jaar,
+)
 from utils.helpers import map_formatter
-from utils.Salaris import Salaris
+from utils.Salaris import Salaris, bruto_per_maand_for_netto
+
+# Zet met SALARIS_INSTRUMENTATIE=1 de metingen van de rekenkern en de reruns aan.
+start_rerun = time.perf_counter()
+meting = instrumentatie.aan() if os.environ.get("SALARIS_INSTRUMENTATIE") else None
 
 # Global predefined settings
 input_belastingjaar = max(belastingstelsels.keys())
@@ -24,8 +36,6 @@ with st.sidebar:
             label="Salarisbasis", options=["Maandelijks", "Jaarlijks"]
         )
 
-        belasting = Belasting(jaar=input_belastingjaar)
-
     if input_maand_of_jaar == "Maandelijks":
         st.write(f"*Belastingjaar **{input_belastingjaar}***")
 
@@ -105,102 +115,75 @@ if input_maand_of_jaar == "Maandelijks":
         vergoeding=input_vergoeding,
     )
 
-    salaris_bruto_jaar = salaris.bereken_bruto_jaarlijks()
-    salaris_netto_jaar = salaris.bereken_netto_jaarlijks(belasting=belasting)
+    berekening = bereken_salaris(input_belastingjaar, salaris=salaris)
 elif input_maand_of_jaar == "Jaarlijks":
-    salaris_bruto_jaar = input_salaris_jaar
-    salaris_netto_jaar = belasting.bereken_netto_salaris(salaris_bruto_jaar)
+    berekening = bereken_salaris(
+        input_belastingjaar, bruto_jaarlijks=input_salaris_jaar
+    )
+
+salaris_bruto_jaar = berekening.bruto_jaarlijks
+salaris_netto_jaar = berekening.netto_jaarlijks
 
 salaris_netto_maand = salaris_netto_jaar / 12
 
-metric_col1, metric_col2 = st.columns(2)
 
-with metric_col1:
-    st.metric(
-        label="Bruto (Jaar)",
-        value=f"€{salaris_bruto_jaar:,.0f}".replace(",", "."),
-    )
-    st.metric(
-        label="Netto (Jaar)",
-        value=f"€{salaris_netto_jaar:,.0f}".replace(",", "."),
-    )
-    with st.container():
-        st.metric(
-            label="Netto (Maand)",
-            value=f"€{salaris_netto_maand:,.2f}".translate(map_formatter),
-            help="Indien *alle* bonussen maandelijks uitbetaald worden.",
-        )
-        with st.expander("Details"):
-            st.write("### Belasting")
-            belasting_belastbaar_inkomen = belasting.bereken_bruto_belasting(
-                salaris_bruto_jaar
-            )
-            st.write(
-                belasting.bereken_bruto_belasting(salaris_bruto_jaar, output="tekst")
-            )
-            st.write("### Kortingen")
-            arbeidskorting = belasting.bereken_korting(salaris_bruto_jaar, "arbeid")
-            heffingskorting = belasting.bereken_korting(salaris_bruto_jaar, "heffing")
-            kortingen = arbeidskorting + heffingskorting
-            st.write(
-                f"- Arbeidskorting: €{arbeidskorting:,.2f}\n"
-                f"- Heffingskorting: €{heffingskorting:,.2f}\n\n"
-                f"Je hebt in totaal €{kortingen:,.2f} aan kortingen".translate(
-                    map_formatter
-                )
-            )
-            st.write("## Berekening")
-            st.write(
-                f"- Bruto Salaris: €{salaris_bruto_jaar:,.2f}\n"
-                f"- Belasting: €{belasting_belastbaar_inkomen:,.2f}\n"
-                f"- Kortingen: €{arbeidskorting + heffingskorting:,.2f}\n\n"
-                f"Netto salaris = Bruto Salaris - (Belasting - Kortingen)\n\n"
-                f"Netto salaris = €{salaris_bruto_jaar:,.2f} - (€{belasting_belastbaar_inkomen:,.2f} - €{kortingen:,.2f})\n\n"
-                f"Netto salaris = €{salaris_netto_jaar:,.2f}\n\n"
-                f"Je netto salaris is dus €{salaris_netto_jaar:,.2f} per jaar ofwel €{salaris_netto_maand:,.2f} per maand".translate(
-                    map_formatter
-                )
+def toon_details(berekening: SalarisBerekening) -> None:
+    """De uitleg van de berekening."""
+    salaris_bruto_jaar = berekening.bruto_jaarlijks
+    salaris_netto_jaar = berekening.netto_jaarlijks
+    salaris_netto_maand = salaris_netto_jaar / 12
+    with st.expander("Details"):
+        st.write("### Belasting")
+        opbouw = berekening.opbouw
+        belasting_belastbaar_inkomen = opbouw.bruto_belasting
+        st.write(opbouw.tekst())
+        st.write("### Kortingen")
+        arbeidskorting = opbouw.arbeidskorting
+        heffingskorting = opbouw.heffingskorting
+        kortingen = opbouw.kortingen
+        st.write(
+            f"- Arbeidskorting: €{arbeidskorting:,.2f}\n"
+            f"- Heffingskorting: €{heffingskorting:,.2f}\n\n"
+            f"Je hebt in totaal €{kortingen:,.2f} aan kortingen".translate(
+                map_formatter
             )
-            st.write("### Uitleg")
-            st.write(
-                """
-                Om je netto salaris te berekenen, moet eerst het belastbaar inkomen 
-                worden berekend. Dit is inclusief vakantiegeld, eindejaarsuitkering, en 
-                eventuele bonussen. Gezamenlijk vormt dit het belastbaar inkomen.
-                
-                Het belastbaar inkomen wordt gebruikt om te bepalen hoeveel belasting je
-                moet betalen per schijf. Ook wordt het belastbaar inkomen gebruikt om
-                de arbeidskorting en heffingskorting te berekenen, die beide van invloed
-                zijn op je uiteindelijke netto salaris. Er geldt: hoe hoger je 
-                belastbaar inkomen, hoe minder korting je krijgt.
-                """
+        )
+        st.write("## Berekening")
+        st.write(
+            f"- Bruto Salaris: €{salaris_bruto_jaar:,.2f}\n"
+            f"- Belasting: €{belasting_belastbaar_inkomen:,.2f}\n"
+            f"- Kortingen: €{arbeidskorting + heffingskorting:,.2f}\n\n"
+            f"Netto salaris = Bruto Salaris - (Belasting - Kortingen)\n\n"
+            f"Netto salaris = €{salaris_bruto_jaar:,.2f} - (€{belasting_belastbaar_inkomen:,.2f} - €{kortingen:,.2f})\n\n"
+            f"Netto salaris = €{salaris_netto_jaar:,.2f}\n\n"
+            f"Je netto salaris is dus €{salaris_netto_jaar:,.2f} per jaar ofwel €{salaris_netto_maand:,.2f} per maand".translate(
+                map_formatter
             )
-
-
-def bruto_for_netto_maandelijks(
-    netto_target,
-    bruto_min=1,
-    bruto_max=1_000_000_000,
-):
-    def func(bruto):
-        salaris_instance = Salaris(
-            bruto_per_maand=bruto,
-            percentage_vakantiegeld=input_vakantiegeld,
-            percentage_eindejaars=input_eindejaars,
-            percentage_bonus=input_bonus_perc,
-            percentage_pensioen=input_pensioen_perc,
-            bonus=input_bonus_abs,
-            bruto_netto_ruil=input_bruto_netto_ruil,
-            vergoeding=input_vergoeding,
         )
-        return (
-            salaris_instance.bereken_netto_jaarlijks(belasting=belasting) - netto_target
+        st.write("### Uitleg")
+        st.write(
+            """
+            Om je netto salaris te berekenen, moet eerst het belastbaar inkomen 
+            worden berekend. Dit is inclusief vakantiegeld, eindejaarsuitkering, en 
+            eventuele bonussen. Gezamenlijk vormt dit het belastbaar inkomen.
+            
+            Het belastbaar inkomen wordt gebruikt om te bepalen hoeveel belasting je
+            moet betalen per schijf. Ook wordt het belastbaar inkomen gebruikt om
+            de arbeidskorting en heffingskorting te berekenen, die beide van invloed
+            zijn op je uiteindelijke netto salaris. Er geldt: hoe hoger je 
+            belastbaar inkomen, hoe minder korting je krijgt.
+            """
         )
 
-    return bisect(func, bruto_min, bruto_max)
-
 
-with metric_col2:
+@st.fragment
+def toon_doel(
+    berekening: SalarisBerekening, salaris: Salaris | None, input_salaris: float
+) -> None:
+    """Het doel netto salaris. De slider herlaadt alleen dit deel."""
+    belasting = belasting_voor_jaar(berekening.jaar)
+    salaris_bruto_jaar = berekening.bruto_jaarlijks
+    salaris_netto_maand = berekening.netto_jaarlijks / 12
     slider_value = st.slider(
         label="Hoeveel €50en netto meer per maand is je doel?",
         min_value=0,
@@ -228,9 +211,9 @@ with metric_col2:
             map_formatter
         ),
     )
-    if input_maand_of_jaar == "Maandelijks":
-        wens_netto_maand_bruto_maand = bruto_for_netto_maandelijks(
-            wens_netto_maand_slider * 12
+    if salaris is not None:
+        wens_netto_maand_bruto_maand = bruto_per_maand_for_netto(
+            wens_netto_maand_slider * 12, salaris, belasting
         )
         st.write(
             f"Met dezelfde percentages en bonussen is dat _€{wens_netto_maand_bruto_maand:,.2f}_ bruto per maand dat je moet vragen,".translate(
@@ -240,3 +223,85 @@ with metric_col2:
                 map_formatter
             ),
         )
+
+
+metric_col1, metric_col2 = st.columns(2)
+
+with metric_col1:
+    st.metric(
+        label="Bruto (Jaar)",
+        value=f"€{salaris_bruto_jaar:,.0f}".replace(",", "."),
+    )
+    st.metric(
+        label="Netto (Jaar)",
+        value=f"€{salaris_netto_jaar:,.0f}".replace(",", "."),
+    )
+    with st.container():
+        st.metric(
+            label="Netto (Maand)",
+            value=f"€{salaris_netto_maand:,.2f}".translate(map_formatter),
+            help="Indien *alle* bonussen maandelijks uitbetaald worden.",
+        )
+        toon_details(berekening)
+
+
+with metric_col2:
+    if input_maand_of_jaar == "Maandelijks":
+        toon_doel(berekening, salaris, input_salaris)
+    else:
+        toon_doel(berekening, None, input_salaris_jaar)
+
+# De grafiek en de vergelijking hebben NumPy nodig. Ze staan achter een schakelaar,
+# zodat de eerste run van de app NumPy niet laadt.
+if st.toggle("Netto salaris en kortingen per bruto jaarinkomen"):
+    curves = curves_voor_jaar(input_belastingjaar)
+    st.line_chart(
+        {
+            "Bruto (Jaar)": curves.bruto_jaarlijks,
+            "Netto (Jaar)": curves.netto_jaarlijks,
+            "Arbeidskorting": curves.arbeidskorting,
+            "Heffingskorting": curves.heffingskorting,
+        },
+        x="Bruto (Jaar)",
+        y=["Netto (Jaar)", "Arbeidskorting", "Heffingskorting"],
+        x_label="Bruto (€/jaar)",
+        y_label="€/jaar",
+    )
+    st.caption(
+        f"Belastingjaar {input_belastingjaar}, je bruto jaarsalaris is "
+        f"€{salaris_bruto_jaar:,.0f}.".replace(",", ".")
+    )
+
+if st.toggle("Vergelijking per belastingjaar"):
+    from utils.meerjarig import meerjarig
+
+    stapel = meerjarig()
+    if input_maand_of_jaar == "Maandelijks":
+        netto_per_jaar = stapel.bereken_netto_jaarlijks(salaris)[:, 0]
+    else:
+        netto_per_jaar = stapel.bereken_netto_salaris(salaris_bruto_jaar)[:, 0]
+    st.dataframe(
+        {
+            "Belastingjaar": [str(jaar) for jaar in stapel.jaren],
+            "Netto (Jaar)": netto_per_jaar,
+            "Netto (Maand)": netto_per_jaar / 12,
+            "Verschil met vorig jaar (Maand)": [None]
+            + list((netto_per_jaar[1:] - netto_per_jaar[:-1]) / 12),
+        },
+        hide_index=True,
+        column_config={
+            "Netto (Jaar)": st.column_config.NumberColumn(format="€%.0f"),
+            "Netto (Maand)": st.column_config.NumberColumn(format="€%.2f"),
+            "Verschil met vorig jaar (Maand)": st.column_config.NumberColumn(
+                format="€%+.2f"
+            ),
+        },
+    )
+    st.caption(
+        f"Bij een bruto jaarsalaris van €{salaris_bruto_jaar:,.0f}.".replace(",", ".")
+    )
+
+if meting is not None:
+    meting.registreer("app.rerun", time.perf_counter() - start_rerun)
+    with st.sidebar.expander("Instrumentatie"):
+        st.code(meting.naar_prometheus(), language="text")
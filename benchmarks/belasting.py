@@ -0,0 +1,195 @@
+"""
+Benchmarks voor de rekenkern: de scalaire methodes per aanroep en de batch methodes
+bij 1, 1.000, 1.000.000 en 10.000.000 inkomens.
+
+De inkomens volgen een lognormale verdeling rond een modaal inkomen. De resultaten
+worden als JSON weggeschreven, zodat ze vergeleken kunnen worden met een eerder
+opgeslagen basislijn.
+
+Gebruik:
+    python -m benchmarks.belasting --opslaan benchmarks/baseline.json
+    python -m benchmarks.belasting --vergelijk benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+
+from utils.Belasting import Belasting, bruto_for_netto, bruto_for_netto_batch
+from utils.belastingstelsel import belastingstelsels
+from utils.Salaris import Salaris
+
+GROOTTES = (1, 1_000, 1_000_000, 10_000_000)
+SCALAIR_AANTAL = 2_000
+TOLERANTIE = 0.25
+
+
+def inkomens(aantal: int, seed: int = 0) -> np.ndarray:
+    """Bruto jaarinkomens met een lognormale verdeling rond een modaal inkomen."""
+    rng = np.random.default_rng(seed)
+    return np.clip(rng.lognormal(mean=np.log(45_000), sigma=0.5, size=aantal), 0, 1e6)
+
+
+def _meet(functie: Callable[[], object], herhalingen: int) -> float:
+    """De snelste van een aantal herhalingen, in seconden."""
+    return min(timeit.repeat(functie, number=1, repeat=herhalingen))
+
+
+def benchmarks_scalair(
+    belasting: Belasting, herhalingen: int
+) -> dict[str, dict[str, float]]:
+    bruto = inkomens(SCALAIR_AANTAL).tolist()
+    netto = [belasting.bereken_netto_salaris(x) for x in bruto]
+    salarissen = [Salaris(bruto_per_maand=x / 12 / 1.08) for x in bruto]
+
+    functies: dict[str, Callable[[], object]] = {
+        "bereken_netto_salaris": lambda: [
+            belasting.bereken_netto_salaris(x) for x in bruto
+        ],
+        "bereken_korting": lambda: [
+            belasting.bereken_korting(x, "arbeid") for x in bruto
+        ],
+        "bereken_opbouw": lambda: [belasting.bereken_opbouw(x) for x in bruto],
+        "bruto_for_netto": lambda: [bruto_for_netto(y, belasting) for y in netto],
+        "Salaris.bereken_netto_jaarlijks": lambda: [
+            s.bereken_netto_jaarlijks(belasting) for s in salarissen
+        ],
+    }
+    resultaten = {}
+    for naam, functie in functies.items():
+        seconden = _meet(functie, herhalingen)
+        resultaten[naam] = {
+            "aantal": SCALAIR_AANTAL,
+            "seconden": seconden,
+            "ns_per_inkomen": seconden / SCALAIR_AANTAL * 1e9,
+        }
+    return resultaten
+
+
+def benchmarks_batch(
+    belasting: Belasting, groottes: tuple[int, ...], herhalingen: int
+) -> dict[str, dict[str, float]]:
+    resultaten = {}
+    for aantal in groottes:
+        bruto = inkomens(aantal)
+        netto = belasting.bereken_netto_salaris_batch(bruto)
+        salaris = Salaris(bruto_per_maand=bruto / 12 / 1.08)
+
+        functies: dict[str, Callable[[], object]] = {
+            "bereken_netto_salaris_batch": lambda: (
+                belasting.bereken_netto_salaris_batch(bruto)
+            ),
+            "bereken_opbouw_batch": lambda: belasting.bereken_opbouw_batch(bruto),
+            "bruto_for_netto_batch": lambda: bruto_for_netto_batch(netto, belasting),
+            "Salaris.bereken_netto_jaarlijks[array]": lambda: (
+                salaris.bereken_netto_jaarlijks(belasting)
+            ),
+        }
+        for naam, functie in functies.items():
+            seconden = _meet(functie, herhalingen)
+            resultaten[f"{naam}[{aantal}]"] = {
+                "aantal": aantal,
+                "seconden": seconden,
+                "ns_per_inkomen": seconden / aantal * 1e9,
+                "inkomens_per_seconde": aantal / seconden,
+            }
+    return resultaten
+
+
+def draai(
+    groottes: tuple[int, ...] = GROOTTES, herhalingen: int = 3, jaar: int | None = None
+) -> dict:
+    """
+    Draai alle benchmarks en geef de resultaten met de omgeving terug.
+
+    Args:
+        groottes (tuple[int, ...], optional): De aantallen inkomens voor de batch
+            benchmarks.
+        herhalingen (int, optional): Het aantal herhalingen per benchmark, waarvan de
+            snelste telt. Default is 3.
+        jaar (int | None, optional): Het belastingjaar. Standaard het meest recente.
+
+    Returns:
+        dict: De omgeving en per benchmark het aantal inkomens, de tijd en de tijd per
+            inkomen.
+    """
+    jaar = max(belastingstelsels.keys()) if jaar is None else jaar
+    belasting = Belasting(jaar=jaar)
+    return {
+        "omgeving": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "jaar": jaar,
+        },
+        "resultaten": {
+            **benchmarks_scalair(belasting, herhalingen),
+            **benchmarks_batch(belasting, groottes, herhalingen),
+        },
+    }
+
+
+def vergelijk(
+    resultaten: dict, basislijn: dict, tolerantie: float = TOLERANTIE
+) -> list[str]:
+    """
+    Vergelijk resultaten met een basislijn.
+
+    Returns:
+        list[str]: Een melding per benchmark die meer dan 'tolerantie' trager is dan de
+            basislijn.
+    """
+    regressies = []
+    for naam, resultaat in resultaten["resultaten"].items():
+        if naam not in basislijn["resultaten"]:
+            continue
+        oud = basislijn["resultaten"][naam]["ns_per_inkomen"]
+        nieuw = resultaat["ns_per_inkomen"]
+        if nieuw > oud * (1 + tolerantie):
+            regressies.append(
+                f"{naam}: {nieuw:,.1f} ns per inkomen, basislijn {oud:,.1f} ns"
+            )
+    return regressies
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks voor de rekenkern.")
+    parser.add_argument(
+        "--groottes",
+        type=int,
+        nargs="+",
+        default=GROOTTES,
+        help="Aantallen inkomens voor de batch benchmarks",
+    )
+    parser.add_argument("--herhalingen", type=int, default=3)
+    parser.add_argument("--opslaan", type=Path, help="Schrijf de resultaten naar JSON")
+    parser.add_argument(
+        "--vergelijk", type=Path, help="Vergelijk met een opgeslagen basislijn"
+    )
+    parser.add_argument("--tolerantie", type=float, default=TOLERANTIE)
+    args = parser.parse_args(argv)
+
+    resultaten = draai(tuple(args.groottes), args.herhalingen)
+    for naam, resultaat in resultaten["resultaten"].items():
+        print(f"{naam:<50} {resultaat['ns_per_inkomen']:>14,.1f} ns per inkomen")
+
+    if args.opslaan:
+        args.opslaan.write_text(json.dumps(resultaten, indent=2) + "\n")
+    if args.vergelijk:
+        basislijn = json.loads(args.vergelijk.read_text())
+        regressies = vergelijk(resultaten, basislijn, args.tolerantie)
+        for regressie in regressies:
+            print(f"Regressie: {regressie}")
+        return 1 if regressies else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+import pytest
+
+from utils.tabellen import compileer_stelsel
+
+
+@pytest.fixture(autouse=True, scope="session")
+def cache_map(tmp_path_factory):
+    # Keep compiled tariffs and results out of the user's cache directory.
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("SALARIS_CACHE", str(tmp_path_factory.mktemp("cache")))
+        compileer_stelsel.cache_clear()
+        yield
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from utils.Belasting import Belasting, bruto_for_netto, bruto_for_netto_batch
+from utils.belastingstelsel import belastingstelsels
+
+
+def test_netto_salaris_batch():
+    # Check that the batch path gives exactly the same results as the scalar path.
+    inkomens = np.concatenate(
+        [np.linspace(-1_000, 250_000, 5_001), [0, 11_490, 11_491, 75_518, 1e9]]
+    )
+    for year in belastingstelsels.keys():
+        belasting = Belasting(jaar=year)
+        batch = belasting.bereken_netto_salaris_batch(inkomens)
+        for inkomen, netto in zip(inkomens, batch):
+            assert netto == belasting.bereken_netto_salaris(inkomen), (
+                f"Netto salaris voor {inkomen} ({year}) wijkt af van de scalaire berekening"
+            )
+
+
+def test_batch_exact_op_centen():
+    # Check exact scalar/batch equality on incomes with cents, also in the top bracket.
+    inkomens = np.round(np.random.default_rng(0).uniform(0, 300_000, 20_000), 2)
+    for year in belastingstelsels.keys():
+        belasting = Belasting(jaar=year)
+        opbouw = belasting.bereken_opbouw_batch(inkomens)
+        for inkomen, rij in zip(inkomens, opbouw):
+            assert belasting.bereken_bruto_belasting(inkomen) == rij["bruto_belasting"]
+            assert belasting.bereken_netto_salaris(inkomen) == rij["netto_salaris"], (
+                f"Netto salaris voor {inkomen} ({year}) wijkt af van de batch"
+            )
+
+
+def test_bruto_for_netto():
+    # Check that the inverse gives back the target net salary for every year.
+    doelen = np.linspace(1, 300_000, 3_001)
+    for year in belastingstelsels.keys():
+        belasting = Belasting(jaar=year)
+        bruto = bruto_for_netto_batch(doelen, belasting)
+        netto = belasting.bereken_netto_salaris_batch(bruto)
+        assert np.allclose(netto, doelen, rtol=0, atol=1e-6), (
+            f"Bruto voor netto ({year}) geeft niet het netto doel terug"
+        )
+        assert bruto_for_netto(doelen[100], belasting) == bruto[100], (
+            f"Scalaire en batch inverse ({year}) moeten gelijk zijn"
+        )
+
+
+def test_bruto_for_netto_buiten_bereik():
+    # Check that unreachable targets raise a ValueError like the bisect did.
+    belasting = Belasting(jaar=max(belastingstelsels.keys()))
+    for doel in (0, 2_000_000):
+        with pytest.raises(ValueError):
+            bruto_for_netto(doel, belasting, bruto_max=1_000_000)
+
+
+def test_bereken_opbouw():
+    # Check that one breakdown matches the separate methods, also as a batch.
+    inkomens = np.array([0, 10_000, 35_000, 80_000, 150_000], dtype=float)
+    for year in belastingstelsels.keys():
+        belasting = Belasting(jaar=year)
+        batch = belasting.bereken_opbouw_batch(inkomens)
+        for inkomen, rij in zip(inkomens, batch):
+            opbouw = belasting.bereken_opbouw(inkomen)
+            assert opbouw.netto_salaris == belasting.bereken_netto_salaris(inkomen)
+            assert opbouw.tekst() == belasting.bereken_bruto_belasting(
+                inkomen, output="tekst"
+            )
+            for veld in ("bruto_belasting", "arbeidskorting", "netto_salaris"):
+                assert rij[veld] == getattr(opbouw, veld), (
+                    f"Veld '{veld}' van de batch opbouw ({year}) wijkt af bij {inkomen}"
+                )
@@ -1,4 +1,11 @@
-from utils.belastingstelsel import belastingstelsels
+import pytest
+
+from utils.belastingstelsel import (
+    TARIEVEN_MAP,
+    Belastingstelsels,
+    belastingstelsels,
+    lees_tarieven,
+)
 
 
 def test_structure():
@@ -49,3 +56,32 @@ def test_belastingstelsel_interval():
                     f"De bovengrens {prev_b} van {prev} in '{cat}' ({year}) is ongelijk zijn aan "
                     f"de ondergrens {curr_a} van het volgende interval {curr}"
                 )
+
+
+def test_lees_tarieven(tmp_path):
+    # Check that invalid tariff files are rejected with a clear message.
+    geldig = (TARIEVEN_MAP / "2025.toml").read_text("utf-8")
+    jaar, stelsel = lees_tarieven(geldig)
+    assert jaar == 2025 and stelsel == belastingstelsels[2025], (
+        "Tariefbestand moet hetzelfde stelsel opleveren"
+    )
+
+    ongeldig = {
+        "versie": geldig.replace("versie = 1", "versie = 2"),
+        "aansluiten": geldig.replace("van = 38441", "van = 38000", 1),
+        "inf": geldig.replace("tot = inf", "tot = 1000000", 1),
+        "getallen": geldig.replace("helling = 0.3582", 'helling = "0.3582"'),
+        "sleutels": geldig.replace("helling = 0.3582", "hellign = 0.3582"),
+        "categorie": geldig.replace("[[heffingskorting]]", "[[heffingkorting]]"),
+    }
+    for naam, inhoud in ongeldig.items():
+        with pytest.raises(ValueError):
+            lees_tarieven(inhoud)
+            pytest.fail(f"Ongeldig tariefbestand ({naam}) is geaccepteerd")
+
+    # Files are only read when a year is requested.
+    (tmp_path / "2030.toml").write_text(ongeldig["versie"], "utf-8")
+    stelsels = Belastingstelsels(tmp_path)
+    assert list(stelsels) == [2030], "Jaren moeten uit de bestandsnamen komen"
+    with pytest.raises(ValueError, match="versie"):
+        stelsels[2030]
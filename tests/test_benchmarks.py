@@ -0,0 +1,17 @@
+import copy
+
+from benchmarks.belasting import draai, vergelijk
+
+
+def test_benchmarks():
+    # Check that a small run produces comparable, machine-readable results.
+    resultaten = draai(groottes=(1, 10), herhalingen=1)
+    assert "bereken_netto_salaris_batch[10]" in resultaten["resultaten"]
+    assert vergelijk(resultaten, resultaten) == []
+
+    sneller = copy.deepcopy(resultaten)
+    for resultaat in sneller["resultaten"].values():
+        resultaat["ns_per_inkomen"] /= 2
+    assert len(vergelijk(resultaten, sneller)) == len(resultaten["resultaten"]), (
+        "Elke benchmark die twee keer zo traag is moet als regressie gemeld worden"
+    )
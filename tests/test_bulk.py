@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+
+from utils.Belasting import Belasting
+from utils.bulk import verwerk
+from utils.Salaris import Salaris
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_verwerk(tmp_path, suffix):
+    # Check that chunked processing gives the same results as Salaris per row.
+    invoer = pd.DataFrame(
+        {
+            "medewerker": ["a", "b", "c", "d", "e"],
+            "bruto_per_maand": [2000, 3500, 5000, 8000, 12000],
+            "percentage_eindejaars": [0, 8.33, 0, 8.33, 0],
+            "bonus": [0, 500, 0, 2500, 10000],
+            "bruto_netto_ruil": [0, 0, 100, 0, 0],
+            "jaar": [2024, 2025, 2024, 2025, 2025],
+        }
+    )
+    invoer.to_csv(tmp_path / "invoer.csv", index=False)
+    uitvoer = tmp_path / f"uitvoer{suffix}"
+
+    aantal = verwerk(tmp_path / "invoer.csv", uitvoer, chunk_grootte=2)
+    assert aantal == len(invoer), "Alle rijen moeten verwerkt zijn"
+
+    resultaat = pd.read_csv(uitvoer) if suffix == ".csv" else pd.read_parquet(uitvoer)
+    assert list(resultaat["medewerker"]) == list(invoer["medewerker"])
+    for rij in resultaat.itertuples():
+        salaris = Salaris(
+            bruto_per_maand=rij.bruto_per_maand,
+            percentage_eindejaars=rij.percentage_eindejaars,
+            bonus=rij.bonus,
+            bruto_netto_ruil=rij.bruto_netto_ruil,
+        )
+        netto = salaris.bereken_netto_jaarlijks(Belasting(jaar=rij.jaar))
+        assert rij.netto_jaarlijks == pytest.approx(netto), (
+            f"Netto salaris van medewerker {rij.medewerker} wijkt af"
+        )
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_verwerk_wisselende_types(tmp_path, suffix):
+    # Check that chunks whose CSV columns infer to different dtypes share one schema.
+    (tmp_path / "invoer.csv").write_text(
+        "medewerker,bruto_per_maand\n1,3000\n2,4000\n3,5000.5\n"
+    )
+    uitvoer = tmp_path / f"uitvoer{suffix}"
+    assert verwerk(tmp_path / "invoer.csv", uitvoer, chunk_grootte=2) == 3
+
+    resultaat = pd.read_csv(uitvoer) if suffix == ".csv" else pd.read_parquet(uitvoer)
+    assert list(resultaat["bruto_per_maand"]) == [3000, 4000, 5000.5]
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_verwerk_leeg(tmp_path, suffix):
+    # Check that an empty input still writes an output file with the result columns.
+    pd.DataFrame({"bruto_per_maand": pd.Series([], dtype="float64")}).to_parquet(
+        tmp_path / "invoer.parquet"
+    )
+    (tmp_path / "invoer.csv").write_text("bruto_per_maand\n")
+    for invoer in (tmp_path / "invoer.parquet", tmp_path / "invoer.csv"):
+        uitvoer = tmp_path / f"uitvoer{suffix}"
+        assert verwerk(invoer, uitvoer) == 0
+        resultaat = (
+            pd.read_csv(uitvoer) if suffix == ".csv" else pd.read_parquet(uitvoer)
+        )
+        assert len(resultaat) == 0, "Uitvoer moet leeg zijn"
+        assert {"bruto_jaarlijks", "netto_jaarlijks"} <= set(resultaat.columns), (
+            f"Uitvoer van {invoer.name} mist de resultaatkolommen"
+        )
@@ -0,0 +1,46 @@
+from utils.cache import (
+    _bereken,
+    belasting_voor_jaar,
+    bereken_salaris,
+    curves_voor_jaar,
+)
+from utils.Salaris import Salaris
+
+
+def test_belasting_voor_jaar():
+    # Check that every year has exactly one shared Belasting.
+    assert belasting_voor_jaar(2025) is belasting_voor_jaar(2025)
+    assert belasting_voor_jaar(2024) is not belasting_voor_jaar(2025)
+
+
+def test_bereken_salaris():
+    # Check that a repeated calculation is served from the cache.
+    salaris = Salaris(bruto_per_maand=4321, percentage_bonus=3, vergoeding=25)
+    berekening = bereken_salaris(2025, salaris=salaris)
+    assert berekening.netto_jaarlijks == salaris.bereken_netto_jaarlijks(
+        belasting_voor_jaar(2025)
+    )
+
+    hits = _bereken.cache_info().hits
+    herhaling = bereken_salaris(
+        2025, salaris=Salaris(4321, percentage_bonus=3, vergoeding=25)
+    )
+    assert herhaling is berekening, "Dezelfde invoer moet uit de cache komen"
+    assert _bereken.cache_info().hits == hits + 1
+
+
+def test_curves_voor_jaar():
+    # Check that the chart curves are shared and run through every kink point.
+    curves = curves_voor_jaar(2025)
+    assert curves_voor_jaar(2025) is curves, "Curves moeten uit de cache komen"
+    assert not curves.netto_jaarlijks.flags.writeable, "Curves moeten alleen-lezen zijn"
+
+    belasting = belasting_voor_jaar(2025)
+    for bruto, netto in zip(
+        curves.bruto_jaarlijks, curves.netto_jaarlijks, strict=True
+    ):
+        assert netto == belasting.bereken_netto_salaris(bruto)
+    knikpunten = belasting.netto_curve.bruto
+    assert set(knikpunten[knikpunten <= 200_000]) <= set(curves.bruto_jaarlijks), (
+        "Alle knikpunten moeten in de curve zitten"
+    )
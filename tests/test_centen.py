@@ -0,0 +1,56 @@
+from decimal import ROUND_FLOOR, Decimal
+
+import numpy as np
+
+from utils.belastingstelsel import belastingstelsels
+from utils.centen import centen_belasting, naar_centen, vergelijk_met_float
+
+
+def _naar_beneden(bedrag: Decimal, eenheid: str) -> Decimal:
+    return bedrag.quantize(Decimal(eenheid), rounding=ROUND_FLOOR)
+
+
+def _netto_decimal(bruto: Decimal, stelsel: dict) -> Decimal:
+    """Reference calculation with Decimal and the same rounding rules."""
+    inkomen = _naar_beneden(bruto, "1")
+    bruto_belasting = Decimal(0)
+    for (a, b), formule in stelsel["schijven"].items():
+        deel = max(min(inkomen, Decimal(str(b))) - Decimal(a), Decimal(0))
+        bruto_belasting += _naar_beneden(Decimal(str(formule.helling)) * deel, "0.01")
+
+    kortingen = Decimal(0)
+    for categorie in ("arbeidskorting", "heffingskorting"):
+        for (a, b), formule in stelsel[categorie].items():
+            if a <= inkomen < b:
+                korting = Decimal(str(formule.basis)) + _naar_beneden(
+                    Decimal(str(formule.helling))
+                    * (inkomen - Decimal(str(formule.anker))),
+                    "0.01",
+                )
+                kortingen += _naar_beneden(korting, "1")
+    return bruto - max(bruto_belasting - kortingen, Decimal(0))
+
+
+def test_centen_exact():
+    # Check the int64 path against an exact Decimal reference.
+    rng = np.random.default_rng(0)
+    bruto = np.round(rng.uniform(0, 250_000, 2_000), 2)
+    for year in belastingstelsels.keys():
+        netto = centen_belasting(year).bereken_netto_salaris(naar_centen(bruto))
+        for x, y in zip(bruto.tolist(), netto.tolist()):
+            verwacht = _netto_decimal(Decimal(str(x)), belastingstelsels[year])
+            assert Decimal(y) / 100 == verwacht, (
+                f"Netto salaris in centen wijkt af bij {x} ({year})"
+            )
+
+
+def test_centen_verschil_met_float():
+    # Quantify the difference with the float path: the rounding steps together can
+    # change the net salary by less than 3 euros.
+    bruto = np.arange(0, 300_000, 0.37)
+    for year in belastingstelsels.keys():
+        verschil = vergelijk_met_float(bruto, year)
+        assert verschil["max_verschil"] < 3, (
+            f"Verschil met de float berekening is te groot ({year})"
+        )
+        assert verschil["gemiddeld_verschil"] < 1
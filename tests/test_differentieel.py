@@ -0,0 +1,257 @@
+"""
+Differentiële tests: de rekenkernen worden met Hypothesis vergeleken met een
+referentie die de tarieven van `belastingstelsels` direct doorloopt, zoals de
+oorspronkelijke scalaire berekening. Alleen daarbij is een kleine afwijking
+toegestaan; rekenkernen die dezelfde tabellen gebruiken, moeten exact gelijk zijn
+aan elkaar. De inkomens zijn deels willekeurig en deels vlak rond de grenzen van de
+tarieven, zoals 11490 en 11491 in de arbeidskorting van 2024.
+
+Met HYPOTHESIS_PROFILE=grondig worden veel meer voorbeelden geprobeerd.
+"""
+
+import math
+import os
+from functools import cache
+
+import numpy as np
+from hypothesis import HealthCheck, given, settings
+from hypothesis import strategies as st
+
+from utils.Belasting import bruto_for_netto, bruto_for_netto_batch
+from utils.belastingstelsel import belastingstelsels
+from utils.cache import belasting_voor_jaar
+from utils.centen import centen_belasting, naar_centen
+from utils.kolommen import SalarisKolommen
+from utils.loonheffing import Loonheffing
+from utils.marginaal import marginale_tarieven
+from utils.meerjarig import meerjarig
+from utils.nettoindex import NettoIndex
+from utils.parallel import (
+    bereken_netto_jaarlijks_parallel,
+    bereken_netto_salaris_parallel,
+)
+from utils.Salaris import Salaris, bruto_per_maand_for_netto
+from utils.sweep import bereken_sweep
+
+settings.register_profile(
+    "snel",
+    max_examples=60,
+    deadline=None,
+    suppress_health_check=[HealthCheck.too_slow],
+)
+settings.register_profile("grondig", max_examples=2_000, deadline=None)
+settings.load_profile(os.environ.get("HYPOTHESIS_PROFILE", "snel"))
+
+JAREN = sorted(belastingstelsels.keys())
+# Afwijkingen door een andere volgorde van optellen of een exacte inverse.
+RELATIEF, ABSOLUUT = 1e-9, 1e-6
+# De grootste daling van het netto salaris op een grens van de tarieven.
+SPRONG = 1.0
+
+
+def _grenzen(*jaren: int) -> list[float]:
+    grenzen = {0.0}
+    for jaar in jaren:
+        for tarieven in belastingstelsels[jaar].values():
+            for ondergrens, bovengrens in tarieven:
+                grenzen.update({ondergrens, bovengrens})
+    return sorted(grens for grens in grenzen if math.isfinite(grens))
+
+
+jaren = st.sampled_from(JAREN)
+inkomens = st.one_of(
+    st.floats(min_value=-1_000, max_value=500_000, allow_nan=False),
+    st.builds(
+        lambda grens, delta: grens + delta,
+        st.sampled_from(_grenzen(*JAREN)),
+        st.sampled_from([-1.0, -0.01, 0.0, 0.01, 1.0]),
+    ),
+)
+salarissen = st.builds(
+    Salaris,
+    # Zo is de bruto-netto ruil nooit hoger dan het bruto maandsalaris.
+    bruto_per_maand=st.floats(min_value=500, max_value=30_000),
+    percentage_vakantiegeld=st.floats(min_value=8, max_value=10),
+    percentage_eindejaars=st.floats(min_value=0, max_value=100 / 12),
+    percentage_bonus=st.floats(min_value=0, max_value=50),
+    percentage_pensioen=st.floats(min_value=0, max_value=20),
+    bonus=st.floats(min_value=0, max_value=20_000),
+    bruto_netto_ruil=st.floats(min_value=0, max_value=500),
+    vergoeding=st.floats(min_value=0, max_value=200),
+)
+
+
+def referentie_korting(jaar: int, bruto_jaarlijks: float, categorie: str) -> float:
+    for (ondergrens, bovengrens), formule in belastingstelsels[jaar][categorie].items():
+        if ondergrens <= max(0, bruto_jaarlijks) < bovengrens:
+            return formule(bruto_jaarlijks)
+    raise ValueError("Salaris is niet gedefinieerd in de tarieven.")
+
+
+def referentie_netto(jaar: int, bruto_jaarlijks: float) -> float:
+    bruto_belasting = 0.0
+    for (ondergrens, bovengrens), formule in belastingstelsels[jaar][
+        "schijven"
+    ].items():
+        deel = max(min(bruto_jaarlijks, bovengrens) - ondergrens, 0)
+        bruto_belasting += formule(deel)
+    kortingen = referentie_korting(
+        jaar, bruto_jaarlijks, "arbeidskorting"
+    ) + referentie_korting(jaar, bruto_jaarlijks, "heffingskorting")
+    return bruto_jaarlijks - max(bruto_belasting - kortingen, 0)
+
+
+def gelijk(waarde: float, verwacht: float) -> bool:
+    return math.isclose(waarde, verwacht, rel_tol=RELATIEF, abs_tol=ABSOLUUT)
+
+
+@given(jaar=jaren, bruto=inkomens)
+def test_scalair(jaar, bruto):
+    # Check the scalar path and the credits against the reference.
+    belasting = belasting_voor_jaar(jaar)
+    assert gelijk(belasting.bereken_netto_salaris(bruto), referentie_netto(jaar, bruto))
+    for soort, categorie in (
+        ("arbeid", "arbeidskorting"),
+        ("heffing", "heffingskorting"),
+    ):
+        korting = belasting.bereken_korting(bruto, soort)
+        assert gelijk(korting, referentie_korting(jaar, bruto, categorie)), (
+            f"{categorie} wijkt af bij {bruto}"
+        )
+        # Bij een negatief inkomen wordt de formule op het inkomen zelf toegepast.
+        # De afbouw van de arbeidskorting bereikt 0 net voor de grens, zoals vlak
+        # onder 129078 in 2025, zodat de korting in de laatste euro een paar cent
+        # negatief kan zijn.
+        if bruto >= 0:
+            assert korting > -0.1, f"{categorie} is negatief bij {bruto}"
+
+    opbouw = belasting.bereken_opbouw(bruto)
+    assert gelijk(opbouw.netto_salaris, belasting.bereken_netto_salaris(bruto))
+
+
+@given(jaar=jaren, bruto=st.lists(inkomens, min_size=1, max_size=50))
+def test_batch_engines(jaar, bruto):
+    # Check the batch engine against the reference and the other engines against it.
+    bruto = np.array(bruto)
+    verwacht = np.array([referentie_netto(jaar, b) for b in bruto])
+    belasting = belasting_voor_jaar(jaar)
+    batch = belasting.bereken_netto_salaris_batch(bruto)
+    assert np.allclose(batch, verwacht, rtol=RELATIEF, atol=1e-4), (
+        "De batch berekening wijkt af van de referentie"
+    )
+
+    # Deze engines rekenen met dezelfde tabellen in dezelfde volgorde, dus zonder
+    # enige afwijking.
+    gelijke_engines = {
+        "bereken_netto_salaris": [belasting.bereken_netto_salaris(b) for b in bruto],
+        "bereken_opbouw_batch": belasting.bereken_opbouw_batch(bruto)["netto_salaris"],
+        "meerjarig": meerjarig().bereken_netto_salaris(bruto)[JAREN.index(jaar)],
+        "parallel": bereken_netto_salaris_parallel(
+            bruto, jaar, processen=2, blok_grootte=16
+        ),
+    }
+    for engine, netto in gelijke_engines.items():
+        assert np.array_equal(netto, batch), f"{engine} wijkt af van de batch"
+
+    # De marginale tarieven beginnen bij een bruto inkomen van 0.
+    marginaal = marginale_tarieven(jaar).netto_salaris(np.maximum(bruto, 0))
+    referentie = np.array([referentie_netto(jaar, b) for b in np.maximum(bruto, 0)])
+    assert np.allclose(marginaal, referentie, rtol=RELATIEF, atol=1e-4), (
+        "marginaal wijkt af van de referentie"
+    )
+
+    # In hele centen wordt het inkomen en de kortingen afgerond op hele euro's.
+    centen = centen_belasting(jaar).bereken_netto_salaris(naar_centen(bruto))
+    assert np.abs(centen / 100 - verwacht).max() < 3, "Centen wijken te veel af"
+
+
+@given(jaar=jaren, salaris=salarissen)
+def test_salaris_engines(jaar, salaris):
+    # Check Salaris against the reference and the column, sweep and parallel engines
+    # against Salaris.
+    belasting = belasting_voor_jaar(jaar)
+    bruto_jaarlijks = salaris.bereken_bruto_jaarlijks()
+    netto_jaarlijks = salaris.bereken_netto_jaarlijks(belasting)
+    assert gelijk(
+        netto_jaarlijks,
+        referentie_netto(jaar, bruto_jaarlijks)
+        + 12 * (salaris.bruto_netto_ruil + salaris.vergoeding),
+    )
+
+    kolommen = SalarisKolommen(
+        **{naam: np.array([waarde]) for naam, waarde in vars(salaris).items()}
+    )
+    batch = Salaris(
+        **{naam: np.array([waarde]) for naam, waarde in vars(salaris).items()}
+    )
+    gelijke_engines = {
+        "kolommen": kolommen.bereken_netto_jaarlijks(belasting),
+        "sweep": bereken_sweep(salaris, belasting).netto_jaarlijks.ravel()[:1],
+        "Salaris batch": batch.bereken_netto_jaarlijks(belasting),
+        "parallel": bereken_netto_jaarlijks_parallel(batch, jaar, processen=1),
+    }
+    for engine, netto in gelijke_engines.items():
+        assert np.array_equal(netto, [netto_jaarlijks]), (
+            f"{engine} wijkt af van Salaris"
+        )
+
+    jaar_loonheffing = Loonheffing(salaris, belasting).bereken_jaar()
+    inhouding = sum(tijdvak.inhouding for tijdvak in jaar_loonheffing)
+    assert math.isclose(
+        inhouding,
+        belasting.bereken_netto_belasting(bruto_jaarlijks),
+        rel_tol=RELATIEF,
+        abs_tol=1e-4,
+    ), "De loonheffing telt niet op tot de jaarbelasting"
+
+
+@given(
+    jaar=jaren,
+    bruto=st.lists(st.floats(min_value=1, max_value=500_000), min_size=1, max_size=50),
+)
+def test_inverse(jaar, bruto):
+    # Check that every inverse returns the lowest income reaching the target.
+    belasting = belasting_voor_jaar(jaar)
+    netto = np.array([referentie_netto(jaar, b) for b in bruto])
+    gevonden = bruto_for_netto_batch(netto, belasting)
+
+    for doel, b, g in zip(netto, bruto, gevonden, strict=True):
+        assert g <= b + ABSOLUUT * max(1, b), f"Inverse van {doel} is niet de laagste"
+        assert math.isclose(referentie_netto(jaar, g), doel, rel_tol=1e-9, abs_tol=1e-4)
+    assert gelijk(bruto_for_netto(netto[0], belasting), gevonden[0])
+
+    index = _netto_index()
+    assert np.allclose(index.netto(np.array(bruto), jaar), netto, atol=1e-4)
+    assert np.allclose(index.bruto(netto, jaar), gevonden, rtol=1e-9, atol=1e-4)
+
+
+@given(jaar=jaren, salaris=salarissen, extra=st.floats(min_value=0, max_value=2_000))
+def test_bruto_per_maand_for_netto(jaar, salaris, extra):
+    # Check the monthly inverse by recomputing the netto salary it gives.
+    belasting = belasting_voor_jaar(jaar)
+    doel = salaris.bereken_netto_jaarlijks(belasting) + extra
+    bruto_per_maand = bruto_per_maand_for_netto(doel, salaris, belasting)
+    netto = salaris.met_bruto_per_maand(bruto_per_maand).bereken_netto_jaarlijks(
+        belasting
+    )
+    assert math.isclose(netto, doel, rel_tol=1e-9, abs_tol=1e-4)
+
+
+@given(jaar=jaren, bruto=st.lists(inkomens, min_size=2, max_size=50))
+def test_monotoon(jaar, bruto):
+    # Check that a higher gross income never gives a lower netto salary.
+    bruto = np.sort(np.array(bruto))
+    netto = belasting_voor_jaar(jaar).bereken_netto_salaris_batch(bruto)
+    # Tarieven met een verschoven anker, zoals 'x - 24812' vanaf 24813 in de
+    # heffingskorting van 2024, geven op een grens een sprong van enkele centen.
+    grenzen = np.array(_grenzen(jaar))
+    over_grens = np.searchsorted(grenzen, bruto[1:], side="right") > np.searchsorted(
+        grenzen, bruto[:-1], side="right"
+    )
+    toegestaan = np.where(over_grens, -SPRONG, -ABSOLUUT)
+    assert (np.diff(netto) >= toegestaan).all(), "Netto salaris daalt met het bruto"
+
+
+@cache
+def _netto_index() -> NettoIndex:
+    return NettoIndex.bouw()
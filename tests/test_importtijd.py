@@ -0,0 +1,71 @@
+import ast
+import subprocess
+import sys
+from pathlib import Path
+
+# Het maximale aantal milliseconden voor het importeren van de rekenkern.
+BUDGET_MS = 100
+# De budgetten van de entrypoints, die ook asyncio, argparse of pandas laden, en de
+# modules die ze niet mogen laden.
+ENTRYPUNTEN = {
+    "utils.server": (250, ("numpy", "scipy", "pandas", "pyarrow")),
+    "utils.bulk": (1_500, ("scipy",)),
+}
+
+ZWARE_MODULES = ("numpy", "scipy", "pandas", "pyarrow")
+
+
+def _importtijden(module: str) -> dict[str, int]:
+    """Geef per geïmporteerde module de cumulatieve importtijd in microseconden."""
+    resultaat = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    tijden = {}
+    for regel in resultaat.stderr.splitlines():
+        if not regel.startswith("import time:") or "cumulative" in regel:
+            continue
+        _, cumulatief, naam = regel.removeprefix("import time:").split("|")
+        tijden[naam.strip()] = int(cumulatief)
+    return tijden
+
+
+def _controleer(module: str, budget_ms: float, verboden: tuple[str, ...]) -> None:
+    tijden = _importtijden(module)
+    zwaar = [naam for naam in tijden if naam.split(".")[0] in verboden]
+    assert not zwaar, f"Import van {module} laadt {', '.join(zwaar)}"
+    assert tijden[module] / 1000 < budget_ms, (
+        f"Import van {module} duurt {tijden[module] / 1000:.1f} ms, "
+        f"het budget is {budget_ms} ms"
+    )
+
+
+def _app_modules() -> list[str]:
+    """De modules uit 'utils' die app.py bovenaan importeert."""
+    app = ast.parse((Path(__file__).parent.parent / "app.py").read_text("utf-8"))
+    modules = []
+    for knoop in app.body:
+        if isinstance(knoop, ast.Import):
+            modules += [alias.name for alias in knoop.names]
+        elif isinstance(knoop, ast.ImportFrom) and knoop.module == "utils":
+            modules += [f"utils.{alias.name}" for alias in knoop.names]
+        elif isinstance(knoop, ast.ImportFrom):
+            modules.append(knoop.module)
+    return [module for module in modules if module.startswith("utils.")]
+
+
+def test_importtijd_entrypunten():
+    # Check the server, the bulk command and the modules the app imports at startup.
+    for module, (budget_ms, verboden) in ENTRYPUNTEN.items():
+        _controleer(module, budget_ms, verboden)
+    for module in _app_modules():
+        _controleer(module, BUDGET_MS, ZWARE_MODULES)
+
+
+def test_importtijd_rekenkern():
+    # Check that the calculation core starts without heavy dependencies and in budget.
+    for module in ("utils.Belasting", "utils.Salaris", "utils.cache"):
+        _controleer(module, BUDGET_MS, ZWARE_MODULES)
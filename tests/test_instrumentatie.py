@@ -0,0 +1,89 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import instrumentatie
+from utils.Belasting import Belasting, bruto_for_netto
+from utils.cache import bereken_salaris
+
+
+def test_profiel():
+    # Calls are only measured inside the block and the methods are restored after.
+    origineel = Belasting.bereken_netto_salaris
+    belasting = Belasting(jaar=2025)
+
+    with instrumentatie.profiel() as meting:
+        assert Belasting.bereken_netto_salaris is not origineel
+        for bruto in (20_000, 50_000, 90_000):
+            belasting.bereken_netto_salaris(bruto)
+        belasting.bereken_netto_salaris_batch([20_000.0, 50_000.0])
+        metingen = meting.naar_dict()["metingen"]
+        bruto_for_netto(30_000, belasting)
+        bereken_salaris(2025, bruto_jaarlijks=123_456)
+        bereken_salaris(2025, bruto_jaarlijks=123_456)
+
+    assert Belasting.bereken_netto_salaris is origineel, "Methode is niet teruggezet"
+    assert not instrumentatie.actief(), "Instrumentatie staat nog aan"
+
+    netto = metingen["Belasting.bereken_netto_salaris"]
+    assert netto["aantal"] == 3, "Aantal aanroepen klopt niet"
+    assert sum(netto["histogram"].values()) == 3, "Histogram is onvolledig"
+    batch = metingen["Belasting.bereken_netto_salaris_batch"]
+    assert batch["invoer"] == 2, "Aantal invoerwaarden klopt niet"
+
+    gegevens = json.loads(meting.naar_json())
+    assert gegevens["metingen"]["bruto_for_netto"]["aantal"] == 1
+    cache = gegevens["caches"]["bereken_salaris"]
+    assert cache["treffers"] == 1 and cache["missers"] == 1, "Cachetelling klopt niet"
+    assert cache["trefkans"] == 0.5
+
+    # Calls after the block are not counted.
+    aantal = gegevens["metingen"]["Belasting.bereken_netto_salaris"]["aantal"]
+    belasting.bereken_netto_salaris(20_000)
+    prometheus = meting.naar_prometheus()
+    assert (
+        f'salaris_aanroepen_total{{functie="Belasting.bereken_netto_salaris"}} {aantal}'
+        in prometheus
+    ), "Aanroepen buiten het blok zijn meegeteld"
+    assert (
+        'salaris_duur_seconden_bucket{functie="Belasting.bereken_netto_salaris",'
+        f'le="+Inf"}} {aantal}' in prometheus
+    ), "Histogram in Prometheus-formaat klopt niet"
+
+
+def test_prometheus_families():
+    # Every family has its HELP and TYPE lines directly followed by all its samples.
+    with instrumentatie.profiel() as meting:
+        Belasting(jaar=2025).bereken_netto_salaris(50_000)
+    regels = meting.naar_prometheus().splitlines()
+
+    families = [regel.split()[2] for regel in regels if regel.startswith("# TYPE")]
+    assert "salaris_aanroepen_total" in families, "Counters moeten op _total eindigen"
+    gezien = []
+    for i, regel in enumerate(regels):
+        if regel.startswith("# HELP"):
+            familie = regel.split()[2]
+            assert regels[i + 1].startswith(f"# TYPE {familie} "), (
+                f"TYPE volgt niet direct op HELP van {familie}"
+            )
+            gezien.append(familie)
+        elif not regel.startswith("#"):
+            assert regel.startswith(gezien[-1]), (
+                f"{regel} staat in de verkeerde familie"
+            )
+    assert gezien == families and len(set(gezien)) == len(gezien), (
+        "Elke familie moet precies één keer voorkomen"
+    )
+
+
+def test_aan_uit_gelijktijdig():
+    # Switching on and off from many threads always restores the original methods.
+    origineel = Belasting.bereken_netto_salaris
+
+    def meet(_):
+        with instrumentatie.profiel():
+            Belasting(jaar=2025).bereken_netto_salaris(50_000)
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(meet, range(200)))
+    assert Belasting.bereken_netto_salaris is origineel, "Methode is niet teruggezet"
+    assert not instrumentatie.actief()
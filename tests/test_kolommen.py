@@ -0,0 +1,43 @@
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from utils.Belasting import Belasting
+from utils.kolommen import SalarisKolommen
+from utils.Salaris import Salaris
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+def test_salariskolommen(tmp_path, suffix):
+    # Round-trip through a file and compare with Salaris per row.
+    tabel = pa.table(
+        {
+            "bruto_per_maand": [2000.0, 3500.0, 5000.0, 8000.0],
+            "percentage_eindejaars": [0, 8.33, None, 8.33],
+            "bonus": [0.0, 500.0, 0.0, 2500.0],
+        }
+    )
+    kolommen = SalarisKolommen.van_arrow(tabel)
+    kolommen.schrijf(tmp_path / f"salarissen{suffix}")
+    gelezen = SalarisKolommen.lees(tmp_path / f"salarissen{suffix}")
+
+    assert len(gelezen) == 4, "Aantal rijen wijkt af"
+    assert gelezen.percentage_vakantiegeld.tolist() == [8.0] * 4
+    assert gelezen.percentage_eindejaars.tolist() == [0, 8.33, 0, 8.33]
+    if suffix == ".arrow":
+        assert not gelezen.bruto_per_maand.flags.owndata, "Kolom is gekopieerd"
+
+    belasting = Belasting(jaar=2025)
+    netto = gelezen.bereken_netto_jaarlijks(belasting)
+    for i in range(len(gelezen)):
+        salaris = Salaris(
+            bruto_per_maand=tabel["bruto_per_maand"][i].as_py(),
+            percentage_eindejaars=gelezen.percentage_eindejaars[i],
+            bonus=tabel["bonus"][i].as_py(),
+        )
+        assert netto[i] == pytest.approx(salaris.bereken_netto_jaarlijks(belasting))
+
+    # Float64 columns without nulls are used without a copy.
+    assert np.shares_memory(
+        kolommen.bonus, SalarisKolommen.van_arrow(kolommen.naar_arrow()).bonus
+    ), "Kolom is gekopieerd"
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from utils.Belasting import Belasting
+from utils.loonheffing import Loonheffing
+from utils.Salaris import Salaris
+
+
+@pytest.mark.parametrize("perioden", [12, 13])
+def test_loonheffing_cumulatief(perioden):
+    # Over a full year the cumulative method withholds exactly the annual tax.
+    belasting = Belasting(jaar=2025)
+    salaris = Salaris(
+        bruto_per_maand=np.linspace(1_500, 15_000, 200),
+        percentage_eindejaars=8.33,
+        percentage_bonus=5,
+        percentage_pensioen=4,
+        bonus=1_000,
+        bruto_netto_ruil=50,
+        vergoeding=25,
+    )
+    loonheffing = Loonheffing(salaris, belasting, perioden=perioden)
+    tijdvakken = loonheffing.bereken_jaar()
+
+    assert len(tijdvakken) == perioden, "Aantal tijdvakken klopt niet"
+    assert np.allclose(
+        sum(t.loon for t in tijdvakken), salaris.bereken_bruto_jaarlijks()
+    ), "Loon over het jaar wijkt af van het bruto jaarinkomen"
+    assert np.allclose(
+        sum(t.netto for t in tijdvakken), salaris.bereken_netto_jaarlijks(belasting)
+    ), "Netto loon over het jaar wijkt af van het netto jaarsalaris"
+    with pytest.raises(StopIteration):
+        loonheffing.volgende()
+
+
+def test_loonheffing_tijdvak():
+    # Without special payments the period method also withholds the annual tax.
+    belasting = Belasting(jaar=2024)
+    salaris = Salaris(
+        bruto_per_maand=np.array([2_000.0, 5_000.0]), percentage_vakantiegeld=0
+    )
+    tijdvakken = Loonheffing(salaris, belasting, methode="tijdvak").bereken_jaar()
+    assert np.allclose(
+        sum(t.netto for t in tijdvakken), salaris.bereken_netto_jaarlijks(belasting)
+    ), "Netto loon over het jaar wijkt af van het netto jaarsalaris"
+
+    # Holiday pay is taxed at the rate on top of the regular annual wage.
+    salaris = Salaris(bruto_per_maand=np.array([2_000.0, 5_000.0]))
+    mei = Loonheffing(salaris, belasting, methode="tijdvak").bereken_jaar()[4]
+    regulier = 12 * salaris.bruto_per_maand
+    vakantiegeld = regulier * 0.08
+    verwacht = (regulier - belasting.bereken_netto_salaris_batch(regulier)) / 12 + (
+        vakantiegeld
+        - belasting.bereken_netto_salaris_batch(regulier + vakantiegeld)
+        + belasting.bereken_netto_salaris_batch(regulier)
+    )
+    assert np.allclose(mei.inhouding, verwacht), "Inhouding over vakantiegeld wijkt af"
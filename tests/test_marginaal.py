@@ -0,0 +1,40 @@
+import numpy as np
+
+from utils.Belasting import Belasting
+from utils.belastingstelsel import belastingstelsels
+from utils.marginaal import marginale_tarieven
+
+
+def test_marginale_tarieven():
+    # Check the segment rates against finite differences of the exact calculation.
+    for year in belastingstelsels.keys():
+        belasting = Belasting(jaar=year)
+        tarieven = marginale_tarieven(year)
+
+        segmenten = tarieven.segmenten()
+        assert segmenten[0].van == 0, "Segmenten beginnen niet bij 0"
+        assert segmenten[-1].tot == float("inf"), "Laatste segment is begrensd"
+        for vorige, segment in zip(segmenten, segmenten[1:]):
+            assert vorige.tot == segment.van, "Segmenten sluiten niet aan"
+
+        for segment in segmenten[:-1]:
+            midden = (segment.van + segment.tot) / 2
+            stap = belasting.bereken_netto_salaris(
+                midden + 0.5
+            ) - belasting.bereken_netto_salaris(midden - 0.5)
+            assert np.isclose(tarieven.tarief(midden), 1 - stap), (
+                f"Marginaal tarief wijkt af bij {midden}"
+            )
+
+        bruto = np.linspace(0, 300_000, 30_001)
+        assert np.allclose(
+            tarieven.extra_netto(bruto),
+            belasting.bereken_netto_salaris_batch(bruto + 1_000)
+            - belasting.bereken_netto_salaris_batch(bruto),
+            rtol=0,
+            atol=1e-6,
+        ), "Extra netto wijkt af"
+
+        for gebied in tarieven.armoedevallen(0.5):
+            assert gebied.tarief > 0.5, "Armoedeval onder de drempel"
+            assert tarieven.tarief(gebied.van) > 0.5, "Tarief onder de drempel"
@@ -0,0 +1,50 @@
+import numpy as np
+
+from utils.Belasting import Belasting
+from utils.belastingstelsel import belastingstelsels
+from utils.meerjarig import meerjarig
+from utils.Salaris import Salaris
+
+
+def test_meerjarig():
+    # Check that the stacked evaluation equals the per-year batch calculation.
+    rng = np.random.default_rng(0)
+    bruto = np.concatenate(
+        [rng.uniform(-1_000, 300_000, 10_000), np.linspace(0, 200_000, 2_001)]
+    )
+    stapel = meerjarig()
+    assert stapel.jaren == tuple(sorted(belastingstelsels.keys()))
+
+    netto = stapel.bereken_netto_salaris(bruto)
+    assert netto.shape == (len(stapel.jaren), len(bruto)), "Matrix heeft andere vorm"
+    for rij, year in enumerate(stapel.jaren):
+        verwacht = Belasting(jaar=year).bereken_netto_salaris_batch(bruto)
+        assert np.array_equal(netto[rij], verwacht), (
+            f"Netto salaris van {year} wijkt af van de berekening per jaar"
+        )
+
+    salaris = Salaris(
+        bruto_per_maand=np.array([2_500.0, 6_000.0]),
+        bruto_netto_ruil=100,
+        vergoeding=50,
+    )
+    netto_salaris = stapel.bereken_netto_jaarlijks(salaris)
+    for rij, year in enumerate(stapel.jaren):
+        assert np.array_equal(
+            netto_salaris[rij], salaris.bereken_netto_jaarlijks(Belasting(jaar=year))
+        ), f"Netto jaarsalaris van {year} wijkt af"
+
+
+def test_bereken_chunk_alle_jaren():
+    # Check that the bulk calculation adds a netto column per tax year.
+    import pandas as pd
+
+    from utils.bulk import bereken_chunk
+
+    chunk = pd.DataFrame({"bruto_per_maand": [2_500.0, 4_000.0], "vergoeding": 50})
+    resultaat = bereken_chunk(chunk, jaar=2025, alle_jaren=True)
+    for year in belastingstelsels.keys():
+        assert f"netto_{year}" in resultaat, f"Kolom voor {year} ontbreekt"
+    assert np.array_equal(resultaat["netto_2025"], resultaat["netto_jaarlijks"]), (
+        "Netto van het gekozen jaar wijkt af"
+    )
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from utils.Belasting import Belasting, bruto_for_netto_batch
+from utils.belastingstelsel import belastingstelsels
+from utils.nettoindex import NettoIndex
+from utils.Salaris import Salaris
+
+
+def test_nettoindex(tmp_path):
+    # Check that interpolation between the knots matches the exact calculation.
+    profiel = Salaris(bruto_per_maand=0, percentage_eindejaars=100 / 12, bonus=1500)
+    NettoIndex.bouw(profielen={"cao": profiel}).opslaan(tmp_path / "index.npz")
+    index = NettoIndex.laden(tmp_path / "index.npz")
+
+    bruto = np.linspace(0, 400_000, 40_001)
+    bruto_per_maand = np.linspace(0, 20_000, 2_001)
+    for year in belastingstelsels.keys():
+        belasting = Belasting(jaar=year)
+        netto = belasting.bereken_netto_salaris_batch(bruto)
+        assert np.allclose(index.netto(bruto, year), netto, rtol=0, atol=1e-6)
+        assert np.allclose(
+            index.bruto(netto[1:], year),
+            bruto_for_netto_batch(netto[1:], belasting),
+            rtol=0,
+            atol=1e-6,
+        )
+
+        netto_profiel = profiel.met_bruto_per_maand(bruto_per_maand)
+        netto_profiel = netto_profiel.bereken_netto_jaarlijks(belasting)
+        assert np.allclose(
+            index.netto(bruto_per_maand, year, "cao"), netto_profiel, rtol=0, atol=1e-6
+        )
+        assert np.allclose(
+            index.bruto(netto_profiel, year, "cao"), bruto_per_maand, rtol=0, atol=1e-6
+        )
+
+
+def test_nettoindex_ongeldig_profiel():
+    # A profile whose annual income does not rise with the monthly salary is rejected.
+    profiel = Salaris(
+        bruto_per_maand=3_000, percentage_vakantiegeld=0, percentage_pensioen=100
+    )
+    with pytest.raises(ValueError, match="stijgen"):
+        NettoIndex.bouw(jaren=[2025], profielen={"alles_pensioen": profiel})
@@ -0,0 +1,50 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils import parallel
+from utils.Belasting import Belasting
+from utils.parallel import bereken_netto_salaris_parallel
+
+
+def test_netto_salaris_parallel():
+    # Check that sharding over processes keeps the order and the batch results.
+    bruto = np.linspace(0, 250_000, 10_001)
+    jaren = np.where(np.arange(bruto.size) % 3 == 0, 2024, 2025)
+    netto = bereken_netto_salaris_parallel(bruto, jaren, processen=2, blok_grootte=999)
+
+    for year in (2024, 2025):
+        rijen = jaren == year
+        verwacht = Belasting(jaar=year).bereken_netto_salaris_batch(bruto[rijen])
+        assert (netto[rijen] == verwacht).all(), (
+            f"Parallelle berekening ({year}) wijkt af van de batch berekening"
+        )
+
+
+def test_netto_salaris_parallel_enkel_jaar():
+    # Check the single-year path and that a second call reuses the process pool.
+    bruto = np.linspace(0, 250_000, 5_001)
+    verwacht = Belasting(jaar=2025).bereken_netto_salaris_batch(bruto)
+    pools = []
+    for jaar in (2025, np.broadcast_to(np.int64(2025), bruto.shape)):
+        netto = bereken_netto_salaris_parallel(
+            bruto, jaar, processen=2, blok_grootte=999
+        )
+        assert (netto == verwacht).all(), "Eén jaar voor alle inkomens wijkt af"
+        pools.append(dict(parallel._pools))
+    assert pools[0] == pools[1], "De pool moet hergebruikt worden"
+
+
+def test_netto_salaris_parallel_gelijktijdig():
+    # Calls with a different number of processes from other threads do not break.
+    bruto = np.linspace(0, 250_000, 5_001)
+    verwacht = Belasting(jaar=2024).bereken_netto_salaris_batch(bruto)
+
+    def bereken(processen):
+        return bereken_netto_salaris_parallel(
+            bruto, 2024, processen=processen, blok_grootte=499
+        )
+
+    with ThreadPoolExecutor(4) as threads:
+        for netto in threads.map(bereken, [2, 3, 2, 3, 4, 2, 4, 3]):
+            assert (netto == verwacht).all(), "Gelijktijdige berekening wijkt af"
@@ -0,0 +1,87 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.bulk import verwerk
+from utils.resultaatcache import ResultaatCache
+
+
+def test_resultaatcache(tmp_path):
+    # Check that stored columns come back memory-mapped and that keys follow content.
+    cache = ResultaatCache(tmp_path)
+    bruto = np.array([30_000.0, 60_000.0])
+    sleutel = cache.sleutel({"bruto": bruto}, jaren=[2025])
+    assert cache.lees(sleutel) is None, "Een lege cache kan niets teruggeven"
+
+    cache.schrijf(sleutel, {"netto": bruto * 0.7})
+    kolommen = cache.lees(sleutel)
+    assert isinstance(kolommen["netto"], np.memmap), "Kolommen moeten gemapt zijn"
+    assert np.array_equal(kolommen["netto"], bruto * 0.7)
+    assert (cache.treffers, cache.missers) == (1, 1)
+
+    assert sleutel == cache.sleutel({"bruto": bruto.copy()}, jaren=[2025])
+    for andere in (
+        cache.sleutel({"bruto": bruto + 1}, jaren=[2025]),
+        cache.sleutel({"bruto": bruto}, jaren=[2024]),
+        cache.sleutel({"bruto": bruto}, jaren=[2025], variant="alle_jaren"),
+    ):
+        assert andere != sleutel, "Andere invoer moet een andere sleutel geven"
+
+
+def test_opruimen(tmp_path):
+    # Check eviction of entries that are too old and then of the least recently used.
+    cache = ResultaatCache(tmp_path, max_leeftijd=3600)
+    for i in range(4):
+        cache.schrijf(f"ingang{i}", {"kolom": np.zeros(1_000)})
+    oud = time.time() - 7200
+    os.utime(tmp_path / "ingang0", (oud, oud))
+    os.utime(tmp_path / "ingang1", (oud + 4000, oud + 4000))
+
+    assert cache.opruimen() == 1, "Alleen de te oude ingang moet verdwijnen"
+    assert cache.lees("ingang0") is None
+
+    cache.max_grootte = 2 * 8_200
+    assert cache.opruimen() == 1, "De minst recent gebruikte ingang moet verdwijnen"
+    assert cache.lees("ingang1") is None
+    assert cache.lees("ingang2") is not None and cache.lees("ingang3") is not None
+
+
+def test_beschadigde_ingang(tmp_path):
+    # Check that a damaged entry is removed on reading so it can be written again.
+    cache = ResultaatCache(tmp_path)
+    cache.schrijf("ingang", {"kolom": np.arange(1_000.0)})
+    pad = tmp_path / "ingang" / "kolom.npy"
+    pad.write_bytes(pad.read_bytes()[:200])
+
+    assert cache.lees("ingang") is None, "Een beschadigde ingang is een misser"
+    assert not (tmp_path / "ingang").exists(), "De beschadigde ingang moet weg"
+    cache.schrijf("ingang", {"kolom": np.arange(1_000.0)})
+    assert np.array_equal(cache.lees("ingang")["kolom"], np.arange(1_000.0))
+
+
+def test_verwerk_met_cache(tmp_path):
+    # Check that a second run takes unchanged chunks from the cache.
+    invoer = pd.DataFrame(
+        {
+            "bruto_per_maand": [2000.0, 3500, 5000, 8000, 12000],
+            "jaar": [2024, 2025, 2024, 2025, 2025],
+        }
+    )
+    invoer.to_csv(tmp_path / "invoer.csv", index=False)
+
+    cache = ResultaatCache(tmp_path / "cache")
+    verwerk(tmp_path / "invoer.csv", tmp_path / "eerste.csv", 2, cache=cache)
+    assert (cache.treffers, cache.missers) == (0, 3)
+
+    invoer.loc[4, "bruto_per_maand"] = 13000
+    invoer.to_csv(tmp_path / "invoer.csv", index=False)
+    verwerk(tmp_path / "invoer.csv", tmp_path / "tweede.csv", 2, cache=cache)
+    assert (cache.treffers, cache.missers) == (2, 4), "Alleen het laatste blok is nieuw"
+
+    zonder_cache = verwerk(tmp_path / "invoer.csv", tmp_path / "derde.csv", 2)
+    assert zonder_cache == len(invoer)
+    pd.testing.assert_frame_equal(
+        pd.read_csv(tmp_path / "tweede.csv"), pd.read_csv(tmp_path / "derde.csv")
+    )
@@ -0,0 +1,25 @@
+from utils.Belasting import Belasting
+from utils.belastingstelsel import belastingstelsels
+from utils.Salaris import Salaris, bruto_per_maand_for_netto
+
+
+def test_bruto_per_maand_for_netto():
+    # Check that the monthly inverse reproduces the target with the same percentages.
+    salaris = Salaris(
+        bruto_per_maand=3500,
+        percentage_eindejaars=100 / 12,
+        percentage_bonus=5,
+        percentage_pensioen=4,
+        bonus=1000,
+        bruto_netto_ruil=100,
+        vergoeding=30,
+    )
+    for year in belastingstelsels.keys():
+        belasting = Belasting(jaar=year)
+        for doel in (25_000, 40_000, 90_000):
+            bruto_per_maand = bruto_per_maand_for_netto(doel, salaris, belasting)
+            salaris.bruto_per_maand = bruto_per_maand
+            netto = salaris.bereken_netto_jaarlijks(belasting)
+            assert abs(netto - doel) < 1e-6, (
+                f"Netto {netto} ({year}) wijkt af van het doel {doel}"
+            )
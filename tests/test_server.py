@@ -0,0 +1,138 @@
+import asyncio
+import json
+
+import pytest
+
+from utils.Belasting import Belasting, bruto_for_netto
+from utils.Salaris import Salaris
+from utils.server import MicroBatcher, Server
+
+
+async def _post(port: int, pad: str, verzoek: dict) -> tuple[int, dict]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(verzoek).encode()
+    writer.write(
+        f"POST {pad} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n".encode()
+        + body
+    )
+    await writer.drain()
+    antwoord = await reader.read()
+    writer.close()
+    kop, _, inhoud = antwoord.partition(b"\r\n\r\n")
+    return int(kop.split()[1]), json.loads(inhoud)
+
+
+async def _met_server(functie):
+    batcher = MicroBatcher(venster_ms=5)
+    server = await Server(batcher).start("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        return batcher, await functie(port)
+
+
+def test_server_batcht_gelijktijdige_verzoeken():
+    # Concurrent requests are answered correctly and evaluated in a single batch
+    belasting = Belasting(jaar=2025)
+    bruto = [20_000 + 997 * i for i in range(50)]
+
+    async def verzoeken(port):
+        return await asyncio.gather(
+            *(
+                _post(port, "/netto", {"jaar": 2025, "bruto_jaarlijks": x})
+                for x in bruto
+            )
+        )
+
+    batcher, antwoorden = asyncio.run(_met_server(verzoeken))
+    for x, (status, antwoord) in zip(bruto, antwoorden):
+        assert status == 200, "Verzoek is niet gelukt"
+        assert antwoord["netto_jaarlijks"] == pytest.approx(
+            belasting.bereken_netto_salaris(x)
+        ), "Netto salaris wijkt af van de scalaire berekening"
+    assert batcher.aantal_batches < len(bruto), "Verzoeken zijn niet gebundeld"
+
+
+def test_server_endpoints():
+    # Breakdown, inversion, Salaris input and error responses
+    belasting = Belasting(jaar=2024)
+    salaris = Salaris(bruto_per_maand=4_000, bruto_netto_ruil=50)
+
+    async def verzoeken(port):
+        return await asyncio.gather(
+            _post(port, "/opbouw", {"jaar": 2024, "bruto_jaarlijks": 60_000}),
+            _post(port, "/bruto", {"jaar": 2024, "netto_jaarlijks": 40_000}),
+            _post(port, "/bruto", {"jaar": 2024, "netto_jaarlijks": -1}),
+            _post(
+                port,
+                "/netto",
+                {
+                    "jaar": 2024,
+                    "salaris": {"bruto_per_maand": 4_000, "bruto_netto_ruil": 50},
+                },
+            ),
+            _post(port, "/netto", {"jaar": 1999, "bruto_jaarlijks": 1}),
+            _post(port, "/onbekend", {}),
+        )
+
+    _, (opbouw, bruto, onbereikbaar, netto, jaar, pad) = asyncio.run(
+        _met_server(verzoeken)
+    )
+    verwacht = belasting.bereken_opbouw(60_000)
+    assert opbouw[0] == 200, "Opbouw is niet gelukt"
+    assert opbouw[1]["netto_salaris"] == pytest.approx(verwacht.netto_salaris)
+    assert opbouw[1]["arbeidskorting"] == pytest.approx(verwacht.arbeidskorting)
+    assert bruto[1]["bruto_jaarlijks"] == pytest.approx(
+        bruto_for_netto(40_000, belasting)
+    ), "Inverse wijkt af"
+    assert onbereikbaar[0] == 422, "Onbereikbaar netto doel geeft geen fout"
+    assert netto[1]["netto_jaarlijks"] == pytest.approx(
+        salaris.bereken_netto_jaarlijks(belasting)
+    ), "Netto jaarsalaris van Salaris wijkt af"
+    assert jaar[0] == 400, "Onbekend jaar geeft geen fout"
+    assert pad[0] == 404, "Onbekend endpoint geeft geen fout"
+
+
+def test_server_ongeldig_verzoek_in_batch():
+    # One bad request must not fail the other requests in the same batch.
+    belasting = Belasting(jaar=2025)
+
+    async def verzoeken(port):
+        return await asyncio.gather(
+            _post(port, "/netto", {"jaar": 2025, "bruto_jaarlijks": 40_000}),
+            _post(port, "/netto", {"jaar": 2025, "bruto_jaarlijks": "nan"}),
+            _post(port, "/netto", {"jaar": 2025, "bruto_jaarlijks": "Infinity"}),
+            _post(port, "/netto", {"jaar": 2025, "bruto_jaarlijks": 60_000}),
+            _post(port, "/bruto", {"jaar": 2025, "netto_jaarlijks": 30_000}),
+            _post(port, "/bruto", {"jaar": 2025, "netto_jaarlijks": -1}),
+            _post(port, "/bruto", {"jaar": 2025, "netto_jaarlijks": 45_000}),
+        )
+
+    _, antwoorden = asyncio.run(_met_server(verzoeken))
+    statussen = [status for status, _ in antwoorden]
+    assert statussen == [200, 400, 400, 200, 200, 422, 200], (
+        "Alleen de ongeldige verzoeken mogen mislukken"
+    )
+    assert antwoorden[3][1]["netto_jaarlijks"] == pytest.approx(
+        belasting.bereken_netto_salaris(60_000)
+    )
+    assert antwoorden[6][1]["bruto_jaarlijks"] == pytest.approx(
+        bruto_for_netto(45_000, belasting)
+    )
+
+
+def test_batcher_rekent_per_waarde_na_fout():
+    # When a batch raises, every value is evaluated on its own.
+    async def bereken():
+        batcher = MicroBatcher(venster_ms=5)
+        return await asyncio.gather(
+            batcher.bereken("netto", 2025, 40_000.0),
+            batcher.bereken("netto", 2025, float("nan")),
+            return_exceptions=True,
+        )
+
+    goed, fout = asyncio.run(bereken())
+    assert goed["netto_jaarlijks"] == pytest.approx(
+        Belasting(jaar=2025).bereken_netto_salaris(40_000)
+    )
+    assert isinstance(fout, ValueError), "De ongeldige waarde moet een fout geven"
@@ -0,0 +1,53 @@
+import numpy as np
+
+from utils.Belasting import Belasting
+from utils.marginaal import marginale_tarieven
+from utils.Salaris import Salaris
+from utils.sweep import bereken_sweep
+from utils.tabellen import compileer_stelsel
+
+
+def test_sweep():
+    # Check every grid point against a separately calculated Salaris.
+    belasting = Belasting(jaar=2025)
+    basis = Salaris(bruto_per_maand=4_000, percentage_eindejaars=8.33, vergoeding=100)
+    maand = np.linspace(1_000, 12_000, 12)
+    bonus = [0, 5, 10]
+    pensioen = [0, 4.5]
+    ruil = [0, 150]
+
+    sweep = bereken_sweep(basis, belasting, maand, bonus, pensioen, ruil)
+    assert sweep.netto_jaarlijks.shape == (12, 3, 2, 2), "Rooster heeft een andere vorm"
+
+    for i, j, k, m in np.ndindex(sweep.netto_jaarlijks.shape):
+        salaris = Salaris(
+            bruto_per_maand=maand[i],
+            percentage_eindejaars=8.33,
+            percentage_bonus=bonus[j],
+            percentage_pensioen=pensioen[k],
+            bruto_netto_ruil=ruil[m],
+            vergoeding=100,
+        )
+        bruto = salaris.bereken_bruto_jaarlijks()
+        assert sweep.bruto_jaarlijks[i, j, k, m] == bruto, "Bruto wijkt af"
+        assert sweep.netto_jaarlijks[i, j, k, m] == salaris.bereken_netto_jaarlijks(
+            belasting
+        ), "Netto wijkt af"
+
+        stap = belasting.bereken_netto_salaris(
+            bruto + 1
+        ) - belasting.bereken_netto_salaris(bruto)
+        assert np.isclose(sweep.marginaal_tarief[i, j, k, m], 1 - stap), (
+            "Marginaal tarief wijkt af"
+        )
+
+
+def test_sweep_eigen_stelsel():
+    # A Belasting with other tables gets marginal rates from those tables.
+    belasting = Belasting(jaar=2025, stelsel=compileer_stelsel(2024))
+    maand = np.linspace(1_000, 12_000, 12)
+    sweep = bereken_sweep(Salaris(bruto_per_maand=4_000), belasting, maand)
+    verwacht = marginale_tarieven(2024).tarief(sweep.bruto_jaarlijks)
+    assert np.array_equal(sweep.marginaal_tarief, verwacht), (
+        "Marginaal tarief komt niet uit de tabellen van de Belasting"
+    )
@@ -0,0 +1,60 @@
+import numpy as np
+
+from utils import tabellen
+from utils.belastingstelsel import belastingstelsels
+from utils.tabellen import compileer_stelsel, laad_stelsel
+
+
+def test_compileer_stelsel():
+    # Check that the compiled tables give the same values as the original formulas.
+    for year, categories in belastingstelsels.items():
+        stelsel = compileer_stelsel(year)
+        assert stelsel is compileer_stelsel(year), (
+            f"Stelsel {year} moet maar één keer gecompileerd worden"
+        )
+        for cat in ("arbeidskorting", "heffingskorting"):
+            tarieven = getattr(stelsel, cat)
+            assert (np.diff(tarieven.ondergrenzen) > 0).all(), (
+                f"Ondergrenzen van '{cat}' ({year}) moeten oplopend zijn"
+            )
+            for (a, b), func in categories[cat].items():
+                for x in (a, (a + min(b, 1e6)) / 2):
+                    assert tarieven.bereken(x) == func(x), (
+                        f"Gecompileerde '{cat}' ({year}) wijkt af bij {x}"
+                    )
+
+
+def _cache_pad(cache_map, jaar):
+    return (
+        cache_map / f"{belastingstelsels.inhoudshash(jaar)}-{tabellen.CACHE_VERSIE}.bin"
+    )
+
+
+def test_laad_stelsel(tmp_path):
+    # Check that the compiled cache on disk round-trips and is keyed by content hash.
+    for year in belastingstelsels.keys():
+        gecompileerd = laad_stelsel(year, tmp_path)
+        assert _cache_pad(tmp_path, year).exists(), (
+            f"Stelsel {year} is niet in de cache opgeslagen"
+        )
+        geladen = laad_stelsel(year, tmp_path)
+        for cat in ("schijven", "arbeidskorting", "heffingskorting"):
+            for kolom in ("ondergrenzen", "bovengrenzen", "basis", "helling", "anker"):
+                assert getattr(getattr(geladen, cat), kolom) == getattr(
+                    getattr(gecompileerd, cat), kolom
+                ), f"Kolom '{kolom}' van '{cat}' ({year}) wijkt af na het laden"
+
+    # A damaged cache file is ignored and replaced.
+    pad = _cache_pad(tmp_path, 2025)
+    pad.write_bytes(b"kapot")
+    assert laad_stelsel(2025, tmp_path).schijven.helling == (0.3582, 0.3748, 0.495)
+    assert pad.stat().st_size > len(b"kapot"), "Beschadigde cache is niet vervangen"
+
+
+def test_cache_versie(tmp_path, monkeypatch):
+    # A new binary layout version must not read files written with the old one.
+    laad_stelsel(2025, tmp_path)
+    monkeypatch.setattr(tabellen, "CACHE_VERSIE", tabellen.CACHE_VERSIE + 1)
+    assert not _cache_pad(tmp_path, 2025).exists()
+    laad_stelsel(2025, tmp_path)
+    assert _cache_pad(tmp_path, 2025).exists(), "Nieuwe versie krijgt een eigen bestand"
@@ -1,22 +1,104 @@
-from typing import Literal
+from dataclasses import dataclass
+from functools import cached_property
+from typing import TYPE_CHECKING, Literal
 
-import numpy as np
-from scipy.optimize import bisect
-
-from utils.belastingstelsel import belastingstelsels
+from utils.belastingstelsel import Tarieven, belastingstelsels
 from utils.helpers import map_formatter
+from utils.instrumentatie import gemeten
+from utils.tabellen import GecompileerdStelsel, compileer_stelsel
 
+if TYPE_CHECKING:
+    import numpy as np
 
-class Belasting:
-    def __init__(self, jaar: int) -> None:
-        if jaar not in belastingstelsels:
-            raise NotImplementedError(f"Geen belastingstelsel voor {jaar}.")
 
-        belastingjaar_stelsel = belastingstelsels[jaar]
+def _tel_op(bedragen: list[float]) -> float:
+    """
+    Tel de bedragen op van links naar rechts, net als de batch methodes. De ingebouwde
+    sum() rondt sinds Python 3.12 gecompenseerd af en kan daardoor in de laatste bit
+    afwijken.
+    """
+    totaal = 0.0
+    for bedrag in bedragen:
+        totaal = totaal + bedrag
+    return totaal
+
+
+@dataclass(frozen=True, eq=False)
+class NettoCurve:
+    """
+    Het netto salaris als stuksgewijs lineaire functie van het bruto jaarinkomen.
+
+    Op segment `i`, het interval `[bruto[i], bruto[i + 1])`, geldt
+    `netto(x) = netto[i] + helling[i] * (x - bruto[i])`. Het laatste segment loopt
+    door tot oneindig. Aan het begin van een segment kan de curve een sprong maken,
+    zoals bij de grenzen van de arbeidskorting in 2024.
+    """
+
+    bruto: "np.ndarray"
+    netto: "np.ndarray"
+    helling: "np.ndarray"
+
+
+@dataclass(frozen=True, slots=True)
+class Belastingopbouw:
+    """
+    De volledige opbouw van de belasting voor één bruto jaarinkomen, gevuld in één
+    berekening door 'Belasting.bereken_opbouw'.
+    """
+
+    bruto_jaarlijks: float
+    belasting_per_schijf: tuple[float, ...]
+    bruto_belasting: float
+    arbeidskorting: float
+    heffingskorting: float
+    netto_belasting: float
+    netto_salaris: float
+
+    @property
+    def kortingen(self) -> float:
+        return self.arbeidskorting + self.heffingskorting
+
+    def tekst(self) -> str:
+        """
+        Geef een overzichtelijke tekstuele weergave van de belasting per schijf,
+        inclusief het totaal. De tekst wordt pas opgebouwd als deze nodig is.
+        """
+        regels = [
+            f"- Schijf {schijf}: €{bedrag:,.2f}".translate(map_formatter)
+            for schijf, bedrag in enumerate(self.belasting_per_schijf, start=1)
+            if bedrag > 0
+        ]
+        regels.append(
+            f"Je totale belasting is €{self.bruto_belasting:,.2f}".translate(
+                map_formatter
+            )
+        )
+        return "\n\n".join(regels)
+
+    def __str__(self) -> str:
+        return self.tekst()
+
 
-        self.schijven = belastingjaar_stelsel["schijven"]
-        self.arbeidskorting = belastingjaar_stelsel["arbeidskorting"]
-        self.heffingskorting = belastingjaar_stelsel["heffingskorting"]
+class Belasting:
+    def __init__(self, jaar: int, stelsel: GecompileerdStelsel | None = None) -> None:
+        # Een al gecompileerd stelsel kan worden meegegeven, bijvoorbeeld door een
+        # werkproces dat de tabellen van het hoofdproces heeft ontvangen.
+        self.jaar = jaar
+        self.stelsel = compileer_stelsel(jaar) if stelsel is None else stelsel
+
+    # De tarieven met formules worden pas gelezen als ze nodig zijn, zodat een Belasting
+    # met een gecompileerd stelsel uit de cache de tariefbestanden niet hoeft te lezen.
+    @cached_property
+    def schijven(self) -> Tarieven:
+        return belastingstelsels[self.jaar]["schijven"]
+
+    @cached_property
+    def arbeidskorting(self) -> Tarieven:
+        return belastingstelsels[self.jaar]["arbeidskorting"]
+
+    @cached_property
+    def heffingskorting(self) -> Tarieven:
+        return belastingstelsels[self.jaar]["heffingskorting"]
 
     def _bereken_bruto_belasting(self, bruto_jaarlijks: float) -> list:
         """
@@ -31,12 +113,7 @@ class Belasting:
             list: Een lijst met de berekende belastingen voor elke schijf, waarbij elke
             index overeenkomt met een belasting schijf.
         """
-        belasting_per_schijf: list[float] = []
-        for (lower, upper), belasting_formule in self.schijven.items():
-            belastbaar_inkomen = np.minimum(bruto_jaarlijks, upper) - lower
-            belastbaar_inkomen = np.maximum(belastbaar_inkomen, 0)
-            belasting_per_schijf.append(belasting_formule(belastbaar_inkomen))
-        return belasting_per_schijf
+        return self.stelsel.schijven.bereken_per_schijf(bruto_jaarlijks)
 
     def bereken_bruto_belasting(
         self, bruto_jaarlijks: float, output: Literal["bedrag", "tekst"] = "bedrag"
@@ -58,23 +135,10 @@ class Belasting:
             ValueError: Als de parameter 'output' een waarde ontvangt die niet "bedrag" of "tekst" is.
         """
 
-        belasting_per_schijf = self._bereken_bruto_belasting(bruto_jaarlijks)
         if output == "tekst":
-            tekst = ""
-            for schijf in range(len(belasting_per_schijf)):
-                if belasting_per_schijf[schijf] > 0:
-                    tekst += f"- Schijf {schijf + 1}: €{belasting_per_schijf[schijf]:,.2f}".translate(
-                        map_formatter
-                    )
-                    tekst += "\n\n"
-            tekst += (
-                f"Je totale belasting is €{sum(belasting_per_schijf):,.2f}".translate(
-                    map_formatter
-                )
-            )
-            return tekst
+            return self.bereken_opbouw(bruto_jaarlijks).tekst()
         elif output == "bedrag":
-            return sum(belasting_per_schijf)
+            return _tel_op(self._bereken_bruto_belasting(bruto_jaarlijks))
         else:
             raise ValueError("Output moet 'bedrag' of 'tekst' zijn.")
 
@@ -85,9 +149,9 @@ class Belasting:
         Bereken de korting op basis van het bruto jaarlijkse inkomen.
 
         Deze functie bepaalt, op basis van het opgegeven inkomen en kortingstype, de
-        toepasbare korting volgens gedefinieerde tarieven. Het tarief wordt gezocht
-        binnen de bijbehorende limieten en de bijbehorende formule wordt toegepast op
-        het bruto inkomen.
+        toepasbare korting volgens gedefinieerde tarieven. Het tarief wordt met een
+        binaire zoekopdracht gezocht in de gecompileerde grenzen en de bijbehorende
+        formule wordt toegepast op het bruto inkomen.
 
         Args:
             bruto_jaarlijks (float): Het bruto jaarlijkse inkomen.
@@ -101,16 +165,8 @@ class Belasting:
             ValueError: Als er geen tarief wordt gevonden dat overeenkomt met het opgegeven
                 bruto jaarlijkse inkomen.
         """
-        kortingen = {
-            "arbeid": self.arbeidskorting,
-            "heffing": self.heffingskorting,
-        }
-        tarieven = kortingen[type]
-
-        for (lower, upper), formule in tarieven.items():
-            if lower <= max(0, bruto_jaarlijks) < upper:
-                return formule(bruto_jaarlijks)
-        raise ValueError("Salaris is niet gedefinieerd in de tarieven.")
+        tarieven = self.stelsel.korting(type)
+        return tarieven.bereken(bruto_jaarlijks, inkomen=max(0, bruto_jaarlijks))
 
     def bereken_netto_belasting(self, bruto_jaarlijks: float) -> float:
         """
@@ -150,7 +206,281 @@ class Belasting:
         inkomstenbelasting = self.bereken_netto_belasting(bruto_jaarlijks)
         return bruto_jaarlijks - inkomstenbelasting
 
+    def bereken_opbouw(self, bruto_jaarlijks: float) -> Belastingopbouw:
+        """
+        Bereken in één keer de belasting per schijf, beide kortingen, de netto
+        belasting en het netto salaris.
+
+        Args:
+            bruto_jaarlijks (float): Het bruto salaris op jaarbasis.
+
+        Returns:
+            Belastingopbouw: De opbouw van de belasting. De bedragen zijn gelijk aan die
+                van de afzonderlijke methodes.
+        """
+        belasting_per_schijf = self._bereken_bruto_belasting(bruto_jaarlijks)
+        bruto_belasting = _tel_op(belasting_per_schijf)
+        arbeidskorting = self.bereken_korting(bruto_jaarlijks, "arbeid")
+        heffingskorting = self.bereken_korting(bruto_jaarlijks, "heffing")
+        netto_belasting = max(bruto_belasting - (arbeidskorting + heffingskorting), 0)
+
+        return Belastingopbouw(
+            bruto_jaarlijks=bruto_jaarlijks,
+            belasting_per_schijf=tuple(belasting_per_schijf),
+            bruto_belasting=bruto_belasting,
+            arbeidskorting=arbeidskorting,
+            heffingskorting=heffingskorting,
+            netto_belasting=netto_belasting,
+            netto_salaris=bruto_jaarlijks - netto_belasting,
+        )
+
+    def _bereken_korting_batch(
+        self, bruto_jaarlijks: "np.ndarray", type: Literal["arbeid", "heffing"]
+    ) -> "np.ndarray":
+        """
+        Bereken de korting voor een array van bruto jaarlijkse inkomens. Niet bedoeld
+        voor publieke gebruik, maar voor interne berekeningen.
+
+        Het tarief per inkomen wordt gezocht met `np.searchsorted` op de gecompileerde
+        ondergrenzen, waarna de coëfficiënten per inkomen worden opgezocht.
 
+        Args:
+            bruto_jaarlijks (np.ndarray): De bruto jaarlijkse inkomens.
+            type (Literal["arbeid", "heffing"]): Het type korting.
+
+        Returns:
+            np.ndarray: De korting per inkomen.
+
+        Raises:
+            ValueError: Als er voor een of meer inkomens geen tarief gevonden wordt.
+        """
+        import numpy as np
+
+        tarieven = self.stelsel.korting(type)
+        return tarieven.bereken_batch(
+            bruto_jaarlijks, inkomen=np.maximum(bruto_jaarlijks, 0)
+        )
+
+    def bereken_netto_salaris_batch(
+        self, bruto_jaarlijks: "np.ndarray"
+    ) -> "np.ndarray":
+        """
+        Bereken het netto jaarlijkse salaris voor een array van bruto jaarinkomens.
+
+        Dit is de gevectoriseerde tegenhanger van 'bereken_netto_salaris': de schijven,
+        de arbeidskorting, de heffingskorting en de ondergrens van nul worden voor alle
+        inkomens tegelijk berekend, zonder Python-lus per inkomen. De uitkomsten zijn
+        gelijk aan die van de scalaire methode.
+
+        Args:
+            bruto_jaarlijks (np.ndarray): De bruto salarissen op jaarbasis.
+
+        Returns:
+            np.ndarray: Het netto salaris per inkomen, met dezelfde vorm als de invoer.
+        """
+        import numpy as np
+
+        bruto_jaarlijks = np.asarray(bruto_jaarlijks, dtype=np.float64)
+
+        bruto_belasting = np.zeros_like(bruto_jaarlijks)
+        schijven = self.stelsel.schijven
+        for belasting_schijf in schijven.bereken_per_schijf_batch(bruto_jaarlijks):
+            bruto_belasting = bruto_belasting + belasting_schijf
+
+        arbeidskorting = self._bereken_korting_batch(bruto_jaarlijks, "arbeid")
+        heffingskorting = self._bereken_korting_batch(bruto_jaarlijks, "heffing")
+        kortingen = arbeidskorting + heffingskorting
+
+        inkomstenbelasting = np.maximum(bruto_belasting - kortingen, 0)
+        return bruto_jaarlijks - inkomstenbelasting
+
+    def bereken_opbouw_batch(self, bruto_jaarlijks: "np.ndarray") -> "np.ndarray":
+        """
+        Gevectoriseerde variant van 'bereken_opbouw' voor een array van bruto
+        jaarinkomens.
+
+        Args:
+            bruto_jaarlijks (np.ndarray): De bruto salarissen op jaarbasis.
+
+        Returns:
+            np.ndarray: Een structured array met per inkomen dezelfde velden als
+                Belastingopbouw, waarbij 'belasting_per_schijf' een deelarray is met
+                een waarde per schijf.
+        """
+        import numpy as np
+
+        bruto_jaarlijks = np.asarray(bruto_jaarlijks, dtype=np.float64)
+        schijven = self.stelsel.schijven
+        belasting_per_schijf = schijven.bereken_per_schijf_batch(bruto_jaarlijks)
+        dtype = np.dtype(
+            [
+                ("bruto_jaarlijks", np.float64),
+                ("belasting_per_schijf", np.float64, (len(belasting_per_schijf),)),
+                ("bruto_belasting", np.float64),
+                ("arbeidskorting", np.float64),
+                ("heffingskorting", np.float64),
+                ("netto_belasting", np.float64),
+                ("netto_salaris", np.float64),
+            ]
+        )
+        opbouw = np.empty(bruto_jaarlijks.shape, dtype=dtype)
+        opbouw["bruto_jaarlijks"] = bruto_jaarlijks
+
+        bruto_belasting = np.zeros_like(bruto_jaarlijks)
+        for schijf, belasting_schijf in enumerate(belasting_per_schijf):
+            opbouw["belasting_per_schijf"][..., schijf] = belasting_schijf
+            bruto_belasting = bruto_belasting + belasting_schijf
+        opbouw["bruto_belasting"] = bruto_belasting
+
+        arbeidskorting = self._bereken_korting_batch(bruto_jaarlijks, "arbeid")
+        heffingskorting = self._bereken_korting_batch(bruto_jaarlijks, "heffing")
+        opbouw["arbeidskorting"] = arbeidskorting
+        opbouw["heffingskorting"] = heffingskorting
+
+        netto_belasting = np.maximum(
+            bruto_belasting - (arbeidskorting + heffingskorting), 0
+        )
+        opbouw["netto_belasting"] = netto_belasting
+        opbouw["netto_salaris"] = bruto_jaarlijks - netto_belasting
+        return opbouw
+
+    def _bereken_belasting_helling(self, bruto_jaarlijks: float) -> float:
+        """
+        Bereken de helling van de bruto belasting min de kortingen bij het opgegeven
+        inkomen, direct uit de coëfficiënten van de schijven en kortingen. Niet
+        bedoeld voor publieke gebruik, maar voor interne berekeningen.
+        """
+        inkomen = max(0, bruto_jaarlijks)
+        schijven = self.stelsel.schijven
+        arbeidskorting = self.stelsel.arbeidskorting
+        heffingskorting = self.stelsel.heffingskorting
+        return (
+            schijven.helling[schijven._index(bruto_jaarlijks)]
+            - arbeidskorting.helling[arbeidskorting._index(inkomen)]
+            - heffingskorting.helling[heffingskorting._index(inkomen)]
+        )
+
+    @cached_property
+    def netto_curve(self) -> NettoCurve:
+        """
+        De knikpunten en hellingen van het netto salaris vanaf een bruto inkomen van
+        0. De knikpunten zijn de grenzen van de schijven en kortingen, aangevuld met
+        de inkomens waarop de netto belasting de ondergrens van 0 raakt.
+        """
+        import numpy as np
+
+        grenzen = np.unique(
+            np.concatenate(
+                [
+                    self.stelsel.schijven.ondergrenzen,
+                    self.stelsel.arbeidskorting.ondergrenzen,
+                    self.stelsel.heffingskorting.ondergrenzen,
+                    [0],
+                ]
+            )
+        )
+        grenzen = grenzen[grenzen >= 0]
+
+        knikpunten: list[float] = []
+        for start, eind in zip(grenzen, [*grenzen[1:], float("inf")]):
+            knikpunten.append(start)
+            belasting_start = self.bereken_bruto_belasting(start) - (
+                self.bereken_korting(start, "arbeid")
+                + self.bereken_korting(start, "heffing")
+            )
+            helling = self._bereken_belasting_helling(start)
+            if helling != 0:
+                nulpunt = start - belasting_start / helling
+                if start < nulpunt < eind:
+                    knikpunten.append(nulpunt)
+
+        bruto = np.array(knikpunten, dtype=np.float64)
+        eind = np.append(bruto[1:], bruto[-1] + 2)
+        hellingen = []
+        for start, midden in zip(bruto, (bruto + eind) / 2):
+            belast = self.bereken_netto_belasting(midden) > 0
+            hellingen.append(
+                1 - self._bereken_belasting_helling(start) if belast else 1.0
+            )
+
+        return NettoCurve(
+            bruto=bruto,
+            netto=self.bereken_netto_salaris_batch(bruto),
+            helling=np.array(hellingen, dtype=np.float64),
+        )
+
+
+@gemeten("bruto_for_netto_batch")
+def bruto_for_netto_batch(
+    netto_target: "np.ndarray",
+    belasting: Belasting,
+    bruto_min=1,
+    bruto_max=1_000_000_000,
+) -> "np.ndarray":
+    """
+    Bereken voor een array van netto doelwaarden het bijbehorende bruto salaris.
+
+    Het netto salaris is stuksgewijs lineair in het bruto salaris. Per doelwaarde wordt
+    het segment met een binaire zoekopdracht over de netto waarden in de knikpunten
+    gevonden, waarna één lineaire vergelijking wordt opgelost. Het resultaat is het
+    laagste bruto salaris in [bruto_min, bruto_max] waarvoor het netto salaris de
+    doelwaarde bereikt. Bij een vlak stuk wordt dus het begin van dat stuk gegeven en
+    bij een dalend stuk het eerste snijpunt met de doelwaarde.
+
+    Args:
+        netto_target (np.ndarray): De gewenste netto salarissen.
+        belasting (Belasting): Een instantie van de Belasting Class.
+        bruto_min (float, optional): De minimale waarde voor het bruto salaris. Moet
+            minimaal 0 zijn. Default is 1.
+        bruto_max (float, optional): De maximale waarde voor het bruto salaris. Default
+            is 1_000_000_000.
+
+    Returns:
+        np.ndarray: Het bruto salaris per netto doelwaarde.
+
+    Raises:
+        ValueError: Als een doelwaarde niet te bereiken is met een bruto salaris tussen
+            bruto_min en bruto_max.
+    """
+    import numpy as np
+
+    if bruto_min < 0:
+        raise ValueError("bruto_min moet minimaal 0 zijn.")
+    netto_target = np.asarray(netto_target, dtype=np.float64)
+    curve = belasting.netto_curve
+
+    # Begin de curve bij bruto_min in plaats van bij 0.
+    i = np.searchsorted(curve.bruto, bruto_min, side="right") - 1
+    bruto = np.append(bruto_min, curve.bruto[i + 1 :])
+    netto = np.append(belasting.bereken_netto_salaris(bruto_min), curve.netto[i + 1 :])
+    helling = curve.helling[i:]
+
+    # Het hoogste netto salaris tot en met elk segment is oplopend, zodat het eerste
+    # segment dat de doelwaarde bereikt met een binaire zoekopdracht te vinden is.
+    eind = np.append(bruto[1:], np.inf)
+    with np.errstate(invalid="ignore"):
+        maximum = np.where(helling > 0, netto + helling * (eind - bruto), netto)
+    maximum = np.maximum.accumulate(maximum)
+    segment = np.searchsorted(maximum, netto_target, side="left")
+    if (segment == len(maximum)).any() or (netto_target < netto[0]).any():
+        raise ValueError(
+            "Netto doel ligt buiten het bereik van bruto_min en bruto_max."
+        )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bruto_target = np.where(
+            netto[segment] >= netto_target,
+            bruto[segment],
+            bruto[segment] + (netto_target - netto[segment]) / helling[segment],
+        )
+    if (bruto_target > bruto_max).any():
+        raise ValueError(
+            "Netto doel ligt buiten het bereik van bruto_min en bruto_max."
+        )
+    return bruto_target
+
+
+@gemeten("bruto_for_netto")
 def bruto_for_netto(
     netto_target, belasting: Belasting, bruto_min=1, bruto_max=1_000_000_000
 ):
@@ -165,9 +495,11 @@ def bruto_for_netto(
 
     Returns:
         float: Het berekende bruto salaris dat resulteert in het gewenste netto salaris.
-    """
 
-    def func(bruto):
-        return belasting.bereken_netto_salaris(bruto) - netto_target
-
-    return bisect(func, bruto_min, bruto_max)
+    Notes:
+        Deze functie gebruikt 'bruto_for_netto_batch', dat het bruto salaris exact
+        berekent uit de knikpunten van het netto salaris in plaats van te zoeken.
+    """
+    return float(
+        bruto_for_netto_batch([netto_target], belasting, bruto_min, bruto_max)[0]
+    )
@@ -1,4 +1,10 @@
-from utils.Belasting import Belasting
+from typing import TYPE_CHECKING
+
+from utils.Belasting import Belasting, bruto_for_netto
+from utils.instrumentatie import gemeten
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 class Salaris:
@@ -22,7 +28,7 @@ class Salaris:
         self.bruto_netto_ruil = bruto_netto_ruil
         self.vergoeding = vergoeding
 
-    def bereken_bruto_jaarlijks(self) -> float:
+    def bereken_bruto_jaarlijks(self) -> "float | np.ndarray":
         som_percentages = (
             self.percentage_vakantiegeld
             + self.percentage_eindejaars
@@ -34,7 +40,80 @@ class Salaris:
         maandelijks_salaris = self.bruto_per_maand - self.bruto_netto_ruil
         return (12 * maandelijks_salaris * percentage) + self.bonus
 
-    def bereken_netto_jaarlijks(self, belasting: "Belasting") -> float:
+    def met_bruto_per_maand(self, bruto_per_maand: "float | np.ndarray") -> "Salaris":
+        """Geef een kopie van dit salaris met een ander bruto maandsalaris."""
+        return Salaris(
+            bruto_per_maand=bruto_per_maand,
+            percentage_vakantiegeld=self.percentage_vakantiegeld,
+            percentage_eindejaars=self.percentage_eindejaars,
+            percentage_bonus=self.percentage_bonus,
+            percentage_pensioen=self.percentage_pensioen,
+            bonus=self.bonus,
+            bruto_netto_ruil=self.bruto_netto_ruil,
+            vergoeding=self.vergoeding,
+        )
+
+    def bruto_jaarlijks_coefficienten(self) -> tuple[float, float]:
+        """
+        Geef a en b waarvoor het bruto jaarinkomen gelijk is aan
+        `a * bruto_per_maand + b`, met alle andere velden van dit salaris.
+        """
+        b = self.met_bruto_per_maand(0).bereken_bruto_jaarlijks()
+        a = self.met_bruto_per_maand(1).bereken_bruto_jaarlijks() - b
+        return a, b
+
+    def bereken_netto_jaarlijks(self, belasting: "Belasting") -> "float | np.ndarray":
         bruto_jaarlijks = self.bereken_bruto_jaarlijks()
-        netto_jaarlijks = belasting.bereken_netto_salaris(bruto_jaarlijks)
+        if isinstance(bruto_jaarlijks, (int, float)):
+            netto_jaarlijks = belasting.bereken_netto_salaris(bruto_jaarlijks)
+        else:
+            # Velden met arrays van salarissen worden in één keer doorgerekend.
+            netto_jaarlijks = belasting.bereken_netto_salaris_batch(bruto_jaarlijks)
         return netto_jaarlijks + 12 * (self.bruto_netto_ruil + self.vergoeding)
+
+
+@gemeten("bruto_per_maand_for_netto")
+def bruto_per_maand_for_netto(
+    netto_target,
+    salaris: Salaris,
+    belasting: Belasting,
+    bruto_min=1,
+    bruto_max=1_000_000_000,
+):
+    """
+    Bereken het bruto maandsalaris dat met dezelfde percentages, bonus, bruto-netto
+    ruil en vergoeding als 'salaris' het gewenste netto jaarsalaris oplevert.
+
+    Het bruto jaarinkomen is lineair in het bruto maandsalaris, dus het netto
+    jaarsalaris wordt eerst exact teruggerekend naar een bruto jaarinkomen met
+    'bruto_for_netto', waarna dat wordt omgerekend naar een maandsalaris.
+
+    Args:
+        netto_target (float): Het gewenste netto jaarsalaris.
+        salaris (Salaris): Het salaris waarvan alle velden behalve het bruto
+            maandsalaris worden overgenomen.
+        belasting (Belasting): Een instantie van de Belasting Class.
+        bruto_min (float, optional): Het minimale bruto maandsalaris. Default is 1.
+        bruto_max (float, optional): Het maximale bruto maandsalaris. Default is
+            1_000_000_000.
+
+    Returns:
+        float: Het bruto maandsalaris dat het gewenste netto jaarsalaris oplevert.
+
+    Raises:
+        ValueError: Als het gewenste netto jaarsalaris niet te bereiken is met een bruto
+            maandsalaris tussen bruto_min en bruto_max.
+    """
+
+    a, b = salaris.bruto_jaarlijks_coefficienten()
+    if a <= 0:
+        raise ValueError("Het bruto jaarinkomen moet stijgen met het maandsalaris.")
+
+    vast_netto = 12 * (salaris.bruto_netto_ruil + salaris.vergoeding)
+    bruto_jaar = bruto_for_netto(
+        netto_target - vast_netto,
+        belasting,
+        bruto_min=max(a * bruto_min + b, 0),
+        bruto_max=a * bruto_max + b,
+    )
+    return (bruto_jaar - b) / a
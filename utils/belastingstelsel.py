@@ -1,43 +1,171 @@
-from typing import Callable
+"""
+De belastingstelsels per jaar, gelezen uit TOML-bestanden in `utils/tarieven`.
+
+Elk bestand `<jaar>.toml` bevat per categorie een lijst intervallen met de
+coëfficiënten van een lineaire formule:
+
+    versie = 1
+    jaar = 2025
+
+    [[schijven]]
+    van = 0
+    tot = 38441
+    helling = 0.3582
+
+Ontbrekende coëfficiënten zijn 0 en een open bovengrens is `inf`. Een bestand wordt pas
+gelezen en gecontroleerd als het jaar voor het eerst wordt opgevraagd.
+"""
+
+import hashlib
+from collections.abc import Callable, Iterator, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True, slots=True)
+class Lineair:
+    """
+    Lineaire formule `basis + helling * (x - anker)`.
+
+    In tegenstelling tot een lambda zijn de coëfficiënten van deze formule uit te
+    lezen, zodat de tarieven gecompileerd kunnen worden naar arrays.
+    """
+
+    basis: float = 0.0
+    helling: float = 0.0
+    anker: float = 0.0
+
+    def __call__(self, x: float) -> float:
+        return self.basis + self.helling * (x - self.anker)
+
 
 Tarieven = dict[tuple[float, float], Callable[[float], float]]
 
-belastingstelsels: dict[int, dict[str, Tarieven]] = {
-    2024: {
-        "arbeidskorting": {
-            (0, 11491): lambda x: 0.08425 * x,
-            (11491, 24821): lambda x: 968 + 0.31433 * (x - 11490),
-            (24821, 39958): lambda x: 5158 + 0.02471 * (x - 24820),
-            (39958, 124935): lambda x: 5532 - 0.06510 * (x - 39958),
-            (124935, float("inf")): lambda x: 0.0,
-        },
-        "heffingskorting": {
-            (0, 24813): lambda x: 3362,
-            (24813, 75518): lambda x: 3362 - 0.06630 * (x - 24812),
-            (75518, float("inf")): lambda x: 0.0,
-        },
-        "schijven": {
-            (0, 75518): lambda x: 0.3697 * x,
-            (75518, float("inf")): lambda x: 0.495 * x,
-        },
-    },
-    2025: {
-        "arbeidskorting": {
-            (0, 12169): lambda x: 0.08053 * x,
-            (12169, 26288): lambda x: 980 + 0.30030 * (x - 12169),
-            (26288, 43071): lambda x: 5220 + 0.02258 * (x - 26288),
-            (43071, 129078): lambda x: 5599 - 0.06510 * (x - 43071),
-            (129078, float("inf")): lambda x: 0.0,
-        },
-        "heffingskorting": {
-            (0, 28406): lambda x: 3068,
-            (28406, 76817): lambda x: 3068 - 0.06337 * (x - 28406),
-            (76817, float("inf")): lambda x: 0.0,
-        },
-        "schijven": {
-            (0, 38441): lambda x: 0.3582 * x,
-            (38441, 76817): lambda x: 0.3748 * x,
-            (76817, float("inf")): lambda x: 0.4950 * x,
-        },
-    },
-}
+# De map met de tariefbestanden.
+TARIEVEN_MAP = Path(__file__).parent / "tarieven"
+# De versie van het bestandsformaat die de lader ondersteunt.
+FORMAAT_VERSIE = 1
+CATEGORIEEN = ("arbeidskorting", "heffingskorting", "schijven")
+_INTERVAL_VELDEN = {"van", "tot", "basis", "helling", "anker"}
+
+
+def _is_getal(waarde: object) -> bool:
+    return isinstance(waarde, (int, float)) and not isinstance(waarde, bool)
+
+
+def lees_tarieven(
+    inhoud: str, bron: str = "<tekst>"
+) -> tuple[int, dict[str, Tarieven]]:
+    """
+    Lees en controleer een belastingstelsel in het TOML-formaat.
+
+    Args:
+        inhoud (str): De inhoud van het bestand.
+        bron (str, optional): De naam van de bron, voor de foutmeldingen.
+
+    Returns:
+        tuple[int, dict[str, Tarieven]]: Het jaar en de tarieven per categorie.
+
+    Raises:
+        ValueError: Als de inhoud geen geldige TOML is of niet aan het formaat voldoet.
+    """
+    import tomllib
+
+    try:
+        gegevens = tomllib.loads(inhoud)
+    except tomllib.TOMLDecodeError as fout:
+        raise ValueError(f"{bron}: ongeldige TOML: {fout}") from None
+
+    if gegevens.get("versie") != FORMAAT_VERSIE:
+        raise ValueError(f"{bron}: 'versie' moet {FORMAAT_VERSIE} zijn.")
+    jaar = gegevens.get("jaar")
+    if not isinstance(jaar, int) or isinstance(jaar, bool):
+        raise ValueError(f"{bron}: 'jaar' moet een geheel getal zijn.")
+    onbekend = set(gegevens) - {"versie", "jaar", *CATEGORIEEN}
+    if onbekend:
+        raise ValueError(f"{bron}: onbekende sleutels {sorted(onbekend)}.")
+
+    stelsel: dict[str, Tarieven] = {}
+    for categorie in CATEGORIEEN:
+        intervallen = gegevens.get(categorie)
+        if not isinstance(intervallen, list) or not intervallen:
+            raise ValueError(f"{bron}: categorie '{categorie}' ontbreekt of is leeg.")
+
+        tarieven: Tarieven = {}
+        vorige_tot = 0
+        for i, interval in enumerate(intervallen):
+            plaats = f"{bron}: {categorie}[{i}]"
+            if not isinstance(interval, dict):
+                raise ValueError(f"{plaats}: een interval moet een tabel zijn.")
+            onbekend = set(interval) - _INTERVAL_VELDEN
+            if onbekend:
+                raise ValueError(f"{plaats}: onbekende sleutels {sorted(onbekend)}.")
+            if not all(_is_getal(waarde) for waarde in interval.values()):
+                raise ValueError(f"{plaats}: alle waarden moeten getallen zijn.")
+            if "van" not in interval or "tot" not in interval:
+                raise ValueError(f"{plaats}: 'van' en 'tot' zijn verplicht.")
+
+            van, tot = interval["van"], interval["tot"]
+            if van != vorige_tot:
+                raise ValueError(
+                    f"{plaats}: 'van' is {van}, maar moet {vorige_tot} zijn zodat de "
+                    "intervallen aansluiten."
+                )
+            if not van < tot:
+                raise ValueError(f"{plaats}: 'van' moet kleiner zijn dan 'tot'.")
+            tarieven[(van, tot)] = Lineair(
+                basis=interval.get("basis", 0.0),
+                helling=interval.get("helling", 0.0),
+                anker=interval.get("anker", 0.0),
+            )
+            vorige_tot = tot
+
+        if vorige_tot != float("inf"):
+            raise ValueError(
+                f"{bron}: het laatste interval van '{categorie}' moet tot inf lopen."
+            )
+        stelsel[categorie] = tarieven
+    return jaar, stelsel
+
+
+class Belastingstelsels(Mapping[int, dict[str, Tarieven]]):
+    """
+    De belastingstelsels per jaar uit een map met tariefbestanden.
+
+    Bij het aanmaken worden alleen de bestandsnamen gelezen. Een bestand wordt gelezen
+    en gecontroleerd als het jaar voor het eerst wordt opgevraagd.
+    """
+
+    def __init__(self, tarieven_map: Path = TARIEVEN_MAP) -> None:
+        self.paden = {
+            int(pad.stem): pad
+            for pad in sorted(Path(tarieven_map).glob("*.toml"))
+            if pad.stem.isdigit()
+        }
+        self._stelsels: dict[int, dict[str, Tarieven]] = {}
+
+    def __getitem__(self, jaar: int) -> dict[str, Tarieven]:
+        if jaar not in self._stelsels:
+            pad = self.paden[jaar]
+            bestandsjaar, stelsel = lees_tarieven(pad.read_text("utf-8"), str(pad))
+            if bestandsjaar != jaar:
+                raise ValueError(f"{pad}: 'jaar' is {bestandsjaar}, verwacht {jaar}.")
+            self._stelsels[jaar] = stelsel
+        return self._stelsels[jaar]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.paden)
+
+    def __len__(self) -> int:
+        return len(self.paden)
+
+    def __contains__(self, jaar: object) -> bool:
+        return jaar in self.paden
+
+    def inhoudshash(self, jaar: int) -> str:
+        """De SHA-256 van het tariefbestand van een jaar, als sleutel voor caches."""
+        inhoud = self.paden[jaar].read_bytes()
+        return hashlib.sha256(b"%d\0" % FORMAAT_VERSIE + inhoud).hexdigest()
+
+
+belastingstelsels = Belastingstelsels()
@@ -0,0 +1,294 @@
+"""
+Bereken netto salarissen voor een CSV- of Parquet-bestand met salarisgegevens.
+
+Het bestand wordt in blokken van een vaste grootte gelezen, per blok in één keer
+doorgerekend en direct weggeschreven, zodat het geheugengebruik niet afhangt van de
+grootte van het bestand.
+
+Gebruik:
+    python -m utils.bulk salarissen.parquet resultaten.parquet --chunk-grootte 100000
+
+Met `--alle-jaren` wordt per rij ook het netto jaarsalaris onder elk belastingstelsel
+berekend, in de kolommen 'netto_<jaar>', om de impact per jaar te vergelijken. Met
+`--cache` worden de resultaten van ongewijzigde blokken uit een cache op schijf
+gehaald in plaats van opnieuw berekend.
+"""
+
+import argparse
+from collections.abc import Iterator
+from contextlib import nullcontext
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.Belasting import Belasting
+from utils.belastingstelsel import belastingstelsels
+from utils.instrumentatie import profiel
+from utils.kolommen import STANDAARDWAARDEN
+from utils.meerjarig import meerjarig
+from utils.resultaatcache import (
+    MAX_GROOTTE,
+    MAX_LEEFTIJD,
+    ResultaatCache,
+    standaard_map,
+)
+from utils.Salaris import Salaris
+
+
+def _formaat(pad: Path) -> str:
+    if pad.suffix.lower() == ".csv":
+        return "csv"
+    if pad.suffix.lower() in (".parquet", ".pq"):
+        return "parquet"
+    raise ValueError(f"Onbekend bestandsformaat voor {pad}, gebruik CSV of Parquet.")
+
+
+def lees_chunks(pad: Path, chunk_grootte: int) -> Iterator[pd.DataFrame]:
+    """
+    Lees een CSV- of Parquet-bestand in blokken van maximaal chunk_grootte rijen.
+
+    De bekende salariskolommen worden bij CSV altijd als getallen gelezen, zodat elk
+    blok dezelfde kolomtypes heeft. Een leeg bestand geeft één leeg blok met de
+    kolommen van het bestand.
+
+    Args:
+        pad (Path): Het invoerbestand.
+        chunk_grootte (int): Het maximale aantal rijen per blok.
+
+    Yields:
+        pd.DataFrame: Het volgende blok rijen.
+    """
+    if _formaat(pad) == "csv":
+        kolomtypes = dict.fromkeys(["bruto_per_maand", *STANDAARDWAARDEN], "float64")
+        yield from pd.read_csv(
+            pad, chunksize=chunk_grootte, dtype={**kolomtypes, "jaar": "Int64"}
+        )
+    else:
+        import pyarrow.parquet as pq
+
+        with pq.ParquetFile(pad) as bestand:
+            if bestand.metadata.num_rows == 0:
+                yield bestand.schema_arrow.empty_table().to_pandas()
+                return
+            for batch in bestand.iter_batches(batch_size=chunk_grootte):
+                yield batch.to_pandas()
+
+
+def bereken_chunk(
+    chunk: pd.DataFrame,
+    jaar: int | None = None,
+    alle_jaren: bool = False,
+    cache: ResultaatCache | None = None,
+) -> pd.DataFrame:
+    """
+    Bereken het bruto en netto jaarsalaris voor alle rijen van een blok.
+
+    Ontbrekende kolommen of waarden krijgen de standaardwaarden van Salaris. Als het
+    blok een kolom 'jaar' heeft, wordt per rij het belastingstelsel van dat jaar
+    gebruikt, anders dat van het opgegeven jaar.
+
+    Args:
+        chunk (pd.DataFrame): Het blok met minimaal de kolom 'bruto_per_maand'.
+        jaar (int | None, optional): Het belastingjaar voor rijen zonder jaar.
+            Standaard het meest recente belastingjaar.
+        alle_jaren (bool, optional): Voeg voor elk belastingjaar een kolom
+            'netto_<jaar>' toe. Default is False.
+        cache (ResultaatCache | None, optional): Een cache op schijf. Als de
+            resultaten van dezelfde invoer daarin staan, wordt niets berekend.
+
+    Returns:
+        pd.DataFrame: Het blok aangevuld met 'bruto_jaarlijks' en 'netto_jaarlijks'.
+    """
+    jaar = max(belastingstelsels.keys()) if jaar is None else jaar
+    velden = {"bruto_per_maand": chunk["bruto_per_maand"].to_numpy(np.float64)}
+    for naam, standaard in STANDAARDWAARDEN.items():
+        if naam in chunk:
+            velden[naam] = chunk[naam].fillna(standaard).to_numpy(np.float64)
+        else:
+            velden[naam] = np.full(len(chunk), standaard, dtype=np.float64)
+    salaris = Salaris(**velden)
+
+    if "jaar" in chunk:
+        jaren = chunk["jaar"].fillna(jaar).to_numpy(np.int64)
+    else:
+        jaren = np.full(len(chunk), jaar, dtype=np.int64)
+
+    sleutel = None
+    if cache is not None:
+        gebruikte_jaren = belastingstelsels.keys() if alle_jaren else np.unique(jaren)
+        sleutel = cache.sleutel(
+            {**velden, "jaar": jaren},
+            gebruikte_jaren,
+            variant="alle_jaren" if alle_jaren else "",
+        )
+        kolommen = cache.lees(sleutel)
+        if kolommen is not None:
+            return chunk.assign(**kolommen)
+
+    bruto_jaarlijks = salaris.bereken_bruto_jaarlijks()
+    netto_jaarlijks = np.empty_like(bruto_jaarlijks)
+    for belastingjaar in np.unique(jaren):
+        rijen = jaren == belastingjaar
+        belasting = Belasting(jaar=int(belastingjaar))
+        netto_jaarlijks[rijen] = belasting.bereken_netto_salaris_batch(
+            bruto_jaarlijks[rijen]
+        )
+    netto_jaarlijks += 12 * (salaris.bruto_netto_ruil + salaris.vergoeding)
+
+    kolommen = {"bruto_jaarlijks": bruto_jaarlijks, "netto_jaarlijks": netto_jaarlijks}
+    if alle_jaren:
+        stapel = meerjarig()
+        netto_per_jaar = stapel.bereken_netto_jaarlijks(salaris)
+        for rij, belastingjaar in enumerate(stapel.jaren):
+            kolommen[f"netto_{belastingjaar}"] = netto_per_jaar[rij]
+    if sleutel is not None:
+        cache.schrijf(sleutel, kolommen)
+    return chunk.assign(**kolommen)
+
+
+def verwerk(
+    invoer: Path,
+    uitvoer: Path,
+    chunk_grootte: int = 100_000,
+    jaar: int | None = None,
+    alle_jaren: bool = False,
+    cache: ResultaatCache | None = None,
+) -> int:
+    """
+    Reken een volledig bestand blok voor blok door en schrijf de resultaten weg.
+
+    Args:
+        invoer (Path): Het CSV- of Parquet-bestand met salarisgegevens.
+        uitvoer (Path): Het CSV- of Parquet-bestand voor de resultaten.
+        chunk_grootte (int, optional): Het aantal rijen per blok. Default is 100_000.
+        jaar (int | None, optional): Het belastingjaar voor rijen zonder jaar.
+        alle_jaren (bool, optional): Bereken ook het netto salaris per belastingjaar.
+        cache (ResultaatCache | None, optional): Een cache op schijf voor de
+            resultaten per blok. Na afloop wordt de cache opgeruimd.
+
+    Returns:
+        int: Het aantal verwerkte rijen.
+    """
+    invoer, uitvoer = Path(invoer), Path(uitvoer)
+    formaat = _formaat(uitvoer)
+    aantal = 0
+    schrijver = None
+    try:
+        for chunk in lees_chunks(invoer, chunk_grootte):
+            resultaat = bereken_chunk(
+                chunk, jaar=jaar, alle_jaren=alle_jaren, cache=cache
+            )
+            if formaat == "csv":
+                resultaat.to_csv(
+                    uitvoer,
+                    mode="w" if aantal == 0 else "a",
+                    header=aantal == 0,
+                    index=False,
+                )
+            else:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                tabel = pa.Table.from_pandas(resultaat, preserve_index=False)
+                if schrijver is None:
+                    schrijver = pq.ParquetWriter(uitvoer, tabel.schema)
+                else:
+                    # Een kolom met andere waarden kan per blok een ander type
+                    # krijgen, terwijl het bestand één schema heeft.
+                    tabel = tabel.cast(schrijver.schema)
+                schrijver.write_table(tabel)
+            aantal += len(resultaat)
+    finally:
+        if schrijver is not None:
+            schrijver.close()
+        if cache is not None:
+            cache.opruimen()
+    return aantal
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Bereken netto salarissen voor een CSV- of Parquet-bestand."
+    )
+    parser.add_argument("invoer", type=Path, help="CSV- of Parquet-bestand")
+    parser.add_argument("uitvoer", type=Path, help="CSV- of Parquet-bestand")
+    parser.add_argument(
+        "--chunk-grootte",
+        type=int,
+        default=100_000,
+        help="Aantal rijen dat per keer wordt doorgerekend",
+    )
+    parser.add_argument(
+        "--jaar",
+        type=int,
+        choices=sorted(belastingstelsels.keys()),
+        help="Belastingjaar voor rijen zonder kolom 'jaar'",
+    )
+    parser.add_argument(
+        "--alle-jaren",
+        action="store_true",
+        help="Voeg per belastingjaar een kolom 'netto_<jaar>' toe",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Hergebruik de resultaten van ongewijzigde blokken uit een cache op "
+        "schijf; gebruik daarvoor steeds dezelfde chunk-grootte",
+    )
+    parser.add_argument(
+        "--cache-map",
+        type=Path,
+        help="Map van de cache, standaard 'resultaten' in de map van SALARIS_CACHE",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=MAX_GROOTTE / 2**20,
+        help="Maximale grootte van de cache in MiB",
+    )
+    parser.add_argument(
+        "--cache-max-dagen",
+        type=float,
+        default=MAX_LEEFTIJD / 86_400,
+        help="Aantal dagen dat een ongebruikt resultaat bewaard blijft",
+    )
+    parser.add_argument(
+        "--profiel",
+        action="store_true",
+        help="Print de metingen van de rekenkern in het formaat van Prometheus",
+    )
+    args = parser.parse_args(argv)
+
+    cache = None
+    if args.cache:
+        cache_map = args.cache_map or standaard_map()
+        if cache_map is None:
+            parser.error("De cache staat uit met SALARIS_CACHE, geef een --cache-map.")
+        cache = ResultaatCache(
+            cache_map,
+            max_grootte=int(args.cache_max_mb * 2**20),
+            max_leeftijd=args.cache_max_dagen * 86_400,
+        )
+
+    with profiel() if args.profiel else nullcontext() as meting:
+        aantal = verwerk(
+            args.invoer,
+            args.uitvoer,
+            args.chunk_grootte,
+            args.jaar,
+            alle_jaren=args.alle_jaren,
+            cache=cache,
+        )
+    print(f"{aantal} salarissen verwerkt naar {args.uitvoer}")
+    if cache is not None:
+        print(
+            f"{cache.treffers} van {cache.treffers + cache.missers} blokken uit de "
+            f"cache in {cache.map}"
+        )
+    if args.profiel:
+        print(meting.naar_prometheus(), end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Gedeelde caches voor berekeningen die bij elke interactie opnieuw nodig zijn.
+
+De caches gelden voor het hele proces, zodat herhaalde interacties en gelijktijdige
+sessies van de app dezelfde objecten en resultaten hergebruiken.
+"""
+
+from functools import cache, lru_cache
+from typing import TYPE_CHECKING, NamedTuple
+
+from utils.Belasting import Belasting, Belastingopbouw
+from utils.Salaris import Salaris
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Het maximale aantal berekeningen dat bewaard wordt.
+MAX_BEREKENINGEN = 4096
+# Het bereik en het aantal punten van de curves in de grafiek.
+CURVE_BRUTO_MAX = 200_000
+CURVE_PUNTEN = 401
+
+
+class SalarisBerekening(NamedTuple):
+    """Alle bedragen die nodig zijn om een salaris en de belasting weer te geven."""
+
+    jaar: int
+    netto_jaarlijks: float
+    opbouw: Belastingopbouw
+
+    @property
+    def bruto_jaarlijks(self) -> float:
+        return self.opbouw.bruto_jaarlijks
+
+
+@cache
+def belasting_voor_jaar(jaar: int) -> Belasting:
+    """
+    Geef de gedeelde Belasting van een jaar. Het object wordt per jaar eenmalig
+    aangemaakt en mag daarom niet aangepast worden.
+
+    Args:
+        jaar (int): Het belastingjaar.
+
+    Returns:
+        Belasting: De Belasting van het jaar.
+    """
+    return Belasting(jaar=jaar)
+
+
+class Curves(NamedTuple):
+    """Het netto salaris en de kortingen als functie van het bruto jaarinkomen."""
+
+    bruto_jaarlijks: "np.ndarray"
+    netto_jaarlijks: "np.ndarray"
+    arbeidskorting: "np.ndarray"
+    heffingskorting: "np.ndarray"
+
+
+@cache
+def curves_voor_jaar(jaar: int) -> Curves:
+    """
+    Bereken de curves van een jaar eenmalig. Naast een regelmatig rooster bevatten ze
+    de knikpunten van het netto salaris, zodat een lijngrafiek exact is. De arrays
+    worden gedeeld en zijn daarom alleen-lezen.
+
+    Args:
+        jaar (int): Het belastingjaar.
+
+    Returns:
+        Curves: De curves van 0 tot CURVE_BRUTO_MAX.
+    """
+    import numpy as np
+
+    belasting = belasting_voor_jaar(jaar)
+    knikpunten = belasting.netto_curve.bruto
+    bruto = np.union1d(
+        np.linspace(0, CURVE_BRUTO_MAX, CURVE_PUNTEN),
+        knikpunten[knikpunten <= CURVE_BRUTO_MAX],
+    )
+    opbouw = belasting.bereken_opbouw_batch(bruto)
+    velden = {
+        naam: np.ascontiguousarray(opbouw[veld])
+        for naam, veld in zip(
+            Curves._fields,
+            ("bruto_jaarlijks", "netto_salaris", "arbeidskorting", "heffingskorting"),
+            strict=True,
+        )
+    }
+    for array in velden.values():
+        array.flags.writeable = False
+    return Curves(**velden)
+
+
+def _salaris_parameters(salaris: Salaris) -> tuple[float, ...]:
+    return (
+        salaris.bruto_per_maand,
+        salaris.percentage_vakantiegeld,
+        salaris.percentage_eindejaars,
+        salaris.percentage_bonus,
+        salaris.percentage_pensioen,
+        salaris.bonus,
+        salaris.bruto_netto_ruil,
+        salaris.vergoeding,
+    )
+
+
+@lru_cache(maxsize=MAX_BEREKENINGEN)
+def _bereken(
+    jaar: int, bruto_jaarlijks: float, parameters: tuple[float, ...] | None
+) -> SalarisBerekening:
+    opbouw = belasting_voor_jaar(jaar).bereken_opbouw(bruto_jaarlijks)
+    netto_jaarlijks = opbouw.netto_salaris
+    if parameters is not None:
+        salaris = Salaris(*parameters)
+        netto_jaarlijks += 12 * (salaris.bruto_netto_ruil + salaris.vergoeding)
+
+    return SalarisBerekening(jaar=jaar, netto_jaarlijks=netto_jaarlijks, opbouw=opbouw)
+
+
+def bereken_salaris(
+    jaar: int, salaris: Salaris | None = None, bruto_jaarlijks: float | None = None
+) -> SalarisBerekening:
+    """
+    Bereken een salaris, of haal de berekening uit de cache als hetzelfde salaris in
+    hetzelfde jaar al eerder berekend is.
+
+    Args:
+        jaar (int): Het belastingjaar.
+        salaris (Salaris | None, optional): Het salaris. Als dit ontbreekt, wordt
+            alleen het bruto jaarinkomen gebruikt.
+        bruto_jaarlijks (float | None, optional): Het bruto jaarinkomen, voor als er
+            geen Salaris is.
+
+    Returns:
+        SalarisBerekening: De bedragen van de berekening.
+
+    Raises:
+        ValueError: Als niet precies één van salaris en bruto_jaarlijks gegeven is.
+    """
+    if (salaris is None) == (bruto_jaarlijks is None):
+        raise ValueError("Geef een salaris of een bruto jaarinkomen.")
+
+    if salaris is None:
+        return _bereken(jaar, bruto_jaarlijks, None)
+    return _bereken(
+        jaar, salaris.bereken_bruto_jaarlijks(), _salaris_parameters(salaris)
+    )
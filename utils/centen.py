@@ -0,0 +1,204 @@
+"""
+Exacte berekening van de inkomstenbelasting in hele centen.
+
+Alle bedragen zijn int64 centen en alle hellingen zijn gehele getallen in eenheden van
+0,001%, zodat er geen afrondingsfouten van floats ontstaan. Er wordt afgerond zoals in
+de aangifte. Dat is niet altijd in het voordeel van de belastingplichtige:
+
+- het belastbaar inkomen wordt naar beneden afgerond op hele euro's, wat de
+  belasting verlaagt;
+- de belasting per schijf wordt naar beneden afgerond op hele centen, wat de
+  belasting verlaagt;
+- de arbeidskorting en de heffingskorting worden naar beneden afgerond op hele
+  euro's, wat de belasting verhoogt;
+- de netto belasting is nooit negatief.
+
+Het netto salaris is het bruto jaarinkomen in centen min de netto belasting.
+"""
+
+from dataclasses import dataclass
+from functools import cache
+
+import numpy as np
+
+from utils.tabellen import GecompileerdeTarieven, compileer_stelsel
+
+# Een helling wordt opgeslagen als geheel aantal van deze eenheid: 0,001%.
+HELLING_SCHAAL = 100_000
+# Een open bovengrens, in centen.
+ONEINDIG = np.iinfo(np.int64).max
+
+
+def naar_centen(bedrag: float | np.ndarray) -> int | np.ndarray:
+    """Rond een bedrag in euro's af op hele centen."""
+    centen = np.rint(np.multiply(bedrag, 100)).astype(np.int64)
+    return int(centen) if np.ndim(centen) == 0 else centen
+
+
+def _naar_euros(centen: np.ndarray) -> np.ndarray:
+    """Rond centen naar beneden af op hele euro's."""
+    return centen // 100 * 100
+
+
+@dataclass(frozen=True, eq=False)
+class CentenTarieven:
+    """
+    Tarieven als int64 kolommen. Voor interval `i` geldt de formule
+    `basis[i] + helling[i] * (x - anker[i]) / HELLING_SCHAAL`, naar beneden afgerond
+    op hele centen.
+    """
+
+    ondergrenzen: np.ndarray
+    bovengrenzen: np.ndarray
+    basis: np.ndarray
+    helling: np.ndarray
+    anker: np.ndarray
+
+    @classmethod
+    def van_tarieven(cls, tarieven: GecompileerdeTarieven) -> "CentenTarieven":
+        """
+        Zet gecompileerde tarieven om naar centen.
+
+        Raises:
+            ValueError: Als een grens of bedrag geen heel aantal centen is, of een
+                helling niet exact in eenheden van 0,001% uit te drukken is.
+        """
+
+        def centen(waarden: tuple[float, ...]) -> np.ndarray:
+            kolom = np.array(waarden, dtype=np.float64) * 100
+            eindig = np.isfinite(kolom)
+            if (kolom[eindig] != np.rint(kolom[eindig])).any():
+                raise ValueError("Bedragen in de tarieven moeten hele centen zijn.")
+            resultaat = np.full(len(kolom), ONEINDIG, dtype=np.int64)
+            resultaat[eindig] = np.rint(kolom[eindig])
+            return resultaat
+
+        helling = np.array(tarieven.helling, dtype=np.float64) * HELLING_SCHAAL
+        if not np.allclose(helling, np.rint(helling), rtol=0, atol=1e-6):
+            raise ValueError("Hellingen moeten veelvouden van 0,001% zijn.")
+
+        return cls(
+            ondergrenzen=centen(tarieven.ondergrenzen),
+            bovengrenzen=centen(tarieven.bovengrenzen),
+            basis=centen(tarieven.basis),
+            helling=np.rint(helling).astype(np.int64),
+            anker=centen(tarieven.anker),
+        )
+
+    def _formule(self, i: np.ndarray | int, x: np.ndarray) -> np.ndarray:
+        product = self.helling[i] * (x - self.anker[i])
+        return self.basis[i] + product // HELLING_SCHAAL
+
+    def bereken(self, x: np.ndarray) -> np.ndarray:
+        """
+        Pas de formule toe van het interval waarin x valt.
+
+        Raises:
+            ValueError: Als een of meer waarden in geen enkel interval vallen.
+        """
+        index = np.searchsorted(self.ondergrenzen, x, side="right") - 1
+        if ((index < 0) | (x >= self.bovengrenzen[np.maximum(index, 0)])).any():
+            raise ValueError("Salaris is niet gedefinieerd in de tarieven.")
+        return self._formule(index, x)
+
+    def bereken_per_schijf(self, x: np.ndarray) -> list[np.ndarray]:
+        """Pas elke formule toe op het deel van x binnen het bijbehorende interval."""
+        uitkomsten = []
+        for i in range(len(self.ondergrenzen)):
+            deel = np.minimum(x, self.bovengrenzen[i]) - self.ondergrenzen[i]
+            uitkomsten.append(self._formule(i, np.maximum(deel, 0)))
+        return uitkomsten
+
+
+class CentenBelasting:
+    """De inkomstenbelasting van één jaar, exact in hele centen."""
+
+    def __init__(self, jaar: int) -> None:
+        stelsel = compileer_stelsel(jaar)
+        self.jaar = jaar
+        self.schijven = CentenTarieven.van_tarieven(stelsel.schijven)
+        self.arbeidskorting = CentenTarieven.van_tarieven(stelsel.arbeidskorting)
+        self.heffingskorting = CentenTarieven.van_tarieven(stelsel.heffingskorting)
+
+    def bereken_opbouw(self, bruto_centen: int | np.ndarray) -> dict[str, np.ndarray]:
+        """
+        Bereken alle tussenstappen voor een of meer bruto jaarinkomens in centen.
+
+        Args:
+            bruto_centen (int | np.ndarray): De bruto jaarinkomens in centen.
+
+        Returns:
+            dict[str, np.ndarray]: Het belastbaar inkomen, de bruto belasting, de
+                kortingen, de netto belasting en het netto salaris, alle in centen.
+        """
+        bruto_centen = np.asarray(bruto_centen, dtype=np.int64)
+        inkomen = _naar_euros(bruto_centen)
+
+        bruto_belasting = np.zeros_like(inkomen)
+        for belasting_schijf in self.schijven.bereken_per_schijf(inkomen):
+            bruto_belasting = bruto_belasting + belasting_schijf
+
+        korting_inkomen = np.maximum(inkomen, 0)
+        arbeidskorting = _naar_euros(self.arbeidskorting.bereken(korting_inkomen))
+        heffingskorting = _naar_euros(self.heffingskorting.bereken(korting_inkomen))
+
+        netto_belasting = np.maximum(
+            bruto_belasting - arbeidskorting - heffingskorting, 0
+        )
+        return {
+            "belastbaar_inkomen": inkomen,
+            "bruto_belasting": bruto_belasting,
+            "arbeidskorting": arbeidskorting,
+            "heffingskorting": heffingskorting,
+            "netto_belasting": netto_belasting,
+            "netto_salaris": bruto_centen - netto_belasting,
+        }
+
+    def bereken_netto_salaris(self, bruto_centen: int | np.ndarray) -> int | np.ndarray:
+        """
+        Bereken het netto salaris in centen.
+
+        Args:
+            bruto_centen (int | np.ndarray): De bruto jaarinkomens in centen.
+
+        Returns:
+            int | np.ndarray: Het netto salaris in centen, met dezelfde vorm als de
+                invoer.
+        """
+        netto = self.bereken_opbouw(bruto_centen)["netto_salaris"]
+        return int(netto) if np.ndim(netto) == 0 else netto
+
+
+@cache
+def centen_belasting(jaar: int) -> CentenBelasting:
+    """De gedeelde CentenBelasting van een jaar."""
+    return CentenBelasting(jaar)
+
+
+def vergelijk_met_float(bruto_jaarlijks: np.ndarray, jaar: int) -> dict[str, float]:
+    """
+    Vergelijk het netto salaris in centen met dat van de berekening in floats.
+
+    Args:
+        bruto_jaarlijks (np.ndarray): De bruto jaarinkomens in euro's.
+        jaar (int): Het belastingjaar.
+
+    Returns:
+        dict[str, float]: Het grootste en gemiddelde absolute verschil in euro's en
+            het aandeel inkomens waarvoor de afgeronde bedragen verschillen.
+    """
+    from utils.cache import belasting_voor_jaar
+
+    bruto_jaarlijks = np.asarray(bruto_jaarlijks, dtype=np.float64)
+    netto_float = belasting_voor_jaar(jaar).bereken_netto_salaris_batch(bruto_jaarlijks)
+    netto_centen = centen_belasting(jaar).bereken_netto_salaris(
+        naar_centen(bruto_jaarlijks)
+    )
+    verschil = netto_centen / 100 - netto_float
+    return {
+        "max_verschil": float(np.abs(verschil).max()),
+        "gemiddeld_verschil": float(np.abs(verschil).mean()),
+        "aandeel_verschillend": float(
+            (naar_centen(netto_float) != netto_centen).mean()
+        ),
+    }
@@ -0,0 +1,306 @@
+"""
+Optionele instrumentatie van de rekenkern: aantallen aanroepen, latentiehistogrammen,
+het aantal verwerkte invoerwaarden en de trefkansen van de caches.
+
+Zolang de instrumentatie uit staat, zijn de methodes van Belasting niet omwikkeld en
+kost ze dus niets. Bij het aanzetten worden de methodes vervangen door een meetversie
+en bij het uitzetten worden de originelen teruggezet. De losse functies voor de
+inverse zijn altijd omwikkeld, maar doen bij een uitgeschakelde instrumentatie alleen
+één extra controle.
+
+Gebruik:
+    with profiel() as meting:
+        verwerk(invoer, uitvoer)
+    print(meting.naar_prometheus())
+"""
+
+import json
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+
+# De bovengrenzen van de emmers van de latentiehistogrammen, in seconden.
+HISTOGRAM_GRENZEN = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0, float("inf"))
+
+# De methodes van Belasting die gemeten worden als de instrumentatie aan staat.
+METHODES = (
+    "bereken_bruto_belasting",
+    "bereken_korting",
+    "bereken_netto_belasting",
+    "bereken_netto_salaris",
+    "bereken_opbouw",
+    "bereken_netto_salaris_batch",
+    "bereken_opbouw_batch",
+)
+
+
+@dataclass(slots=True)
+class Meting:
+    """De metingen van één functie."""
+
+    aantal: int = 0
+    seconden: float = 0.0
+    invoer: int = 0
+    emmers: list[int] = field(default_factory=lambda: [0] * len(HISTOGRAM_GRENZEN))
+
+    def registreer(self, seconden: float, invoer: int) -> None:
+        self.aantal += 1
+        self.seconden += seconden
+        self.invoer += invoer
+        for i, grens in enumerate(HISTOGRAM_GRENZEN):
+            if seconden <= grens:
+                self.emmers[i] += 1
+                break
+
+
+def _caches() -> dict[str, Callable]:
+    """De functools caches van de rekenkern, op naam."""
+    from utils.cache import _bereken, belasting_voor_jaar, curves_voor_jaar
+    from utils.marginaal import marginale_tarieven
+    from utils.tabellen import compileer_stelsel
+
+    return {
+        "belasting_voor_jaar": belasting_voor_jaar,
+        "bereken_salaris": _bereken,
+        "compileer_stelsel": compileer_stelsel,
+        "curves_voor_jaar": curves_voor_jaar,
+        "marginale_tarieven": marginale_tarieven,
+    }
+
+
+class Instrumentatie:
+    """
+    Verzamelt de metingen zolang hij actief is. Van de caches worden de treffers en
+    missers sinds het aanmaken bijgehouden.
+    """
+
+    def __init__(self) -> None:
+        self.metingen: dict[str, Meting] = {}
+        self._slot = threading.Lock()
+        self._caches_start = {
+            naam: functie.cache_info() for naam, functie in _caches().items()
+        }
+
+    def registreer(self, naam: str, seconden: float, invoer: int = 1) -> None:
+        with self._slot:
+            if naam not in self.metingen:
+                self.metingen[naam] = Meting()
+            self.metingen[naam].registreer(seconden, invoer)
+
+    def caches(self) -> dict[str, dict[str, float]]:
+        """De treffers, missers en trefkans per cache sinds het aanmaken."""
+        resultaat = {}
+        for naam, functie in _caches().items():
+            info, start = functie.cache_info(), self._caches_start[naam]
+            treffers, missers = info.hits - start.hits, info.misses - start.misses
+            totaal = treffers + missers
+            resultaat[naam] = {
+                "treffers": treffers,
+                "missers": missers,
+                "trefkans": treffers / totaal if totaal else 0.0,
+            }
+        return resultaat
+
+    def naar_dict(self) -> dict:
+        with self._slot:
+            metingen = {
+                naam: {
+                    "aantal": meting.aantal,
+                    "seconden": meting.seconden,
+                    "invoer": meting.invoer,
+                    "histogram": dict(
+                        zip(map(str, HISTOGRAM_GRENZEN), meting.emmers, strict=True)
+                    ),
+                }
+                for naam, meting in sorted(self.metingen.items())
+            }
+        return {"metingen": metingen, "caches": self.caches()}
+
+    def naar_json(self) -> str:
+        return json.dumps(self.naar_dict(), indent=2)
+
+    def naar_prometheus(self, voorvoegsel: str = "salaris") -> str:
+        """
+        De metingen in het tekstformaat van Prometheus. Elke familie staat met haar
+        HELP- en TYPE-regel aaneengesloten, zoals het formaat vereist.
+        """
+        with self._slot:
+            metingen = [
+                (
+                    f'functie="{naam}"',
+                    meting.aantal,
+                    meting.invoer,
+                    meting.seconden,
+                    list(meting.emmers),
+                )
+                for naam, meting in sorted(self.metingen.items())
+            ]
+        caches = [(f'cache="{naam}"', cache) for naam, cache in self.caches().items()]
+
+        regels = []
+
+        def familie(naam: str, soort: str, uitleg: str, monsters: list[str]) -> None:
+            regels.append(f"# HELP {voorvoegsel}_{naam} {uitleg}")
+            regels.append(f"# TYPE {voorvoegsel}_{naam} {soort}")
+            regels.extend(f"{voorvoegsel}_{monster}" for monster in monsters)
+
+        familie(
+            "aanroepen_total",
+            "counter",
+            "Het aantal aanroepen per functie.",
+            [f"aanroepen_total{{{label}}} {aantal}" for label, aantal, *_ in metingen],
+        )
+        familie(
+            "invoer_total",
+            "counter",
+            "Het aantal verwerkte invoerwaarden per functie.",
+            [f"invoer_total{{{label}}} {invoer}" for label, _, invoer, *_ in metingen],
+        )
+        duur = []
+        for label, aantal, _, seconden, emmers in metingen:
+            cumulatief = 0
+            for grens, emmer in zip(HISTOGRAM_GRENZEN, emmers, strict=True):
+                cumulatief += emmer
+                le = "+Inf" if grens == float("inf") else repr(grens)
+                duur.append(f'duur_seconden_bucket{{{label},le="{le}"}} {cumulatief}')
+            duur.append(f"duur_seconden_sum{{{label}}} {seconden!r}")
+            duur.append(f"duur_seconden_count{{{label}}} {aantal}")
+        familie(
+            "duur_seconden", "histogram", "De duur van een aanroep per functie.", duur
+        )
+        familie(
+            "cache_treffers_total",
+            "counter",
+            "Het aantal treffers per cache.",
+            [f"cache_treffers_total{{{label}}} {c['treffers']}" for label, c in caches],
+        )
+        familie(
+            "cache_missers_total",
+            "counter",
+            "Het aantal missers per cache.",
+            [f"cache_missers_total{{{label}}} {c['missers']}" for label, c in caches],
+        )
+        return "\n".join(regels) + "\n"
+
+
+# De actieve instrumentaties. Een meting wordt in elk ervan geregistreerd.
+_actief: list[Instrumentatie] = []
+# De originele methodes, zolang ze vervangen zijn.
+_originelen: dict[str, Callable] = {}
+_proces: Instrumentatie | None = None
+# Houdt het aan- en uitzetten, inclusief het vervangen van de methodes, ondeelbaar.
+_wissel_slot = threading.Lock()
+
+
+def actief() -> bool:
+    return bool(_actief)
+
+
+def _aantal(waarde: object) -> int:
+    """Het aantal invoerwaarden van een argument: de grootte van een array of 1."""
+    grootte = getattr(waarde, "size", None)
+    if isinstance(grootte, int):
+        return grootte
+    if isinstance(waarde, (list, tuple)):
+        return len(waarde)
+    return 1
+
+
+def registreer(naam: str, seconden: float, invoer: int = 1) -> None:
+    """Registreer een meting in alle actieve instrumentaties."""
+    for instrumentatie in _actief:
+        instrumentatie.registreer(naam, seconden, invoer)
+
+
+def _meetversie(naam: str, functie: Callable, positie: int) -> Callable:
+    @wraps(functie)
+    def meet(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return functie(*args, **kwargs)
+        finally:
+            invoer = _aantal(args[positie]) if len(args) > positie else 1
+            registreer(naam, time.perf_counter() - start, invoer)
+
+    return meet
+
+
+def gemeten(naam: str) -> Callable[[Callable], Callable]:
+    """
+    Decorator die een functie meet als de instrumentatie aan staat. Het aantal
+    invoerwaarden wordt bepaald uit het eerste argument.
+    """
+
+    def decorator(functie: Callable) -> Callable:
+        meetversie = _meetversie(naam, functie, positie=0)
+
+        @wraps(functie)
+        def omwikkeld(*args, **kwargs):
+            if not _actief:
+                return functie(*args, **kwargs)
+            return meetversie(*args, **kwargs)
+
+        return omwikkeld
+
+    return decorator
+
+
+def aan(instrumentatie: Instrumentatie | None = None) -> Instrumentatie:
+    """
+    Zet de instrumentatie aan.
+
+    Args:
+        instrumentatie (Instrumentatie | None, optional): De instrumentatie die de
+            metingen verzamelt. Standaard één gedeelde instrumentatie voor het proces.
+
+    Returns:
+        Instrumentatie: De actieve instrumentatie.
+    """
+    global _proces
+    from utils.Belasting import Belasting
+
+    with _wissel_slot:
+        if instrumentatie is None:
+            _proces = _proces or Instrumentatie()
+            instrumentatie = _proces
+        if instrumentatie not in _actief:
+            _actief.append(instrumentatie)
+
+        if not _originelen:
+            for methode in METHODES:
+                functie = getattr(Belasting, methode)
+                _originelen[methode] = functie
+                naam = f"Belasting.{methode}"
+                setattr(Belasting, methode, _meetversie(naam, functie, positie=1))
+    return instrumentatie
+
+
+def uit(instrumentatie: Instrumentatie | None = None) -> None:
+    """
+    Zet een instrumentatie uit. Als er geen andere meer actief zijn, worden de
+    originele methodes teruggezet.
+    """
+    from utils.Belasting import Belasting
+
+    with _wissel_slot:
+        instrumentatie = _proces if instrumentatie is None else instrumentatie
+        if instrumentatie in _actief:
+            _actief.remove(instrumentatie)
+
+        if not _actief:
+            for methode, functie in _originelen.items():
+                setattr(Belasting, methode, functie)
+            _originelen.clear()
+
+
+@contextmanager
+def profiel() -> Iterator[Instrumentatie]:
+    """Meet alle aanroepen binnen het blok in een eigen instrumentatie."""
+    instrumentatie = aan(Instrumentatie())
+    try:
+        yield instrumentatie
+    finally:
+        uit(instrumentatie)
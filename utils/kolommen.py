@@ -0,0 +1,136 @@
+"""
+Salarisgegevens als kolommen, met Arrow en Parquet als opslagformaat.
+
+`SalarisKolommen` bevat dezelfde velden als `Salaris`, maar als float64 arrays met één
+waarde per werknemer. Kolommen uit Arrow worden zonder kopie als NumPy array gebruikt
+als dat kan: bij één blok, zonder ontbrekende waarden en met type float64. Een Arrow
+IPC-bestand (`.arrow` of `.feather`) wordt via een memory map gelezen, zodat de
+kolommen rechtstreeks naar het bestand wijzen. Een Parquet-bestand moet altijd
+gedecodeerd worden, maar wordt ook via een memory map gelezen.
+"""
+
+import inspect
+from dataclasses import dataclass, fields
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from utils.Belasting import Belasting
+from utils.Salaris import Salaris
+
+# De optionele velden met hun standaardwaarden, gelijk aan die van Salaris.
+STANDAARDWAARDEN: dict[str, float] = {
+    naam: parameter.default
+    for naam, parameter in inspect.signature(Salaris).parameters.items()
+    if parameter.default is not inspect.Parameter.empty
+}
+
+_IPC_SUFFIXEN = (".arrow", ".feather", ".ipc")
+
+
+def _kolom(tabel: pa.Table, naam: str, standaard: float | None) -> np.ndarray:
+    """Een kolom als float64 array, zonder kopie als dat kan."""
+    if naam not in tabel.column_names:
+        if standaard is None:
+            raise KeyError(f"Kolom '{naam}' ontbreekt.")
+        return np.full(tabel.num_rows, standaard, dtype=np.float64)
+
+    kolom = tabel.column(naam)
+    if kolom.num_chunks == 1 and kolom.null_count == 0 and kolom.type == pa.float64():
+        return kolom.chunk(0).to_numpy(zero_copy_only=True)
+
+    kolom = kolom.cast(pa.float64())
+    if standaard is not None:
+        kolom = pc.fill_null(kolom, standaard)
+    return kolom.to_numpy()
+
+
+@dataclass(frozen=True, eq=False)
+class SalarisKolommen:
+    """De velden van `Salaris` als kolommen, met één waarde per werknemer."""
+
+    bruto_per_maand: np.ndarray
+    percentage_vakantiegeld: np.ndarray
+    percentage_eindejaars: np.ndarray
+    percentage_bonus: np.ndarray
+    percentage_pensioen: np.ndarray
+    bonus: np.ndarray
+    bruto_netto_ruil: np.ndarray
+    vergoeding: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.bruto_per_maand)
+
+    @classmethod
+    def van_arrow(cls, tabel: pa.Table | pa.RecordBatch) -> "SalarisKolommen":
+        """
+        Maak kolommen van een Arrow tabel of record batch.
+
+        Ontbrekende kolommen of waarden krijgen de standaardwaarden van Salaris.
+
+        Raises:
+            KeyError: Als de kolom 'bruto_per_maand' ontbreekt.
+        """
+        if isinstance(tabel, pa.RecordBatch):
+            tabel = pa.Table.from_batches([tabel])
+        return cls(
+            bruto_per_maand=_kolom(tabel, "bruto_per_maand", None),
+            **{
+                naam: _kolom(tabel, naam, standaard)
+                for naam, standaard in STANDAARDWAARDEN.items()
+            },
+        )
+
+    @classmethod
+    def lees(cls, pad: str | Path) -> "SalarisKolommen":
+        """
+        Lees kolommen uit een Parquet- of Arrow IPC-bestand, via een memory map.
+
+        Args:
+            pad (str | Path): Het bestand, met de extensie `.parquet`, `.pq`,
+                `.arrow`, `.feather` of `.ipc`.
+
+        Returns:
+            SalarisKolommen: De kolommen uit het bestand.
+        """
+        pad = Path(pad)
+        if pad.suffix.lower() in _IPC_SUFFIXEN:
+            with pa.memory_map(str(pad)) as bron:
+                return cls.van_arrow(pa.ipc.open_file(bron).read_all())
+
+        import pyarrow.parquet as pq
+
+        namen = [veld.name for veld in fields(cls)]
+        schema = pq.read_schema(pad)
+        kolommen = [naam for naam in namen if naam in schema.names]
+        return cls.van_arrow(pq.read_table(pad, columns=kolommen, memory_map=True))
+
+    def naar_arrow(self) -> pa.Table:
+        """De kolommen als Arrow tabel, zonder kopie van de arrays."""
+        return pa.table(
+            {veld.name: pa.array(getattr(self, veld.name)) for veld in fields(self)}
+        )
+
+    def schrijf(self, pad: str | Path) -> None:
+        """Schrijf de kolommen naar een Parquet- of Arrow IPC-bestand."""
+        pad = Path(pad)
+        tabel = self.naar_arrow()
+        if pad.suffix.lower() in _IPC_SUFFIXEN:
+            with pa.ipc.new_file(str(pad), tabel.schema) as schrijver:
+                schrijver.write_table(tabel)
+        else:
+            import pyarrow.parquet as pq
+
+            pq.write_table(tabel, pad)
+
+    def salaris(self) -> Salaris:
+        """Een Salaris met de kolommen als velden, zonder kopie van de arrays."""
+        return Salaris(**{veld.name: getattr(self, veld.name) for veld in fields(self)})
+
+    def bereken_bruto_jaarlijks(self) -> np.ndarray:
+        return self.salaris().bereken_bruto_jaarlijks()
+
+    def bereken_netto_jaarlijks(self, belasting: Belasting) -> np.ndarray:
+        return self.salaris().bereken_netto_jaarlijks(belasting)
@@ -0,0 +1,170 @@
+"""
+Inhouding van loonheffing per loontijdvak, voor veel werknemers tegelijk.
+
+Een jaar bestaat uit 12 maanden of 13 perioden van vier weken. Het reguliere loon wordt
+elk tijdvak uitbetaald, het vakantiegeld in één tijdvak en de eindejaarsuitkering, de
+bonus als percentage en de vaste bonus in het laatste tijdvak. Over het jaar is het
+loon gelijk aan `Salaris.bereken_bruto_jaarlijks`.
+
+Er zijn twee methodes:
+
+- "cumulatief": de inhouding tot en met tijdvak n is de jaarbelasting over het tot nu
+  toe verdiende loon, herleid naar een jaar, maal n / perioden. De inhouding in een
+  tijdvak is het verschil met de vorige stand en kan negatief zijn als een eerdere
+  uitbetaling te zwaar werd meegewogen. Na het laatste tijdvak is precies de
+  jaarbelasting ingehouden.
+- "tijdvak": het reguliere loon wordt herleid naar een jaar en de jaarbelasting
+  daarover wordt per tijdvak verdeeld. Een bijzondere beloning wordt belast met het
+  verschil in jaarbelasting dat ze bovenop het reguliere jaarloon veroorzaakt.
+
+De stand na elk tijdvak wordt bijgehouden, zodat het verwerken van tijdvak n alleen het
+werk voor dat tijdvak kost.
+"""
+
+from typing import Literal, NamedTuple
+
+import numpy as np
+
+from utils.Belasting import Belasting
+from utils.Salaris import Salaris
+
+Methode = Literal["cumulatief", "tijdvak"]
+
+
+class Tijdvak(NamedTuple):
+    """De bedragen van één tijdvak, per werknemer."""
+
+    periode: int
+    loon: np.ndarray
+    inhouding: np.ndarray
+    netto: np.ndarray
+
+
+class Loonheffing:
+    """
+    De loonheffing van een groep werknemers over een jaar.
+
+    De velden van het Salaris mogen arrays zijn, met één waarde per werknemer.
+    """
+
+    def __init__(
+        self,
+        salaris: Salaris,
+        belasting: Belasting,
+        perioden: Literal[12, 13] = 12,
+        periode_vakantiegeld: int = 5,
+        methode: Methode = "cumulatief",
+    ) -> None:
+        """
+        Args:
+            salaris (Salaris): De salarissen van de werknemers.
+            belasting (Belasting): Een instantie van de Belasting Class.
+            perioden (Literal[12, 13], optional): Het aantal tijdvakken per jaar: 12
+                maanden of 13 perioden van vier weken. Default is 12.
+            periode_vakantiegeld (int, optional): Het tijdvak waarin het vakantiegeld
+                wordt uitbetaald, vanaf 1. Default is 5.
+            methode (Methode, optional): "cumulatief" of "tijdvak". Default is
+                "cumulatief".
+
+        Raises:
+            ValueError: Als het aantal tijdvakken, het tijdvak van het vakantiegeld of
+                de methode ongeldig is.
+        """
+        if perioden not in (12, 13):
+            raise ValueError("Een jaar heeft 12 of 13 tijdvakken.")
+        if not 1 <= periode_vakantiegeld <= perioden:
+            raise ValueError(f"Vakantiegeld moet in tijdvak 1 tot en met {perioden}.")
+        if methode not in ("cumulatief", "tijdvak"):
+            raise ValueError(f"Onbekende methode {methode}.")
+
+        self.salaris = salaris
+        self.belasting = belasting
+        self.perioden = perioden
+        self.periode_vakantiegeld = periode_vakantiegeld
+        self.methode = methode
+
+        # Het bruto jaarinkomen is 12 * maandelijks_salaris * percentage + bonus, zie
+        # Salaris.bereken_bruto_jaarlijks. Het deel per tijdvak volgt uit dezelfde
+        # bedragen, zodat de tijdvakken samen het jaarinkomen opleveren.
+        jaarsalaris = 12 * np.asarray(
+            salaris.bruto_per_maand - salaris.bruto_netto_ruil, dtype=np.float64
+        )
+        self.regulier = jaarsalaris * (100 - salaris.percentage_pensioen) / 100
+        self.regulier = self.regulier / perioden
+        self.vakantiegeld = jaarsalaris * salaris.percentage_vakantiegeld / 100
+        self.eindejaars = (
+            jaarsalaris
+            * (salaris.percentage_eindejaars + salaris.percentage_bonus)
+            / 100
+            + salaris.bonus
+        )
+        self.netto_extra = 12 * (salaris.bruto_netto_ruil + salaris.vergoeding)
+        self.netto_extra = self.netto_extra / perioden
+
+        self.periode = 0
+        vorm = np.broadcast(self.regulier, self.vakantiegeld, self.eindejaars).shape
+        self.cumulatief_loon = np.zeros(vorm)
+        self.cumulatief_inhouding = np.zeros(vorm)
+
+    def _jaarbelasting(self, bruto_jaarlijks: np.ndarray) -> np.ndarray:
+        return bruto_jaarlijks - self.belasting.bereken_netto_salaris_batch(
+            bruto_jaarlijks
+        )
+
+    def bijzondere_beloning(self, periode: int) -> np.ndarray:
+        """Het vakantiegeld, de eindejaarsuitkering en de bonus in een tijdvak."""
+        beloning = np.zeros_like(self.cumulatief_loon)
+        if periode == self.periode_vakantiegeld:
+            beloning = beloning + self.vakantiegeld
+        if periode == self.perioden:
+            beloning = beloning + self.eindejaars
+        return beloning
+
+    def volgende(self) -> Tijdvak:
+        """
+        Verwerk het volgende tijdvak en werk de cumulatieve stand bij.
+
+        Returns:
+            Tijdvak: Het loon, de inhouding en het netto loon per werknemer.
+
+        Raises:
+            StopIteration: Als alle tijdvakken van het jaar al verwerkt zijn.
+        """
+        if self.periode == self.perioden:
+            raise StopIteration("Alle tijdvakken van het jaar zijn verwerkt.")
+        self.periode += 1
+        regulier = self.regulier + np.zeros_like(self.cumulatief_loon)
+        bijzonder = self.bijzondere_beloning(self.periode)
+        loon = regulier + bijzonder
+        self.cumulatief_loon = self.cumulatief_loon + loon
+
+        if self.methode == "cumulatief":
+            jaarloon = self.cumulatief_loon * self.perioden / self.periode
+            totaal = self._jaarbelasting(jaarloon) * self.periode / self.perioden
+            inhouding = totaal - self.cumulatief_inhouding
+        else:
+            jaarloon = regulier * self.perioden
+            inhouding = self._jaarbelasting(jaarloon) / self.perioden
+            if bijzonder.any():
+                inhouding = inhouding + (
+                    self._jaarbelasting(jaarloon + bijzonder)
+                    - self._jaarbelasting(jaarloon)
+                )
+        self.cumulatief_inhouding = self.cumulatief_inhouding + inhouding
+
+        return Tijdvak(
+            periode=self.periode,
+            loon=loon,
+            inhouding=inhouding,
+            netto=loon - inhouding + self.netto_extra,
+        )
+
+    def __iter__(self) -> "Loonheffing":
+        return self
+
+    def __next__(self) -> Tijdvak:
+        return self.volgende()
+
+    def bereken_jaar(self) -> list[Tijdvak]:
+        """Verwerk alle resterende tijdvakken van het jaar."""
+        return list(self)
@@ -0,0 +1,170 @@
+"""
+Marginale tarieven afgeleid uit de structuur van de tarieven.
+
+Het netto salaris is stuksgewijs lineair in het bruto jaarinkomen. De helling van elk
+stuk volgt uit de tarieven van de schijven en de afbouw van de arbeidskorting en de
+heffingskorting, zie `Belasting.netto_curve`. Het marginale tarief is daarmee per
+segment exact bekend en een opzoeking is één binaire zoekopdracht, zonder het netto
+salaris twee keer te berekenen.
+"""
+
+from dataclasses import dataclass
+from functools import cache
+
+import numpy as np
+
+from utils.Belasting import Belasting
+from utils.cache import belasting_voor_jaar
+
+# Sprongen in het netto salaris die kleiner zijn dan dit bedrag zijn afrondingsruis.
+_SPRONG_TOLERANTIE = 1e-6
+
+
+@dataclass(frozen=True, slots=True)
+class Segment:
+    """
+    Een inkomensinterval `[van, tot)` met een vast marginaal tarief.
+
+    'sprong' is de verandering van het netto salaris precies op 'van', bijvoorbeeld
+    door de afronding van de kortingen op de grenzen van hun intervallen.
+    """
+
+    van: float
+    tot: float
+    tarief: float
+    sprong: float = 0.0
+
+
+@dataclass(frozen=True, eq=False)
+class MarginaleTarieven:
+    """
+    De marginale tarieven van één belastingstelsel.
+
+    Op het interval `[grenzen[i], grenzen[i + 1])` betaal je over elke extra euro bruto
+    `tarieven[i]` aan belasting. Het laatste interval loopt door tot oneindig.
+    """
+
+    grenzen: np.ndarray
+    tarieven: np.ndarray
+    netto: np.ndarray
+    sprongen: np.ndarray
+
+    @classmethod
+    def van_belasting(cls, belasting: Belasting) -> "MarginaleTarieven":
+        """Leid de marginale tarieven af uit de netto curve van een Belasting."""
+        curve = belasting.netto_curve
+        links = curve.netto[:-1] + curve.helling[:-1] * np.diff(curve.bruto)
+        sprongen = np.append(0.0, curve.netto[1:] - links)
+        sprongen[np.abs(sprongen) < _SPRONG_TOLERANTIE] = 0.0
+        return cls(
+            grenzen=curve.bruto,
+            tarieven=1 - curve.helling,
+            netto=curve.netto,
+            sprongen=sprongen,
+        )
+
+    def _segment(self, bruto_jaarlijks: float | np.ndarray) -> int | np.ndarray:
+        segment = np.searchsorted(self.grenzen, bruto_jaarlijks, side="right") - 1
+        return np.maximum(segment, 0)
+
+    def tarief(self, bruto_jaarlijks: float | np.ndarray) -> float | np.ndarray:
+        """
+        Geef het marginale tarief rechts van een bruto jaarinkomen.
+
+        Args:
+            bruto_jaarlijks (float | np.ndarray): Een of meer bruto jaarinkomens van
+                minimaal 0.
+
+        Returns:
+            float | np.ndarray: Het deel van een extra euro bruto dat aan belasting
+                wordt betaald.
+        """
+        tarief = self.tarieven[self._segment(bruto_jaarlijks)]
+        return float(tarief) if np.ndim(tarief) == 0 else tarief
+
+    def netto_salaris(self, bruto_jaarlijks: float | np.ndarray) -> float | np.ndarray:
+        """Het netto salaris bij een bruto jaarinkomen, uit de segmenten."""
+        i = self._segment(bruto_jaarlijks)
+        netto = self.netto[i] + (1 - self.tarieven[i]) * (
+            bruto_jaarlijks - self.grenzen[i]
+        )
+        return float(netto) if np.ndim(netto) == 0 else netto
+
+    def extra_netto(
+        self, bruto_jaarlijks: float | np.ndarray, extra: float = 1_000
+    ) -> float | np.ndarray:
+        """
+        Bereken hoeveel netto een extra bedrag bruto bovenop een jaarinkomen oplevert,
+        inclusief de sprongen die tussen beide inkomens vallen.
+
+        Args:
+            bruto_jaarlijks (float | np.ndarray): Het huidige bruto jaarinkomen.
+            extra (float, optional): Het extra bruto bedrag. Default is 1_000.
+
+        Returns:
+            float | np.ndarray: Het extra netto salaris.
+        """
+        return self.netto_salaris(np.add(bruto_jaarlijks, extra)) - self.netto_salaris(
+            bruto_jaarlijks
+        )
+
+    def segmenten(self) -> list[Segment]:
+        """
+        Geef de segmenten met een vast marginaal tarief. Opeenvolgende segmenten met
+        hetzelfde tarief en zonder sprong ertussen worden samengevoegd.
+        """
+        segmenten: list[Segment] = []
+        eind = [*self.grenzen[1:].tolist(), float("inf")]
+        for van, tot, tarief, sprong in zip(
+            self.grenzen.tolist(), eind, self.tarieven.tolist(), self.sprongen.tolist()
+        ):
+            if segmenten and segmenten[-1].tarief == tarief and sprong == 0:
+                vorige = segmenten.pop()
+                segmenten.append(Segment(vorige.van, tot, tarief, vorige.sprong))
+            else:
+                segmenten.append(Segment(van, tot, tarief, sprong))
+        return segmenten
+
+    def armoedevallen(self, drempel: float) -> list[Segment]:
+        """
+        Geef de aaneengesloten inkomensgebieden waarin het marginale tarief hoger is
+        dan 'drempel', zoals gebieden waar de kortingen worden afgebouwd.
+
+        Args:
+            drempel (float): Het marginale tarief als fractie, bijvoorbeeld 0.5.
+
+        Returns:
+            list[Segment]: De gebieden, met het hoogste tarief binnen elk gebied.
+        """
+        gebieden: list[Segment] = []
+        for segment in self.segmenten():
+            if segment.tarief <= drempel:
+                continue
+            if gebieden and gebieden[-1].tot == segment.van:
+                vorige = gebieden.pop()
+                segment = Segment(
+                    vorige.van,
+                    segment.tot,
+                    max(vorige.tarief, segment.tarief),
+                    vorige.sprong,
+                )
+            gebieden.append(segment)
+        return gebieden
+
+
+@cache
+def marginale_tarieven(jaar: int) -> MarginaleTarieven:
+    """
+    Geef de marginale tarieven van een jaar. Ze worden per jaar eenmalig afgeleid en
+    daarna hergebruikt.
+
+    Args:
+        jaar (int): Het belastingjaar.
+
+    Returns:
+        MarginaleTarieven: De marginale tarieven van het jaar.
+
+    Raises:
+        NotImplementedError: Als er geen belastingstelsel is voor het jaar.
+    """
+    return MarginaleTarieven.van_belasting(belasting_voor_jaar(jaar))
@@ -0,0 +1,159 @@
+"""
+Netto salarissen voor alle belastingjaren tegelijk.
+
+De gecompileerde tarieven van de jaren worden gestapeld tot matrices met een rij per
+jaar. Jaren met minder intervallen worden aangevuld met lege intervallen die niets
+bijdragen, zodat één gevectoriseerde berekening een matrix van jaren bij inkomens
+oplevert. De uitkomsten zijn gelijk aan die van `Belasting.bereken_netto_salaris_batch`
+per jaar.
+"""
+
+from dataclasses import dataclass, fields
+from functools import cache
+
+import numpy as np
+
+from utils.belastingstelsel import belastingstelsels
+from utils.Salaris import Salaris
+from utils.tabellen import GecompileerdeTarieven, compileer_stelsel
+
+
+@dataclass(frozen=True, eq=False)
+class GestapeldeTarieven:
+    """De tarieven van meerdere jaren als matrices met vorm (jaren, intervallen)."""
+
+    ondergrenzen: np.ndarray
+    bovengrenzen: np.ndarray
+    basis: np.ndarray
+    helling: np.ndarray
+    anker: np.ndarray
+
+    @classmethod
+    def stapel(cls, tarieven: list[GecompileerdeTarieven]) -> "GestapeldeTarieven":
+        """
+        Stapel de tarieven van meerdere jaren. Lege intervallen hebben als grenzen
+        oneindig, zodat ze nooit gekozen worden en als schijf niets bijdragen.
+        """
+        breedte = max(len(t.ondergrenzen) for t in tarieven)
+        kolommen = {}
+        for veld in fields(cls):
+            opvulling = np.inf if veld.name.endswith("grenzen") else 0.0
+            matrix = np.full((len(tarieven), breedte), opvulling)
+            for rij, t in enumerate(tarieven):
+                waarden = getattr(t, veld.name)
+                matrix[rij, : len(waarden)] = waarden
+            matrix.flags.writeable = False
+            kolommen[veld.name] = matrix
+        return cls(**kolommen)
+
+    def bereken(self, x: np.ndarray, inkomen: np.ndarray) -> np.ndarray:
+        """
+        Pas per jaar de formule toe van het interval waarin het inkomen valt.
+
+        Returns:
+            np.ndarray: De uitkomsten met vorm (jaren, inkomens).
+
+        Raises:
+            ValueError: Als een of meer inkomens in geen enkel interval vallen.
+        """
+        jaren, breedte = self.ondergrenzen.shape
+        index = np.full((jaren, len(inkomen)), -1)
+        for k in range(breedte):
+            index += inkomen >= self.ondergrenzen[:, k, None]
+        if (index < 0).any():
+            raise ValueError("Salaris is niet gedefinieerd in de tarieven.")
+        # Een index in de platgemaakte matrices is sneller dan take_along_axis.
+        index += np.arange(jaren)[:, None] * breedte
+
+        def kolom(matrix: np.ndarray) -> np.ndarray:
+            return np.take(matrix.ravel(), index)
+
+        if not (inkomen < kolom(self.bovengrenzen)).all():
+            raise ValueError("Salaris is niet gedefinieerd in de tarieven.")
+        return kolom(self.basis) + kolom(self.helling) * (x - kolom(self.anker))
+
+    def bereken_som_per_schijf(self, x: np.ndarray) -> np.ndarray:
+        """
+        Tel per jaar de formules op van het deel van x binnen elk interval.
+
+        Returns:
+            np.ndarray: De som met vorm (jaren, inkomens).
+        """
+        som = np.zeros((len(self.ondergrenzen), len(x)))
+        for k in range(self.ondergrenzen.shape[1]):
+            # Bij een leeg interval is het deel max(x - inf, 0) = 0 en zijn alle
+            # coëfficiënten 0, zodat het niets bijdraagt.
+            deel = np.maximum(
+                np.minimum(x, self.bovengrenzen[:, k, None])
+                - self.ondergrenzen[:, k, None],
+                0,
+            )
+            som = som + (
+                self.basis[:, k, None]
+                + self.helling[:, k, None] * (deel - self.anker[:, k, None])
+            )
+        return som
+
+
+class Meerjarig:
+    """De belastingstelsels van meerdere jaren, gestapeld."""
+
+    def __init__(self, jaren: tuple[int, ...] | None = None) -> None:
+        """
+        Args:
+            jaren (tuple[int, ...] | None, optional): De belastingjaren. Standaard alle
+                jaren in oplopende volgorde.
+
+        Raises:
+            NotImplementedError: Als er voor een jaar geen belastingstelsel is.
+        """
+        self.jaren = tuple(sorted(belastingstelsels.keys()) if jaren is None else jaren)
+        stelsels = [compileer_stelsel(jaar) for jaar in self.jaren]
+        self.schijven = GestapeldeTarieven.stapel([s.schijven for s in stelsels])
+        self.arbeidskorting = GestapeldeTarieven.stapel(
+            [s.arbeidskorting for s in stelsels]
+        )
+        self.heffingskorting = GestapeldeTarieven.stapel(
+            [s.heffingskorting for s in stelsels]
+        )
+
+    def bereken_netto_salaris(self, bruto_jaarlijks: np.ndarray) -> np.ndarray:
+        """
+        Bereken het netto jaarlijkse salaris voor elk jaar en elk bruto jaarinkomen.
+
+        Args:
+            bruto_jaarlijks (np.ndarray): De bruto jaarinkomens, als 1-D array.
+
+        Returns:
+            np.ndarray: Het netto salaris met vorm (jaren, inkomens), in de volgorde
+                van 'jaren'.
+        """
+        bruto_jaarlijks = np.atleast_1d(np.asarray(bruto_jaarlijks, dtype=np.float64))
+        inkomen = np.maximum(bruto_jaarlijks, 0)
+
+        bruto_belasting = self.schijven.bereken_som_per_schijf(bruto_jaarlijks)
+        arbeidskorting = self.arbeidskorting.bereken(bruto_jaarlijks, inkomen)
+        heffingskorting = self.heffingskorting.bereken(bruto_jaarlijks, inkomen)
+        kortingen = arbeidskorting + heffingskorting
+
+        inkomstenbelasting = np.maximum(bruto_belasting - kortingen, 0)
+        return bruto_jaarlijks - inkomstenbelasting
+
+    def bereken_netto_jaarlijks(self, salaris: Salaris) -> np.ndarray:
+        """
+        Bereken het netto jaarsalaris voor elk jaar van een Salaris met arrays of
+        losse waarden als velden.
+
+        Returns:
+            np.ndarray: Het netto jaarsalaris met vorm (jaren, werknemers).
+        """
+        netto = self.bereken_netto_salaris(salaris.bereken_bruto_jaarlijks())
+        return netto + 12 * (
+            np.asarray(salaris.bruto_netto_ruil) + np.asarray(salaris.vergoeding)
+        )
+
+
+@cache
+def meerjarig(jaren: tuple[int, ...] | None = None) -> Meerjarig:
+    """De gedeelde Meerjarig van een combinatie van jaren."""
+    return Meerjarig(jaren)
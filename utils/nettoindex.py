@@ -0,0 +1,170 @@
+"""
+Vooraf berekende knooppunten van het netto salaris, voor snelle opzoekingen.
+
+Het netto salaris is per belastingjaar stuksgewijs lineair in het bruto salaris. Met de
+knooppunten van die functie en van de inverse ervan is elke vraag met `np.interp` te
+beantwoorden, zonder de tabellen opnieuw door te rekenen. Een index kan worden
+opgeslagen als `.npz`, zodat app- en batchprocessen hem bij het opstarten alleen hoeven
+te laden.
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from utils.Belasting import Belasting, bruto_for_netto_batch
+from utils.belastingstelsel import belastingstelsels
+from utils.Salaris import Salaris
+
+# Het profiel waarbij de invoer direct het bruto jaarinkomen is.
+JAARINKOMEN = "jaarinkomen"
+
+
+def _knooppunten(
+    belasting: Belasting, bruto_max: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Bepaal de knooppunten van bruto naar netto en van netto naar bruto.
+
+    Een sprong in de netto curve wordt vastgelegd met een extra knooppunt net voor de
+    sprong, zodat lineaire interpolatie tussen de knooppunten exact is.
+    """
+    curve = belasting.netto_curve
+    eind = np.append(curve.bruto[1:], bruto_max)
+    links = curve.netto + curve.helling * (eind - curve.bruto)
+
+    bruto_knopen, netto_knopen = [], []
+    for i in range(len(curve.bruto)):
+        if i > 0 and links[i - 1] != curve.netto[i]:
+            bruto_knopen.append(np.nextafter(curve.bruto[i], -np.inf))
+            netto_knopen.append(links[i - 1])
+        bruto_knopen.append(curve.bruto[i])
+        netto_knopen.append(curve.netto[i])
+    bruto_knopen.append(bruto_max)
+    netto_knopen.append(links[-1])
+    bruto_knopen, netto_knopen = np.array(bruto_knopen), np.array(netto_knopen)
+
+    # De inverse is lineair tussen opeenvolgende netto waarden van de knooppunten en
+    # kan vlak daarboven springen, dus wordt hij ook net boven elke waarde bepaald.
+    netto_waarden = np.unique(netto_knopen)
+    netto_waarden = np.unique(
+        np.concatenate([netto_waarden, np.nextafter(netto_waarden[:-1], np.inf)])
+    )
+    bruto_waarden = bruto_for_netto_batch(
+        netto_waarden, belasting, bruto_min=0, bruto_max=bruto_max
+    )
+    return bruto_knopen, netto_knopen, netto_waarden, bruto_waarden
+
+
+class NettoIndex:
+    """
+    Knooppunten van het netto salaris per belastingjaar en salarisprofiel.
+
+    Het profiel 'jaarinkomen' neemt het bruto jaarinkomen als invoer. Een ander profiel
+    hoort bij een Salaris, waarvan alle velden behalve het bruto maandsalaris
+    vastliggen; de invoer is dan het bruto maandsalaris en de uitvoer het netto
+    jaarsalaris.
+    """
+
+    def __init__(self, knopen: dict[str, np.ndarray]) -> None:
+        self.knopen = knopen
+
+    @classmethod
+    def bouw(
+        cls,
+        jaren: list[int] | None = None,
+        profielen: dict[str, Salaris] | None = None,
+        bruto_max: float = 1_000_000_000,
+    ) -> "NettoIndex":
+        """
+        Bouw de index voor de opgegeven jaren en profielen.
+
+        Args:
+            jaren (list[int] | None, optional): De belastingjaren. Standaard alle jaren.
+            profielen (dict[str, Salaris] | None, optional): Salarisprofielen op naam.
+                Het bruto maandsalaris van elk profiel wordt genegeerd.
+            bruto_max (float, optional): Het hoogste bruto jaarinkomen in de index.
+                Default is 1_000_000_000.
+
+        Returns:
+            NettoIndex: De index.
+
+        Raises:
+            ValueError: Als een profielnaam ongeldig is, of als het bruto jaarinkomen
+                van een profiel niet stijgt met het maandsalaris.
+        """
+        jaren = sorted(belastingstelsels.keys()) if jaren is None else jaren
+        profielen = profielen or {}
+        if any("." in naam or naam == JAARINKOMEN for naam in profielen):
+            raise ValueError(
+                f"Profielnamen mogen geen '.' bevatten of '{JAARINKOMEN}' zijn."
+            )
+        coefficienten = {
+            naam: salaris.bruto_jaarlijks_coefficienten()
+            for naam, salaris in profielen.items()
+        }
+        if any(a <= 0 for a, _ in coefficienten.values()):
+            raise ValueError("Het bruto jaarinkomen moet stijgen met het maandsalaris.")
+
+        knopen = {}
+        for jaar in jaren:
+            bruto, netto, netto_inverse, bruto_inverse = _knooppunten(
+                Belasting(jaar=jaar), bruto_max
+            )
+            knopen[f"{jaar}.{JAARINKOMEN}.bruto"] = bruto
+            knopen[f"{jaar}.{JAARINKOMEN}.netto"] = netto
+            knopen[f"{jaar}.{JAARINKOMEN}.netto_inverse"] = netto_inverse
+            knopen[f"{jaar}.{JAARINKOMEN}.bruto_inverse"] = bruto_inverse
+
+            for naam, salaris in profielen.items():
+                # Het bruto jaarinkomen is a * bruto_per_maand + b en het netto
+                # jaarsalaris is het netto salaris van dat inkomen plus c.
+                a, b = coefficienten[naam]
+                c = 12 * (salaris.bruto_netto_ruil + salaris.vergoeding)
+                knopen[f"{jaar}.{naam}.bruto"] = (bruto - b) / a
+                knopen[f"{jaar}.{naam}.netto"] = netto + c
+                knopen[f"{jaar}.{naam}.netto_inverse"] = netto_inverse + c
+                knopen[f"{jaar}.{naam}.bruto_inverse"] = (bruto_inverse - b) / a
+        return cls(knopen)
+
+    def _knopen(self, jaar: int, profiel: str, soort: str) -> np.ndarray:
+        sleutel = f"{jaar}.{profiel}.{soort}"
+        if sleutel not in self.knopen:
+            raise KeyError(f"Geen index voor jaar {jaar} en profiel '{profiel}'.")
+        return self.knopen[sleutel]
+
+    def netto(
+        self, bruto: float | np.ndarray, jaar: int, profiel: str = JAARINKOMEN
+    ) -> float | np.ndarray:
+        """
+        Zoek het netto jaarsalaris op bij een bruto jaarinkomen, of bij een bruto
+        maandsalaris als een profiel is opgegeven.
+        """
+        return np.interp(
+            bruto,
+            self._knopen(jaar, profiel, "bruto"),
+            self._knopen(jaar, profiel, "netto"),
+        )
+
+    def bruto(
+        self, netto: float | np.ndarray, jaar: int, profiel: str = JAARINKOMEN
+    ) -> float | np.ndarray:
+        """
+        Zoek het laagste bruto jaarinkomen op dat een netto jaarsalaris oplevert, of het
+        bruto maandsalaris als een profiel is opgegeven.
+        """
+        return np.interp(
+            netto,
+            self._knopen(jaar, profiel, "netto_inverse"),
+            self._knopen(jaar, profiel, "bruto_inverse"),
+        )
+
+    def opslaan(self, pad: str | Path) -> None:
+        """Sla de index op als `.npz` bestand."""
+        np.savez(pad, **self.knopen)
+
+    @classmethod
+    def laden(cls, pad: str | Path) -> "NettoIndex":
+        """Laad een index die is opgeslagen met 'opslaan'."""
+        with np.load(pad) as bestand:
+            return cls({sleutel: bestand[sleutel] for sleutel in bestand.files})
@@ -0,0 +1,234 @@
+"""
+Bereken netto salarissen voor grote aantallen inkomens verdeeld over meerdere processen.
+
+De invoer en uitvoer staan in gedeeld geheugen, zodat er per blok alleen een begin- en
+eindindex naar een werkproces gaat. De gecompileerde tabellen worden eenmalig per
+werkproces meegegeven; de formules zelf hoeven dus niet gepickled te worden. Elk blok
+schrijft naar een eigen deel van de uitvoer, waardoor de volgorde altijd gelijk is aan
+die van de invoer.
+
+De pools van werkprocessen blijven bestaan tussen aanroepen en worden bij het
+afsluiten van het proces gestopt.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from utils.Belasting import Belasting
+from utils.cache import belasting_voor_jaar
+from utils.Salaris import Salaris
+from utils.tabellen import GecompileerdStelsel
+
+# De belastingen per jaar van een werkproces, gevuld door '_start_werker'.
+_belastingen: dict[int, Belasting] = {}
+# De pools op aantal processen en meegegeven jaren, hergebruikt tussen aanroepen.
+_pools: dict[tuple[int, frozenset[int]], ProcessPoolExecutor] = {}
+_pools_slot = threading.Lock()
+
+
+def _start_werker(stelsels: dict[int, GecompileerdStelsel]) -> None:
+    _belastingen.update(
+        {
+            jaar: Belasting(jaar=jaar, stelsel=stelsel)
+            for jaar, stelsel in stelsels.items()
+        }
+    )
+
+
+def _bereken(
+    bruto: np.ndarray,
+    jaren: int | np.ndarray,
+    netto: np.ndarray,
+    belastingen: dict[int, Belasting],
+) -> None:
+    if isinstance(jaren, int):
+        netto[:] = belastingen[jaren].bereken_netto_salaris_batch(bruto)
+        return
+    for jaar in np.unique(jaren):
+        rijen = jaren == jaar
+        netto[rijen] = belastingen[int(jaar)].bereken_netto_salaris_batch(bruto[rijen])
+
+
+def _bereken_blok(
+    namen: dict[str, str], lengte: int, jaar: int | None, start: int, stop: int
+) -> None:
+    geheugen = {
+        naam: SharedMemory(name=shm_naam, track=False)
+        for naam, shm_naam in namen.items()
+    }
+    try:
+        bruto = np.ndarray(lengte, np.float64, buffer=geheugen["bruto"].buf)
+        netto = np.ndarray(lengte, np.float64, buffer=geheugen["netto"].buf)
+        if jaar is None:
+            jaren = np.ndarray(lengte, np.int64, buffer=geheugen["jaren"].buf)
+            _bereken(
+                bruto[start:stop], jaren[start:stop], netto[start:stop], _belastingen
+            )
+            del jaren
+        else:
+            _bereken(bruto[start:stop], jaar, netto[start:stop], _belastingen)
+        # De views moeten weg voordat het geheugen ontkoppeld kan worden.
+        del bruto, netto
+    finally:
+        for shm in geheugen.values():
+            shm.close()
+
+
+def _pool(
+    processen: int, belastingen: dict[int, Belasting]
+) -> tuple[tuple[int, frozenset[int]], ProcessPoolExecutor]:
+    """
+    Een gedeelde pool met het gegeven aantal werkprocessen die de tabellen van alle
+    gevraagde jaren heeft, samen met de sleutel van de pool.
+    """
+    with _pools_slot:
+        for sleutel, pool in _pools.items():
+            if sleutel[0] == processen and sleutel[1] >= belastingen.keys():
+                return sleutel, pool
+        # Een pool wordt nooit gestopt zolang het proces loopt, omdat een andere
+        # thread er nog taken op kan hebben staan.
+        sleutel = (processen, frozenset(belastingen))
+        _pools[sleutel] = ProcessPoolExecutor(
+            max_workers=processen,
+            mp_context=multiprocessing.get_context("forkserver"),
+            initializer=_start_werker,
+            initargs=({jaar: b.stelsel for jaar, b in belastingen.items()},),
+        )
+        return sleutel, _pools[sleutel]
+
+
+@atexit.register
+def _stop_pools() -> None:
+    with _pools_slot:
+        for pool in _pools.values():
+            pool.shutdown()
+        _pools.clear()
+
+
+def bereken_netto_salaris_parallel(
+    bruto_jaarlijks: np.ndarray,
+    jaar: int | np.ndarray,
+    processen: int | None = None,
+    blok_grootte: int = 250_000,
+) -> np.ndarray:
+    """
+    Bereken het netto jaarsalaris voor een array van bruto jaarinkomens met een pool
+    van werkprocessen. De pool blijft bestaan en wordt hergebruikt door volgende
+    aanroepen met hetzelfde aantal processen en jaren die de pool al kent.
+
+    Args:
+        bruto_jaarlijks (np.ndarray): De bruto salarissen op jaarbasis.
+        jaar (int | np.ndarray): Het belastingjaar, voor alle inkomens gelijk of per
+            inkomen.
+        processen (int | None, optional): Het aantal werkprocessen. Standaard het
+            aantal beschikbare processoren.
+        blok_grootte (int, optional): Het aantal inkomens per taak. Default is
+            250_000.
+
+    Returns:
+        np.ndarray: Het netto salaris per inkomen, in dezelfde volgorde en vorm als de
+            invoer.
+    """
+    bruto_jaarlijks = np.asarray(bruto_jaarlijks, dtype=np.float64)
+    jaren = np.broadcast_to(np.asarray(jaar, dtype=np.int64), bruto_jaarlijks.shape)
+    vorm, lengte = bruto_jaarlijks.shape, bruto_jaarlijks.size
+    # Eén jaar voor alle inkomens, als getal of als uitgezonden array zonder stappen,
+    # hoeft niet per jaar gesplitst te worden.
+    enkel_jaar = int(jaren.flat[0]) if lengte and not any(jaren.strides) else None
+    # Een onbekend jaar geeft zo een fout voordat er werkprocessen starten.
+    belastingen = {
+        int(j): belasting_voor_jaar(int(j))
+        for j in ([enkel_jaar] if enkel_jaar is not None else np.unique(jaren))
+    }
+
+    processen = processen or os.process_cpu_count() or 1
+    blokken = [
+        (start, min(start + blok_grootte, lengte))
+        for start in range(0, lengte, blok_grootte)
+    ]
+    if processen == 1 or len(blokken) <= 1:
+        netto = np.empty(lengte, dtype=np.float64)
+        _bereken(
+            bruto_jaarlijks.ravel(),
+            jaren.ravel() if enkel_jaar is None else enkel_jaar,
+            netto,
+            belastingen,
+        )
+        return netto.reshape(vorm)
+
+    namen = (
+        ("bruto", "netto") if enkel_jaar is not None else ("bruto", "jaren", "netto")
+    )
+    geheugen = {
+        naam: SharedMemory(create=True, size=max(lengte * 8, 1)) for naam in namen
+    }
+    try:
+        np.ndarray(lengte, np.float64, buffer=geheugen["bruto"].buf)[:] = (
+            bruto_jaarlijks.ravel()
+        )
+        if enkel_jaar is None:
+            np.ndarray(lengte, np.int64, buffer=geheugen["jaren"].buf)[:] = (
+                jaren.ravel()
+            )
+
+        sleutel, pool = _pool(processen, belastingen)
+        shm_namen = {naam: shm.name for naam, shm in geheugen.items()}
+        starts, stops = zip(*blokken)
+        try:
+            # Lees de resultaten uit zodat fouten uit werkprocessen doorgegeven worden.
+            list(
+                pool.map(
+                    _bereken_blok,
+                    [shm_namen] * len(blokken),
+                    [lengte] * len(blokken),
+                    [enkel_jaar] * len(blokken),
+                    starts,
+                    stops,
+                )
+            )
+        except BrokenProcessPool:
+            with _pools_slot:
+                if _pools.get(sleutel) is pool:
+                    del _pools[sleutel]
+            raise
+
+        netto = np.ndarray(lengte, np.float64, buffer=geheugen["netto"].buf).copy()
+    finally:
+        for shm in geheugen.values():
+            shm.close()
+            shm.unlink()
+    return netto.reshape(vorm)
+
+
+def bereken_netto_jaarlijks_parallel(
+    salaris: Salaris,
+    jaar: int | np.ndarray,
+    processen: int | None = None,
+    blok_grootte: int = 250_000,
+) -> np.ndarray:
+    """
+    Bereken het netto jaarsalaris voor een Salaris met arrays als velden, zoals
+    'Salaris.bereken_netto_jaarlijks', maar verdeeld over meerdere processen.
+
+    Args:
+        salaris (Salaris): De salarissen, met een array per veld.
+        jaar (int | np.ndarray): Het belastingjaar, voor alle salarissen gelijk of per
+            salaris.
+        processen (int | None, optional): Het aantal werkprocessen.
+        blok_grootte (int, optional): Het aantal salarissen per taak.
+
+    Returns:
+        np.ndarray: Het netto jaarsalaris per salaris.
+    """
+    bruto_jaarlijks = salaris.bereken_bruto_jaarlijks()
+    netto_jaarlijks = bereken_netto_salaris_parallel(
+        bruto_jaarlijks, jaar, processen=processen, blok_grootte=blok_grootte
+    )
+    return netto_jaarlijks + 12 * (salaris.bruto_netto_ruil + salaris.vergoeding)
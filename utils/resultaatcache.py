@@ -0,0 +1,185 @@
+"""
+Een cache op schijf voor berekende resultaatkolommen van een blok invoer.
+
+De sleutel is een hash van de invoerkolommen, de inhoudshashes van de gebruikte
+tariefbestanden en REKENKERN_VERSIE. Een blok dat niet veranderd is, wordt dus niet
+opnieuw doorgerekend, terwijl een gewijzigd tarief of een gewijzigde rekenkern altijd
+een nieuwe sleutel geeft.
+
+Elke ingang is een map met per kolom een `.npy`-bestand, dat bij het lezen in het
+geheugen wordt gemapt, en een bestand 'kolommen' met de namen in volgorde. Ingangen
+worden verwijderd als ze ouder zijn dan de maximale leeftijd, en de minst recent
+gebruikte als de cache groter wordt dan de maximale grootte. Een beschadigde ingang
+wordt bij het lezen verwijderd, zodat hij opnieuw geschreven kan worden.
+
+Gebruik:
+    cache = ResultaatCache(Path("resultaten"))
+    sleutel = cache.sleutel({"bruto_jaarlijks": bruto}, jaren=[2025])
+    kolommen = cache.lees(sleutel)
+    if kolommen is None:
+        kolommen = bereken(bruto)
+        cache.schrijf(sleutel, kolommen)
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+
+from utils.belastingstelsel import belastingstelsels
+from utils.tabellen import _cache_map
+
+# Verhoog deze versie bij elke wijziging die de uitkomsten van de rekenkern verandert,
+# zodat oude resultaten niet meer gebruikt worden.
+REKENKERN_VERSIE = 1
+# De standaard maximale grootte van de cache in bytes en de leeftijd in seconden.
+MAX_GROOTTE = 1 << 30
+MAX_LEEFTIJD = 30 * 24 * 60 * 60
+
+
+def standaard_map() -> Path | None:
+    """De map 'resultaten' in de cache map, of None als de cache uit staat."""
+    cache_map = _cache_map()
+    return None if cache_map is None else cache_map / "resultaten"
+
+
+class ResultaatCache:
+    """Resultaatkolommen op schijf, op inhoud geadresseerd."""
+
+    def __init__(
+        self,
+        cache_map: Path,
+        max_grootte: int = MAX_GROOTTE,
+        max_leeftijd: float = MAX_LEEFTIJD,
+    ) -> None:
+        """
+        Args:
+            cache_map (Path): De map van de cache. Deze wordt aangemaakt als hij nog
+                niet bestaat.
+            max_grootte (int, optional): De maximale grootte in bytes. Default is
+                1 GiB.
+            max_leeftijd (float, optional): De maximale tijd in seconden sinds een
+                ingang voor het laatst gebruikt is. Default is 30 dagen.
+        """
+        self.map = Path(cache_map)
+        self.max_grootte = max_grootte
+        self.max_leeftijd = max_leeftijd
+        self.treffers = 0
+        self.missers = 0
+
+    def sleutel(
+        self, invoer: dict[str, np.ndarray], jaren: Iterable[int], variant: str = ""
+    ) -> str:
+        """
+        De sleutel van een blok invoer.
+
+        Args:
+            invoer (dict[str, np.ndarray]): De invoerkolommen op naam.
+            jaren (Iterable[int]): De belastingjaren waarmee gerekend wordt.
+            variant (str, optional): Overige opties die de uitkomst bepalen.
+
+        Returns:
+            str: De SHA-256 van de invoer, de tariefbestanden en de rekenkern.
+        """
+        h = hashlib.sha256(b"%d\0%s\0" % (REKENKERN_VERSIE, variant.encode()))
+        for jaar in sorted({int(jaar) for jaar in jaren}):
+            h.update(b"%d:%s\0" % (jaar, belastingstelsels.inhoudshash(jaar).encode()))
+        for naam in sorted(invoer):
+            kolom = np.ascontiguousarray(invoer[naam])
+            h.update(
+                b"%s:%s:%d\0" % (naam.encode(), kolom.dtype.str.encode(), kolom.size)
+            )
+            h.update(kolom)
+        return h.hexdigest()
+
+    def lees(self, sleutel: str) -> dict[str, np.ndarray] | None:
+        """
+        Lees de kolommen van een sleutel als alleen-lezen memory-mapped arrays.
+
+        Returns:
+            dict[str, np.ndarray] | None: De kolommen op naam, of None als de sleutel
+                niet in de cache staat of de ingang beschadigd is.
+        """
+        ingang = self.map / sleutel
+        kolommen = {}
+        if ingang.is_dir():
+            try:
+                namen = (ingang / "kolommen").read_text("utf-8").splitlines()
+                kolommen = {
+                    naam: np.load(ingang / f"{naam}.npy", mmap_mode="r")
+                    for naam in namen
+                }
+                # De wijzigingstijd van de map is het moment van laatste gebruik.
+                os.utime(ingang)
+            except (OSError, ValueError):
+                kolommen = {}
+            if not kolommen:
+                # Anders blijft een beschadigde ingang elke keer missen, omdat een
+                # nieuwe ingang niet over een bestaande map hernoemd kan worden.
+                shutil.rmtree(ingang, ignore_errors=True)
+        if not kolommen:
+            self.missers += 1
+            return None
+        self.treffers += 1
+        return kolommen
+
+    def schrijf(self, sleutel: str, kolommen: dict[str, np.ndarray]) -> None:
+        """
+        Sla de kolommen van een sleutel op. De ingang wordt in een tijdelijke map
+        geschreven en in één keer hernoemd, zodat een lezer nooit een halve ingang
+        ziet. Een cache die niet beschreven kan worden, is geen fout.
+        """
+        try:
+            self.map.mkdir(parents=True, exist_ok=True)
+            tijdelijk = Path(tempfile.mkdtemp(prefix=".", dir=self.map))
+        except OSError:
+            return
+        try:
+            for naam, kolom in kolommen.items():
+                np.save(tijdelijk / f"{naam}.npy", np.asarray(kolom))
+            (tijdelijk / "kolommen").write_text("\n".join(kolommen), "utf-8")
+            tijdelijk.rename(self.map / sleutel)
+        except OSError:
+            # Een andere schrijver was eerder, of de schijf is vol.
+            shutil.rmtree(tijdelijk, ignore_errors=True)
+
+    def _ingangen(self) -> list[tuple[float, int, Path]]:
+        """Per ingang het moment van laatste gebruik, de grootte en het pad."""
+        ingangen = []
+        for ingang in self.map.iterdir():
+            if ingang.name.startswith(".") or not ingang.is_dir():
+                continue
+            try:
+                grootte = sum(pad.stat().st_size for pad in ingang.iterdir())
+                ingangen.append((ingang.stat().st_mtime, grootte, ingang))
+            except OSError:
+                continue
+        return ingangen
+
+    def opruimen(self) -> int:
+        """
+        Verwijder de ingangen die te oud zijn en daarna de minst recent gebruikte tot
+        de cache niet groter is dan de maximale grootte.
+
+        Returns:
+            int: Het aantal verwijderde ingangen.
+        """
+        if not self.map.is_dir():
+            return 0
+        grens = time.time() - self.max_leeftijd
+        ingangen = sorted(self._ingangen())
+        totaal = sum(grootte for _, grootte, _ in ingangen)
+
+        verwijderd = 0
+        for gebruikt, grootte, ingang in ingangen:
+            if gebruikt >= grens and totaal <= self.max_grootte:
+                break
+            shutil.rmtree(ingang, ignore_errors=True)
+            totaal -= grootte
+            verwijderd += 1
+        return verwijderd
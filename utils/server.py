@@ -0,0 +1,302 @@
+"""
+HTTP/JSON rekenservice op basis van asyncio.
+
+Gelijktijdige verzoeken worden per soort berekening en belastingjaar een paar
+milliseconden verzameld en daarna in één gevectoriseerde berekening afgehandeld. Dat
+verlaagt de tijd per verzoek bij veel gelijktijdige aanroepen, zonder dat een los
+verzoek langer dan het venster hoeft te wachten.
+
+Endpoints (POST, JSON):
+    /netto   {"jaar": 2025, "bruto_jaarlijks": 50000}
+             of {"jaar": 2025, "salaris": {"bruto_per_maand": 4000, ...}}
+    /opbouw  {"jaar": 2025, "bruto_jaarlijks": 50000}
+    /bruto   {"jaar": 2025, "netto_jaarlijks": 38000}
+
+Gebruik:
+    python -m utils.server --host 0.0.0.0 --port 8080
+"""
+
+import argparse
+import asyncio
+import json
+import math
+from collections import defaultdict
+from http import HTTPStatus
+
+from utils.Belasting import bruto_for_netto_batch
+from utils.cache import belasting_voor_jaar
+from utils.Salaris import Salaris
+
+# Hoe lang verzoeken verzameld worden voordat ze samen worden berekend.
+VENSTER_MS = 2.0
+# Het maximale aantal verzoeken per berekening.
+MAX_BATCH = 4096
+# De maximale grootte van een verzoek.
+MAX_BODY = 64 * 1024
+
+
+def _bereken_netto(jaar: int, waarden: list[float]) -> list[dict]:
+    belasting = belasting_voor_jaar(jaar)
+    netto = belasting.bereken_netto_salaris_batch(waarden)
+    return [{"netto_jaarlijks": float(bedrag)} for bedrag in netto]
+
+
+def _bereken_opbouw(jaar: int, waarden: list[float]) -> list[dict]:
+    opbouw = belasting_voor_jaar(jaar).bereken_opbouw_batch(waarden)
+    return [
+        {
+            "bruto_jaarlijks": float(rij["bruto_jaarlijks"]),
+            "belasting_per_schijf": rij["belasting_per_schijf"].tolist(),
+            "bruto_belasting": float(rij["bruto_belasting"]),
+            "arbeidskorting": float(rij["arbeidskorting"]),
+            "heffingskorting": float(rij["heffingskorting"]),
+            "netto_belasting": float(rij["netto_belasting"]),
+            "netto_salaris": float(rij["netto_salaris"]),
+        }
+        for rij in opbouw
+    ]
+
+
+def _bereken_bruto(jaar: int, waarden: list[float]) -> list[dict]:
+    import numpy as np
+
+    belasting = belasting_voor_jaar(jaar)
+    bruto = bruto_for_netto_batch(np.asarray(waarden, dtype=np.float64), belasting)
+    return [{"bruto_jaarlijks": float(bedrag)} for bedrag in bruto]
+
+
+BEREKENINGEN = {
+    "netto": _bereken_netto,
+    "opbouw": _bereken_opbouw,
+    "bruto": _bereken_bruto,
+}
+
+
+class MicroBatcher:
+    """
+    Verzamelt losse berekeningen per soort en jaar en voert ze samen uit.
+
+    De eerste berekening in een lege wachtrij start een venster van 'venster_ms'
+    milliseconden. Aan het einde van het venster, of eerder als de wachtrij
+    'max_batch' berekeningen bevat, worden alle berekeningen in de wachtrij in één
+    keer uitgevoerd.
+    """
+
+    def __init__(self, venster_ms: float = VENSTER_MS, max_batch: int = MAX_BATCH):
+        self.venster = venster_ms / 1000
+        self.max_batch = max_batch
+        self.wachtrijen: dict[tuple[str, int], list] = defaultdict(list)
+        self.timers: dict[tuple[str, int], asyncio.TimerHandle] = {}
+        self.aantal_batches = 0
+
+    async def bereken(self, soort: str, jaar: int, waarde: float) -> dict:
+        """Plan een berekening in en wacht op het resultaat."""
+        sleutel = (soort, jaar)
+        toekomst = asyncio.get_running_loop().create_future()
+        wachtrij = self.wachtrijen[sleutel]
+        wachtrij.append((waarde, toekomst))
+        if len(wachtrij) >= self.max_batch:
+            self._voer_uit(sleutel)
+        elif sleutel not in self.timers:
+            self.timers[sleutel] = asyncio.get_running_loop().call_later(
+                self.venster, self._voer_uit, sleutel
+            )
+        return await toekomst
+
+    @staticmethod
+    def _bereken_los(soort: str, jaar: int, waarde: float) -> dict | ValueError:
+        try:
+            return BEREKENINGEN[soort](jaar, [waarde])[0]
+        except ValueError as fout:
+            return fout
+
+    def _voer_uit(self, sleutel: tuple[str, int]) -> None:
+        timer = self.timers.pop(sleutel, None)
+        if timer is not None:
+            timer.cancel()
+        wachtrij = self.wachtrijen.pop(sleutel, [])
+        if not wachtrij:
+            return
+
+        self.aantal_batches += 1
+        soort, jaar = sleutel
+        waarden = [waarde for waarde, _ in wachtrij]
+        resultaten = None
+        try:
+            try:
+                resultaten = BEREKENINGEN[soort](jaar, waarden)
+            except ValueError:
+                # Reken per waarde, zodat alleen de ongeldige verzoeken mislukken.
+                resultaten = [self._bereken_los(soort, jaar, w) for w in waarden]
+        finally:
+            # Laat bij een onverwachte fout geen verzoeken eeuwig wachten.
+            if resultaten is None:
+                for _, toekomst in wachtrij:
+                    toekomst.set_exception(RuntimeError("Berekening is mislukt."))
+        for (_, toekomst), resultaat in zip(wachtrij, resultaten):
+            if toekomst.done():
+                continue
+            if isinstance(resultaat, Exception):
+                toekomst.set_exception(resultaat)
+            else:
+                toekomst.set_result(resultaat)
+
+
+class Fout(Exception):
+    """Een fout die als HTTP-status aan de client wordt teruggegeven."""
+
+    def __init__(self, status: HTTPStatus, melding: str) -> None:
+        super().__init__(melding)
+        self.status = status
+        self.melding = melding
+
+
+def _lees_verzoek(pad: str, verzoek: dict) -> tuple[str, int, float, float]:
+    """
+    Controleer een verzoek en geef de soort berekening, het jaar, de invoerwaarde en
+    het netto bedrag dat na de berekening wordt opgeteld.
+    """
+    soort = pad.strip("/")
+    if soort not in BEREKENINGEN:
+        raise Fout(HTTPStatus.NOT_FOUND, f"Onbekend endpoint {pad}.")
+    if not isinstance(verzoek, dict):
+        raise Fout(HTTPStatus.BAD_REQUEST, "Verwacht een JSON object.")
+
+    jaar = verzoek.get("jaar")
+    if not isinstance(jaar, int):
+        raise Fout(HTTPStatus.BAD_REQUEST, "Veld 'jaar' moet een geheel getal zijn.")
+    try:
+        belasting_voor_jaar(jaar)
+    except NotImplementedError as fout:
+        raise Fout(HTTPStatus.BAD_REQUEST, str(fout)) from None
+
+    try:
+        if soort == "netto" and "salaris" in verzoek:
+            salaris = Salaris(**verzoek["salaris"])
+            extra = 12 * (salaris.bruto_netto_ruil + salaris.vergoeding)
+            waarde, extra = float(salaris.bereken_bruto_jaarlijks()), float(extra)
+        else:
+            veld = "netto_jaarlijks" if soort == "bruto" else "bruto_jaarlijks"
+            waarde, extra = float(verzoek[veld]), 0.0
+    except (KeyError, TypeError, ValueError) as fout:
+        raise Fout(HTTPStatus.BAD_REQUEST, f"Ongeldig verzoek: {fout}") from None
+    # NaN en oneindig worden door float() geaccepteerd, maar zijn geen bedragen.
+    if not (math.isfinite(waarde) and math.isfinite(extra)):
+        raise Fout(HTTPStatus.BAD_REQUEST, "Bedragen moeten eindige getallen zijn.")
+    return soort, jaar, waarde, extra
+
+
+class Server:
+    """De HTTP-server, met één MicroBatcher voor alle verbindingen."""
+
+    def __init__(self, batcher: MicroBatcher | None = None) -> None:
+        self.batcher = batcher or MicroBatcher()
+
+    async def _antwoord(self, pad: str, body: bytes) -> tuple[HTTPStatus, dict]:
+        try:
+            verzoek = json.loads(body or b"{}")
+        except json.JSONDecodeError:
+            return HTTPStatus.BAD_REQUEST, {"fout": "Ongeldige JSON."}
+        try:
+            soort, jaar, waarde, extra = _lees_verzoek(pad, verzoek)
+            resultaat = await self.batcher.bereken(soort, jaar, waarde)
+        except Fout as fout:
+            return fout.status, {"fout": fout.melding}
+        except ValueError as fout:
+            return HTTPStatus.UNPROCESSABLE_ENTITY, {"fout": str(fout)}
+        if extra:
+            resultaat = {
+                **resultaat,
+                "netto_jaarlijks": resultaat["netto_jaarlijks"] + extra,
+            }
+        return HTTPStatus.OK, resultaat
+
+    async def verwerk_verbinding(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Beantwoord de verzoeken van één verbinding, met keep-alive."""
+        try:
+            while True:
+                try:
+                    startregel = await reader.readline()
+                except ConnectionError:
+                    break
+                if not startregel:
+                    break
+                methode, pad, versie = startregel.decode("latin-1").split()
+
+                headers = {}
+                while (regel := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    naam, _, waarde = regel.decode("latin-1").partition(":")
+                    headers[naam.strip().lower()] = waarde.strip()
+
+                lengte = int(headers.get("content-length", 0))
+                if lengte > MAX_BODY:
+                    status, antwoord = (
+                        HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                        {"fout": "Verzoek is te groot."},
+                    )
+                    await self._schrijf(writer, status, antwoord, sluiten=True)
+                    break
+                body = await reader.readexactly(lengte) if lengte else b""
+
+                if methode != "POST":
+                    status, antwoord = (
+                        HTTPStatus.METHOD_NOT_ALLOWED,
+                        {"fout": "Alleen POST wordt ondersteund."},
+                    )
+                else:
+                    status, antwoord = await self._antwoord(pad, body)
+
+                sluiten = headers.get("connection", "").lower() == "close" or (
+                    versie == "HTTP/1.0"
+                    and headers.get("connection", "").lower() != "keep-alive"
+                )
+                await self._schrijf(writer, status, antwoord, sluiten)
+                if sluiten:
+                    break
+        except (ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _schrijf(
+        self,
+        writer: asyncio.StreamWriter,
+        status: HTTPStatus,
+        antwoord: dict,
+        sluiten: bool,
+    ) -> None:
+        body = json.dumps(antwoord).encode()
+        headers = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'close' if sluiten else 'keep-alive'}\r\n\r\n"
+        )
+        writer.write(headers.encode("latin-1") + body)
+        await writer.drain()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.Server:
+        """Start de server en geef het asyncio.Server object terug."""
+        return await asyncio.start_server(self.verwerk_verbinding, host, port)
+
+
+async def _serveer(host: str, port: int, venster_ms: float) -> None:
+    server = await Server(MicroBatcher(venster_ms=venster_ms)).start(host, port)
+    print(f"Rekenservice luistert op http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="HTTP/JSON rekenservice.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--venster-ms", type=float, default=VENSTER_MS)
+    args = parser.parse_args(argv)
+    asyncio.run(_serveer(args.host, args.port, args.venster_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Wat-als verkenningen over een rooster van salarissen in één gevectoriseerde berekening.
+
+Vanuit een basissalaris worden bereiken opgegeven voor het bruto maandsalaris, het
+bonuspercentage, het pensioenpercentage en de bruto-netto ruil. Het bruto jaarinkomen is
+het product van een deel dat alleen van het maandsalaris en de ruil afhangt en een deel
+dat alleen van de percentages afhangt. Die delen worden per as berekend en pas bij het
+vermenigvuldigen tot het volledige rooster uitgebreid.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+
+from utils.Belasting import Belasting
+from utils.marginaal import MarginaleTarieven, marginale_tarieven
+from utils.Salaris import Salaris
+from utils.tabellen import compileer_stelsel
+
+
+@dataclass(frozen=True, eq=False)
+class Sweep:
+    """
+    De uitkomsten van een verkenning. Elk rooster heeft de vorm
+    `(len(bruto_per_maand), len(percentage_bonus), len(percentage_pensioen),
+    len(bruto_netto_ruil))`.
+
+    Het marginale tarief is het deel van een extra euro bruto jaarinkomen dat aan
+    belasting wordt betaald, rechts van het inkomen.
+    """
+
+    bruto_per_maand: np.ndarray
+    percentage_bonus: np.ndarray
+    percentage_pensioen: np.ndarray
+    bruto_netto_ruil: np.ndarray
+    bruto_jaarlijks: np.ndarray
+    netto_jaarlijks: np.ndarray
+    marginaal_tarief: np.ndarray
+
+
+def _as(waarden: float | Sequence[float] | np.ndarray | None, basis: float):
+    waarden = basis if waarden is None else waarden
+    return np.atleast_1d(np.asarray(waarden, dtype=np.float64))
+
+
+def bereken_sweep(
+    salaris: Salaris,
+    belasting: Belasting,
+    bruto_per_maand: Sequence[float] | np.ndarray | None = None,
+    percentage_bonus: Sequence[float] | np.ndarray | None = None,
+    percentage_pensioen: Sequence[float] | np.ndarray | None = None,
+    bruto_netto_ruil: Sequence[float] | np.ndarray | None = None,
+) -> Sweep:
+    """
+    Bereken het bruto en netto jaarsalaris en het marginale tarief voor elke
+    combinatie van de opgegeven waarden.
+
+    Args:
+        salaris (Salaris): Het basissalaris. De velden zonder bereik worden hiervan
+            overgenomen.
+        belasting (Belasting): Een instantie van de Belasting Class.
+        bruto_per_maand (Sequence[float] | np.ndarray | None, optional): De bruto
+            maandsalarissen. Standaard die van het basissalaris.
+        percentage_bonus (Sequence[float] | np.ndarray | None, optional): De
+            bonuspercentages. Standaard die van het basissalaris.
+        percentage_pensioen (Sequence[float] | np.ndarray | None, optional): De
+            pensioenpercentages. Standaard die van het basissalaris.
+        bruto_netto_ruil (Sequence[float] | np.ndarray | None, optional): De bruto-netto
+            ruil per maand. Standaard die van het basissalaris.
+
+    Returns:
+        Sweep: De assen en de roosters met uitkomsten.
+    """
+    maand = _as(bruto_per_maand, salaris.bruto_per_maand)
+    bonus = _as(percentage_bonus, salaris.percentage_bonus)
+    pensioen = _as(percentage_pensioen, salaris.percentage_pensioen)
+    ruil = _as(bruto_netto_ruil, salaris.bruto_netto_ruil)
+
+    # Dezelfde volgorde van bewerkingen als Salaris.bereken_bruto_jaarlijks, zodat de
+    # uitkomsten gelijk zijn aan die van losse salarissen.
+    som_percentages = (
+        salaris.percentage_vakantiegeld
+        + salaris.percentage_eindejaars
+        + bonus[:, None]
+        - pensioen[None, :]
+    )
+    percentage = (100 + som_percentages) / 100
+    maandelijks_salaris = maand[:, None] - ruil[None, :]
+    bruto_jaarlijks = (
+        12 * maandelijks_salaris[:, None, None, :] * percentage[None, :, :, None]
+    ) + salaris.bonus
+
+    netto_jaarlijks = belasting.bereken_netto_salaris_batch(bruto_jaarlijks)
+    netto_jaarlijks += 12 * (ruil + salaris.vergoeding)
+
+    # De gedeelde tarieven van het jaar gelden alleen voor een Belasting met de
+    # standaard tabellen van dat jaar.
+    if belasting.stelsel is compileer_stelsel(belasting.jaar):
+        marginaal = marginale_tarieven(belasting.jaar)
+    else:
+        marginaal = MarginaleTarieven.van_belasting(belasting)
+
+    return Sweep(
+        bruto_per_maand=maand,
+        percentage_bonus=bonus,
+        percentage_pensioen=pensioen,
+        bruto_netto_ruil=ruil,
+        bruto_jaarlijks=bruto_jaarlijks,
+        netto_jaarlijks=netto_jaarlijks,
+        marginaal_tarief=marginaal.tarief(bruto_jaarlijks),
+    )
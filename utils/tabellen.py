@@ -0,0 +1,290 @@
+import os
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, fields
+from functools import cache, cached_property
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal
+
+from utils.belastingstelsel import Lineair, Tarieven, belastingstelsels
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+@dataclass(frozen=True, eq=False)
+class GecompileerdeTarieven:
+    """
+    Tarieven als platte, gesorteerde kolommen in plaats van een dict met formules.
+
+    Voor interval `i` geldt op `[ondergrenzen[i], bovengrenzen[i])` de formule
+    `basis[i] + helling[i] * (x - anker[i])`. Door het anker te bewaren in plaats van
+    een snijpunt met de y-as zijn de uitkomsten gelijk aan die van de oorspronkelijke
+    formules.
+
+    De kolommen zijn tuples, zodat scalaire berekeningen zonder NumPy kunnen. De
+    batch methodes gebruiken NumPy arrays die pas bij het eerste gebruik worden
+    aangemaakt.
+    """
+
+    ondergrenzen: tuple[float, ...]
+    bovengrenzen: tuple[float, ...]
+    basis: tuple[float, ...]
+    helling: tuple[float, ...]
+    anker: tuple[float, ...]
+
+    @cached_property
+    def arrays(self) -> dict[str, "np.ndarray"]:
+        """De kolommen als alleen-lezen NumPy arrays."""
+        import numpy as np
+
+        arrays = {}
+        for naam in ("ondergrenzen", "bovengrenzen", "basis", "helling", "anker"):
+            array = np.array(getattr(self, naam), dtype=np.float64)
+            array.flags.writeable = False
+            arrays[naam] = array
+        return arrays
+
+    def _index(self, x: float) -> int:
+        """
+        Zoek met een binaire zoekopdracht het interval waarin x valt.
+
+        Raises:
+            ValueError: Als x in geen enkel interval valt.
+        """
+        i = bisect_right(self.ondergrenzen, x) - 1
+        if i < 0 or not x < self.bovengrenzen[i]:
+            raise ValueError("Salaris is niet gedefinieerd in de tarieven.")
+        return i
+
+    def bereken(self, x: float, inkomen: float | None = None) -> float:
+        """
+        Pas de formule toe van het interval waarin het inkomen valt.
+
+        Args:
+            x (float): De waarde waarop de formule wordt toegepast.
+            inkomen (float | None, optional): De waarde waarmee het interval gezocht
+                wordt. Standaard is dit x zelf.
+
+        Returns:
+            float: De uitkomst van de formule.
+        """
+        i = self._index(x if inkomen is None else inkomen)
+        return self.basis[i] + self.helling[i] * (x - self.anker[i])
+
+    def bereken_batch(
+        self, x: "np.ndarray", inkomen: "np.ndarray | None" = None
+    ) -> "np.ndarray":
+        """
+        Gevectoriseerde variant van 'bereken' voor een array van waarden.
+
+        Raises:
+            ValueError: Als een of meer inkomens in geen enkel interval vallen.
+        """
+        import numpy as np
+
+        arrays = self.arrays
+        inkomen = x if inkomen is None else inkomen
+        index = np.searchsorted(arrays["ondergrenzen"], inkomen, side="right") - 1
+        index_veilig = np.maximum(index, 0)
+        if not ((index >= 0) & (inkomen < arrays["bovengrenzen"][index_veilig])).all():
+            raise ValueError("Salaris is niet gedefinieerd in de tarieven.")
+        return arrays["basis"][index] + arrays["helling"][index] * (
+            x - arrays["anker"][index]
+        )
+
+    def bereken_per_schijf(self, x: float) -> list[float]:
+        """
+        Pas elke formule toe op het deel van x dat binnen het bijbehorende interval
+        valt, zoals bij de belastingschijven.
+
+        Returns:
+            list[float]: De uitkomst per interval.
+        """
+        uitkomsten = []
+        for i in range(len(self.ondergrenzen)):
+            deel = max(min(x, self.bovengrenzen[i]) - self.ondergrenzen[i], 0)
+            uitkomsten.append(self.basis[i] + self.helling[i] * (deel - self.anker[i]))
+        return uitkomsten
+
+    def bereken_per_schijf_batch(self, x: "np.ndarray") -> list["np.ndarray"]:
+        """Gevectoriseerde variant van 'bereken_per_schijf' voor een array."""
+        import numpy as np
+
+        uitkomsten = []
+        for i in range(len(self.ondergrenzen)):
+            deel = np.minimum(x, self.bovengrenzen[i]) - self.ondergrenzen[i]
+            deel = np.maximum(deel, 0)
+            uitkomsten.append(self.basis[i] + self.helling[i] * (deel - self.anker[i]))
+        return uitkomsten
+
+
+@dataclass(frozen=True, eq=False)
+class GecompileerdStelsel:
+    """Het gecompileerde belastingstelsel van één jaar."""
+
+    jaar: int
+    schijven: GecompileerdeTarieven
+    arbeidskorting: GecompileerdeTarieven
+    heffingskorting: GecompileerdeTarieven
+
+    def korting(self, type: Literal["arbeid", "heffing"]) -> GecompileerdeTarieven:
+        kortingen = {
+            "arbeid": self.arbeidskorting,
+            "heffing": self.heffingskorting,
+        }
+        return kortingen[type]
+
+
+def compileer_tarieven(tarieven: Tarieven) -> GecompileerdeTarieven:
+    """
+    Compileer tarieven naar gesorteerde kolommen met grenzen en coëfficiënten.
+
+    Args:
+        tarieven (Tarieven): De tarieven, met `Lineair` formules per interval.
+
+    Returns:
+        GecompileerdeTarieven: De tarieven als kolommen, gesorteerd op ondergrens.
+
+    Raises:
+        TypeError: Als een formule geen `Lineair` is en dus niet uit te lezen is.
+    """
+    intervallen = sorted(tarieven.items())
+    for interval, formule in intervallen:
+        if not isinstance(formule, Lineair):
+            raise TypeError(f"Formule voor interval {interval} is geen Lineair.")
+
+    def kolom(waarden) -> tuple[float, ...]:
+        return tuple(float(waarde) for waarde in waarden)
+
+    return GecompileerdeTarieven(
+        ondergrenzen=kolom(lower for (lower, _), _ in intervallen),
+        bovengrenzen=kolom(upper for (_, upper), _ in intervallen),
+        basis=kolom(formule.basis for _, formule in intervallen),
+        helling=kolom(formule.helling for _, formule in intervallen),
+        anker=kolom(formule.anker for _, formule in intervallen),
+    )
+
+
+def _cache_map() -> Path | None:
+    """
+    De map voor gecompileerde stelsels. Deze is in te stellen met de omgevingsvariabele
+    SALARIS_CACHE; een lege waarde schakelt de cache uit.
+    """
+    waarde = os.environ.get("SALARIS_CACHE")
+    if waarde is not None:
+        return Path(waarde) if waarde else None
+    basis = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(basis) / "salarisonderhandeling"
+
+
+# De versie van de binaire indeling van '_naar_bytes'. Verhoog deze bij elke wijziging
+# van de indeling, zodat bestanden in het oude formaat niet meer gelezen worden.
+CACHE_VERSIE = 1
+
+_KOLOMMEN = tuple(veld.name for veld in fields(GecompileerdeTarieven))
+_CATEGORIEEN = ("schijven", "arbeidskorting", "heffingskorting")
+
+
+def _naar_bytes(stelsel: GecompileerdStelsel) -> bytes:
+    """Per categorie het aantal intervallen gevolgd door de kolommen, als float64."""
+    waarden = array("d")
+    for categorie in _CATEGORIEEN:
+        tarieven = getattr(stelsel, categorie)
+        waarden.append(len(tarieven.ondergrenzen))
+        for kolom in _KOLOMMEN:
+            waarden.extend(getattr(tarieven, kolom))
+    return waarden.tobytes()
+
+
+def _van_bytes(jaar: int, inhoud: bytes) -> GecompileerdStelsel:
+    """
+    De omgekeerde bewerking van '_naar_bytes'.
+
+    Raises:
+        ValueError: Als de inhoud niet het verwachte formaat heeft.
+    """
+    waarden = array("d")
+    waarden.frombytes(inhoud)
+    categorieen = {}
+    positie = 0
+    for categorie in _CATEGORIEEN:
+        aantal = int(waarden[positie])
+        positie += 1
+        kolommen = {}
+        for kolom in _KOLOMMEN:
+            kolommen[kolom] = tuple(waarden[positie : positie + aantal])
+            positie += aantal
+        categorieen[categorie] = GecompileerdeTarieven(**kolommen)
+    if positie != len(waarden):
+        raise ValueError("Gecompileerd stelsel heeft een onverwachte lengte.")
+    return GecompileerdStelsel(jaar=jaar, **categorieen)
+
+
+def laad_stelsel(jaar: int, cache_map: Path | None = None) -> GecompileerdStelsel:
+    """
+    Laad het gecompileerde stelsel van een jaar uit de cache, of compileer het en sla
+    het op. De cache gebruikt de inhoudshash van het tariefbestand en CACHE_VERSIE als
+    sleutel, zodat een gewijzigd bestand of een gewijzigde indeling altijd opnieuw
+    wordt gecompileerd.
+
+    Args:
+        jaar (int): Het belastingjaar.
+        cache_map (Path | None, optional): De map van de cache. Zonder map wordt het
+            stelsel altijd gecompileerd.
+
+    Returns:
+        GecompileerdStelsel: De gecompileerde schijven en kortingen.
+
+    Raises:
+        NotImplementedError: Als er geen belastingstelsel is voor het jaar.
+    """
+    if jaar not in belastingstelsels:
+        raise NotImplementedError(f"Geen belastingstelsel voor {jaar}.")
+
+    pad = None
+    if cache_map is not None:
+        pad = cache_map / f"{belastingstelsels.inhoudshash(jaar)}-{CACHE_VERSIE}.bin"
+        try:
+            return _van_bytes(jaar, pad.read_bytes())
+        except (OSError, ValueError, IndexError):
+            pass
+
+    stelsel = belastingstelsels[jaar]
+    gecompileerd = GecompileerdStelsel(
+        jaar=jaar,
+        schijven=compileer_tarieven(stelsel["schijven"]),
+        arbeidskorting=compileer_tarieven(stelsel["arbeidskorting"]),
+        heffingskorting=compileer_tarieven(stelsel["heffingskorting"]),
+    )
+
+    if pad is not None:
+        # Een cache die niet beschreven kan worden, zoals in een alleen-lezen
+        # container, is geen fout: het stelsel wordt dan de volgende keer opnieuw
+        # gecompileerd.
+        try:
+            pad.parent.mkdir(parents=True, exist_ok=True)
+            tijdelijk = pad.with_suffix(f".{os.getpid()}.tmp")
+            tijdelijk.write_bytes(_naar_bytes(gecompileerd))
+            os.replace(tijdelijk, pad)
+        except OSError:
+            pass
+    return gecompileerd
+
+
+@cache
+def compileer_stelsel(jaar: int) -> GecompileerdStelsel:
+    """
+    Compileer het belastingstelsel van een jaar. Het resultaat wordt per jaar
+    eenmalig opgebouwd of uit de cache op schijf geladen en daarna hergebruikt.
+
+    Args:
+        jaar (int): Het belastingjaar.
+
+    Returns:
+        GecompileerdStelsel: De gecompileerde schijven en kortingen.
+
+    Raises:
+        NotImplementedError: Als er geen belastingstelsel is voor het jaar.
+    """
+    return laad_stelsel(jaar, _cache_map())